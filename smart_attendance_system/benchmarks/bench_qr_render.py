@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+QR Render Microbenchmark - Per-frame time of the original and the pinned/integer-scaled QR pipeline
+smart_attendance_system/benchmarks/bench_qr_render.py
+
+Usage:
+    python benchmarks/bench_qr_render.py [--frames 200] [--mask 0]
+"""
+import argparse
+import logging
+import os
+import socket
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), 'src'))
+
+import qrcode
+from PIL import Image
+
+from attendance.config.settings import app_settings
+from attendance.core import qr_generator as qr_module
+from attendance.core.qr_generator import QRCodeGenerator
+
+def legacy_local_ip() -> str:
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except Exception:
+        try:
+            return socket.gethostbyname(socket.gethostname())
+        except Exception:
+            return "127.0.0.1"
+
+def legacy_render(token: str) -> Image.Image:
+    """The original pipeline: detect IP, fit the version, render at box_size 10, LANCZOS down"""
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=10, border=4)
+    qr.add_data(f"http://{legacy_local_ip()}:5000/scan/{token}")
+    qr.make(fit=True)
+    image = qr.make_image(fill_color="black", back_color="white")
+    return image.resize(app_settings.QR_SIZE, Image.Resampling.LANCZOS)
+
+def pil_rasterized(generator: QRCodeGenerator) -> QRCodeGenerator:
+    """Force the pure-PIL rasterizer even when NumPy is installed"""
+    array_rasterize = generator.rasterize
+
+    def rasterize(matrix):
+        numpy, qr_module.np = qr_module.np, None
+        try:
+            return array_rasterize(matrix)
+        finally:
+            qr_module.np = numpy
+    generator.rasterize = rasterize
+    return generator
+
+def tokens(count: int):
+    start = datetime(2025, 1, 1, 9, 0, 0)
+    return [f"ATTEND-{(start + timedelta(seconds=5 * i)).strftime('%Y%m%d%H%M%S')}" for i in range(count)]
+
+def measure(render, frames: int) -> dict:
+    timings = []
+    for token in tokens(frames):
+        started = time.perf_counter()
+        render(token)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p95": timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare QR render pipelines")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--mask", type=int, choices=range(8), help="also time a pinned mask pattern")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    generator = QRCodeGenerator()
+    variants = [("legacy (fit + LANCZOS)", legacy_render),
+                ("pinned version, PIL NEAREST", pil_rasterized(QRCodeGenerator()).create_qr_image)]
+    if qr_module.np is not None:
+        variants.append(("pinned version, NumPy", generator.create_qr_image))
+    if args.mask is not None:
+        masked = QRCodeGenerator()
+        masked.mask_pattern = args.mask
+        variants.append((f"pinned version + mask {args.mask}", masked.create_qr_image))
+
+    print(f"\n🧪 QR render: {args.frames} frames at {app_settings.QR_SIZE[0]}x{app_settings.QR_SIZE[1]}")
+    print("=" * 64)
+    baseline = None
+    for name, render in variants:
+        render(tokens(1)[0])  # Warm caches (IP, pinned version)
+        result = measure(render, args.frames)
+        baseline = baseline or result["mean"]
+        print(f"   {name:<30} mean {result['mean']:6.2f} ms | p50 {result['p50']:6.2f} ms | "
+              f"p95 {result['p95']:6.2f} ms | {baseline / result['mean']:4.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+QR Benchmark Suite - Token generation, QR rendering and Tk conversion timings with baseline regression checks
+smart_attendance_system/benchmarks/bench_qr_suite.py
+
+Results are written as JSON. Comparing against a saved baseline flags every
+case whose median got slower than the threshold and exits non-zero.
+
+Usage:
+    python benchmarks/bench_qr_suite.py --output qr_results.json
+    python benchmarks/bench_qr_suite.py --save-baseline benchmarks/qr_baseline.json
+    python benchmarks/bench_qr_suite.py --baseline benchmarks/qr_baseline.json [--threshold 0.25]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), 'src'))
+sys.path.insert(0, current_dir)
+
+import PIL
+import qrcode
+from PIL import Image, ImageTk
+
+from attendance.config.settings import app_settings
+from attendance.core import qr_generator as qr_module
+from attendance.core.qr_generator import (COMPACT_ENCODING, ERROR_CORRECTION_LEVELS, LEGACY_ENCODING,
+                                          QRCodeGenerator)
+from bench_qr_render import legacy_render, pil_rasterized
+
+QR_SIZES = (250, 350, 500)
+START = datetime(2025, 1, 1, 9, 0, 0)
+
+class StubPhotoImage:
+    """Stands in for ImageTk.PhotoImage without a display: pays for the pixel transfer Tk would receive"""
+
+    def __init__(self, image: Any = None, size: Any = None, **_kwargs):
+        self.payload = image.tobytes() if isinstance(image, Image.Image) else b""
+
+    def paste(self, image: Image.Image):
+        self.payload = image.tobytes()
+
+def tk_backend() -> str:
+    """Use a real Tk (e.g. under xvfb-run) when a display is available, else stub PhotoImage"""
+    try:
+        import tkinter
+        root = tkinter.Tk()
+        root.withdraw()
+        return "tk"
+    except Exception:
+        ImageTk.PhotoImage = StubPhotoImage
+        return "stub"
+
+def windows(count: int) -> List[datetime]:
+    return [START + timedelta(seconds=app_settings.QR_REFRESH_INTERVAL * i) for i in range(count)]
+
+def generator_for(encoding: str = LEGACY_ENCODING, size: int = 350, level: str = "M",
+                  array_raster: bool = True) -> QRCodeGenerator:
+    generator = QRCodeGenerator(encoding)
+    generator.qr_size = (size, size)
+    generator.error_correction = ERROR_CORRECTION_LEVELS[level]
+    return generator if array_raster else pil_rasterized(generator)
+
+def build_cases(quick: bool) -> Dict[str, Callable[[int], Any]]:
+    """Case name -> function of the iteration index"""
+    cases: Dict[str, Callable[[int], Any]] = {}
+    stamps = windows(1000)
+
+    for encoding in (LEGACY_ENCODING, COMPACT_ENCODING):
+        generator = QRCodeGenerator(encoding)
+        cases[f"token/{encoding}"] = lambda i, g=generator: g.generate_token(stamps[i % len(stamps)])
+
+    levels = ("M",) if quick else tuple(ERROR_CORRECTION_LEVELS)
+    sizes = (350,) if quick else QR_SIZES
+    for encoding in (LEGACY_ENCODING, COMPACT_ENCODING):
+        for size in sizes:
+            for level in levels:
+                generator = generator_for(encoding, size, level)
+                tokens = [generator.generate_token(stamp) for stamp in stamps]
+                cases[f"create_qr_image/{encoding}/{size}px/{level}"] = \
+                    lambda i, g=generator, t=tokens: g.create_qr_image(t[i % len(t)])
+
+    # Rasterization strategies for one fixed code, isolated from QR encoding
+    for size in sizes:
+        matrix = generator_for(size=size).build_matrix("http://192.168.1.20:5000/scan/ATTEND-20250101090000")
+        legacy = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=10, border=4)
+        legacy.add_data("http://192.168.1.20:5000/scan/ATTEND-20250101090000")
+        legacy.make(fit=True)
+        cases[f"raster/box10_lanczos/{size}px"] = lambda i, q=legacy, s=size: \
+            q.make_image(fill_color="black", back_color="white").resize((s, s), Image.Resampling.LANCZOS)
+        cases[f"raster/pil_nearest/{size}px"] = lambda i, g=generator_for(size=size, array_raster=False), m=matrix: \
+            g.rasterize(m)
+        if qr_module.np is not None:
+            cases[f"raster/numpy/{size}px"] = lambda i, g=generator_for(size=size), m=matrix: g.rasterize(m)
+
+    legacy_tokens = [f"ATTEND-{stamp.strftime('%Y%m%d%H%M%S')}" for stamp in stamps]
+    cases["create_qr_image/original_pipeline"] = lambda i: legacy_render(legacy_tokens[i % len(legacy_tokens)])
+
+    generator = generator_for()
+    tokens = [generator.generate_token(stamp) for stamp in stamps]
+    cases["create_tkinter_image"] = lambda i: generator.create_tkinter_image(tokens[i % len(tokens)])
+    frame = generator.create_qr_image(tokens[0])
+    photo = ImageTk.PhotoImage(frame.mode, frame.size)
+    cases["photoimage_paste"] = lambda i: photo.paste(frame)
+    return cases
+
+def run_case(case: Callable[[int], Any], iterations: int) -> Dict[str, float]:
+    case(0)  # Warm caches (IP, pinned version, buffers)
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        case(i)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "runs": iterations,
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "p50_ms": round(timings[len(timings) // 2], 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 4)
+    }
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Cases whose median slowed down by more than threshold (fraction) versus the baseline"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or previous["p50_ms"] <= 0:
+            continue
+        change = result["p50_ms"] / previous["p50_ms"] - 1
+        if change > threshold:
+            regressions.append(f"{name}: p50 {previous['p50_ms']:.3f} -> {result['p50_ms']:.3f} ms (+{change:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark token generation and QR rendering")
+    parser.add_argument("--iterations", type=int, default=100, help="timed calls per case")
+    parser.add_argument("--quick", action="store_true", help="350 px and level M only")
+    parser.add_argument("--filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="flag regressions against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    backend = tk_backend()
+    cases = {name: case for name, case in build_cases(args.quick).items() if args.filter in name}
+
+    print(f"\n🧪 QR benchmark suite: {len(cases)} cases x {args.iterations} runs (PhotoImage: {backend})")
+    print("=" * 72)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, case in cases.items():
+        results[name] = run_case(case, args.iterations)
+        print(f"   {name:<44} p50 {results[name]['p50_ms']:8.3f} ms | p95 {results[name]['p95_ms']:8.3f} ms")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pillow": PIL.__version__,
+            "numpy": qr_module.np.__version__ if qr_module.np is not None else None,
+            "photoimage": backend,
+            "iterations": args.iterations
+        },
+        "results": results
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as results_file:
+            json.dump(report, results_file, indent=2)
+        print(f"\n💾 Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline: Optional[Dict[str, Any]] = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
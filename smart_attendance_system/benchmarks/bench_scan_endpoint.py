@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Scan Endpoint Microbenchmark - Requests/sec for /scan/<token> before and after the fast path
+smart_attendance_system/benchmarks/bench_scan_endpoint.py
+
+Usage:
+    python benchmarks/bench_scan_endpoint.py [--requests 20000]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), 'src'))
+sys.path.insert(0, current_dir)
+
+from flask import Flask, jsonify, request
+from werkzeug.test import EnvironBuilder
+
+from attendance.core.flask_server import AttendanceFlaskServer
+from attendance.core.shared_state import InProcessState
+from standin_db import StandInDatabase
+
+STUDENT_IP = "10.0.0.21"
+UNKNOWN_IP = "10.0.0.99"
+TOKEN = "ATTEND-20250101090000"
+
+class NoDedupState(InProcessState):
+    """Treat every scan as the first, so the recorded case keeps exercising the insert"""
+
+    def mark_present_many(self, scope, members):
+        return [True] * len(members)
+
+def build_legacy_app(server: AttendanceFlaskServer) -> Flask:
+    """Reproduce the original jsonify-based /scan handler for comparison"""
+    app = Flask("legacy_scan")
+    legacy_logger = logging.getLogger("legacy_scan")
+
+    @app.route("/scan/<token>", methods=['GET', 'POST'])
+    def handle_scan(token: str):
+        client_ip = request.remote_addr
+        legacy_logger.info(f"📱 Scan request from {client_ip} with token {token}")
+        if server.sessions.resolve(token) is None:
+            legacy_logger.warning(f"⏰ Invalid/expired token from {client_ip}")
+            return jsonify({
+                "status": "⏰ QR Code Expired",
+                "error": "TOKEN_INVALID",
+                "message": "Please scan the latest QR code"
+            }), 403
+        student = server.db.get_student_by_ip(client_ip)
+        if not student:
+            legacy_logger.info(f"❓ Unknown device: {client_ip}")
+            return jsonify({
+                "status": "❓ Device Not Registered",
+                "error": "DEVICE_UNKNOWN",
+                "message": f"Device {client_ip} is not registered",
+                "ip": client_ip
+            }), 200
+        attendance_time = datetime.now()
+        server.db.mark_attendance(student["regno"], student["name"], client_ip, attendance_time)
+        legacy_logger.info(f"✅ Attendance: {student['regno']} ({student['name']})")
+        return jsonify({
+            "status": "✅ Attendance Recorded",
+            "student": {"regno": student["regno"], "name": student["name"]},
+            "timestamp": attendance_time.strftime('%H:%M:%S'),
+            "date": attendance_time.strftime('%Y-%m-%d')
+        }), 200
+
+    return app
+
+def make_environ(token: str, client_ip: str) -> dict:
+    """Build a WSGI environ for a scan request"""
+    return EnvironBuilder(path=f"/scan/{token}", environ_base={'REMOTE_ADDR': client_ip}).get_environ()
+
+def run_case(wsgi_app, environ: dict, count: int) -> float:
+    """Call the WSGI app repeatedly and return requests/sec"""
+    def start_response(status, headers):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(count):
+        body = wsgi_app(dict(environ), start_response)
+        for _chunk in body:
+            pass
+        if hasattr(body, 'close'):
+            body.close()
+    return count / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the /scan endpoint")
+    parser.add_argument("--requests", type=int, default=20000, help="requests per case")
+    args = parser.parse_args()
+
+    logging.getLogger().addHandler(logging.NullHandler())
+    logging.getLogger().setLevel(logging.WARNING)
+
+    db = StandInDatabase([{"regno": "REG001", "name": "Bench Student", "ip": STUDENT_IP}])
+    server = AttendanceFlaskServer(db=db, shared_state=NoDedupState())
+    server._server_network = "10.0.0"
+    server._server_network_checked = float("inf")
+    server.update_token(TOKEN, datetime.now() + timedelta(hours=1))
+
+    implementations = {
+        "legacy (jsonify)": build_legacy_app(server).wsgi_app,
+        "flask route": lambda environ, start_response: Flask.wsgi_app(server.app, environ, start_response),
+        "fast path": server.app.wsgi_app,
+    }
+    cases = {
+        "recorded": make_environ(TOKEN, STUDENT_IP),
+        "expired": make_environ("ATTEND-19990101000000", STUDENT_IP),
+        "unknown": make_environ(TOKEN, UNKNOWN_IP),
+    }
+
+    print(f"{'case':<10} " + " ".join(f"{name:>18}" for name in implementations))
+    for case_name, environ in cases.items():
+        rates = [run_case(app, environ, args.requests) for app in implementations.values()]
+        print(f"{case_name:<10} " + " ".join(f"{rate:>14,.0f} r/s" for rate in rates))
+
+if __name__ == "__main__":
+    main()
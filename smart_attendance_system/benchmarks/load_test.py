@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Classroom Rush Load Test - Simulate students scanning across token rotations
+smart_attendance_system/benchmarks/load_test.py
+
+Starts the scan server on loopback backed by an in-memory stand-in database,
+registers N students with distinct 127.x.y.z source addresses (Linux routes all
+of 127.0.0.0/8 to loopback) and replays a classroom arrival curve: most students
+arrive early, read the token on display, take a moment to scan it and retry
+once the code has rotated under them.
+
+Tokens reach students over HTTP the way a real room gets them: simulated
+displays on 127.0.0.1 long-poll /qr/next and download /qr/current.svg after
+every rotation, exactly like the /qr page, and a student reads whichever
+token the display they look at last fetched. Students cannot fetch the token
+themselves, since /qr is closed to room devices. Display traffic and the lag
+between a rotation and the display showing it are part of the report.
+
+Usage:
+    python benchmarks/load_test.py --students 300 --rush 20 --interval 5
+"""
+import argparse
+import heapq
+import http.client
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Any
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), 'src'))
+sys.path.insert(0, current_dir)
+
+from attendance.config.settings import server_config
+from attendance.core.flask_server import AttendanceFlaskServer
+from attendance.core.qr_frames import frame_etag
+from standin_db import StandInDatabase
+
+MAX_ATTEMPTS = 3
+
+def student_ip(index: int) -> str:
+    """Distinct loopback address for simulated student number index"""
+    return f"127.{1 + index // 62500}.{(index // 250) % 250}.{index % 250 + 1}"
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+class TokenRotator(threading.Thread):
+    """Rotates the server token the way the main window does"""
+
+    def __init__(self, server: AttendanceFlaskServer, interval: float):
+        super().__init__(name="token-rotator", daemon=True)
+        self.server = server
+        self.interval = interval
+        self.stopped = threading.Event()
+        # Frame ETag -> (token, monotonic issue time): what a display "sees" in the image it downloaded
+        self.issued: Dict[str, tuple] = {}
+
+    def rotate(self):
+        now = datetime.now()
+        token = f"ATTEND-{now.strftime('%Y%m%d%H%M%S%f')}"
+        self.issued[frame_etag(token)] = (token, time.monotonic())
+        self.server.update_token(token, now + timedelta(seconds=self.interval))
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.rotate()
+
+class DisplayClient(threading.Thread):
+    """Projector showing the code: long-polls /qr/next and downloads each new frame"""
+
+    def __init__(self, port: int, rotator: TokenRotator, number: int):
+        super().__init__(name=f"display-{number}", daemon=True)
+        self.port = port
+        self.rotator = rotator
+        self.shown = None  # Token in the last frame downloaded
+        self.lags: List[float] = []  # Seconds from rotation to the new frame being on screen
+        self.requests = 0
+        self.errors = 0
+
+    def _get(self, connection: http.client.HTTPConnection, path: str) -> tuple:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        self.requests += 1
+        return response.status, response.read()
+
+    def run(self):
+        etag = ""
+        connection = None
+        while not self.rotator.stopped.is_set():
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+                status, body = self._get(connection, f"/qr/next?etag={etag}")
+                if status != 200:
+                    continue  # 204: no rotation within the long-poll timeout
+                etag = json.loads(body)["etag"]
+                status, _svg = self._get(connection, f"/qr/current.svg?v={etag}")
+                token, issued_at = self.rotator.issued.get(etag, (None, None))
+                if status == 200 and token:
+                    self.shown = token
+                    self.lags.append(time.monotonic() - issued_at)
+            except (OSError, http.client.HTTPException, ValueError):
+                self.errors += 1
+                if connection is not None:
+                    connection.close()
+                connection = None
+                self.rotator.stopped.wait(0.2)
+
+class LoadTest:
+    """Drives simulated students against a running server"""
+
+    def __init__(self, server: AttendanceFlaskServer, students: List[Dict[str, Any]], args,
+                 displays: List[DisplayClient]):
+        self.server = server
+        self.students = students
+        self.args = args
+        self.displays = displays
+        self.results: List[Dict[str, Any]] = []
+        self._results_lock = threading.Lock()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._retry_queue: List[tuple] = []
+        self._retry_lock = threading.Lock()
+
+    def _scan(self, student: Dict[str, Any], token: str, attempt: int):
+        """Send one scan request from the student's own source address"""
+        started = time.perf_counter()
+        error = "CONNECTION_ERROR"
+        status = 0
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=10,
+                                                    source_address=(student["ip"], 0))
+            connection.request("GET", f"/scan/{token}")
+            response = connection.getresponse()
+            body = response.read()
+            connection.close()
+            status = response.status
+            error = json.loads(body).get("error", "RECORDED") if body else "EMPTY_BODY"
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            error = f"CONNECTION_ERROR ({type(e).__name__})"
+        latency = time.perf_counter() - started
+
+        with self._results_lock:
+            self.results.append({"status": status, "error": error, "latency": latency, "attempt": attempt})
+
+        # Students whose code rotated mid-scan look at the screen again and retry
+        if error == "TOKEN_INVALID" and attempt < MAX_ATTEMPTS:
+            with self._retry_lock:
+                self._retry_queue.append((time.monotonic() + random.uniform(0.2, 0.5), student, attempt + 1))
+            return
+        with self._pending_lock:
+            self._pending -= 1
+
+    def _scan_delay(self) -> float:
+        """Time between reading the code and the phone sending the request"""
+        return random.uniform(self.args.min_scan_delay, self.args.max_scan_delay)
+
+    def run(self) -> float:
+        """Replay the arrival curve and return the wall-clock duration"""
+        rush = self.args.rush
+        arrivals = sorted(
+            (min(random.gammavariate(2.0, rush / 4.0), rush), index)
+            for index in range(len(self.students))
+        )
+        self._pending = len(arrivals)
+
+        # (due time, sequence, student, attempt, token or None until the code is read)
+        started = time.monotonic()
+        sequence = itertools.count()
+        scheduled: List[tuple] = []
+        for offset, index in arrivals:
+            heapq.heappush(scheduled, (started + offset, next(sequence), self.students[index], 1, None))
+
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            while True:
+                with self._retry_lock:
+                    retries, self._retry_queue = self._retry_queue, []
+                for due, student, attempt in retries:
+                    heapq.heappush(scheduled, (due, next(sequence), student, attempt, None))
+                with self._pending_lock:
+                    if self._pending <= 0:
+                        break
+
+                if not scheduled:
+                    time.sleep(0.005)
+                    continue
+
+                due, _sequence, student, attempt, token = scheduled[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(min(delay, 0.005))
+                    continue
+                heapq.heappop(scheduled)
+
+                if token is None:
+                    # Student reads the code on a display, then scans it a moment later
+                    shown = random.choice(self.displays).shown
+                    if shown is None:
+                        heapq.heappush(scheduled, (due + 0.05, next(sequence), student, attempt, None))
+                    else:
+                        heapq.heappush(scheduled, (due + self._scan_delay(), next(sequence), student, attempt, shown))
+                else:
+                    pool.submit(self._scan, student, token, attempt)
+
+        return time.monotonic() - started
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        latencies = sorted(result["latency"] for result in self.results)
+        lags = sorted(lag for display in self.displays for lag in display.lags)
+        errors = Counter(result["error"] for result in self.results)
+        recorded = errors.get("RECORDED", 0)
+        return {
+            "students": len(self.students),
+            "requests": len(self.results),
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(len(self.results) / duration, 1) if duration else 0.0,
+            "recorded": recorded,
+            "recorded_ratio": round(recorded / len(self.students), 4) if self.students else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95": round(percentile(latencies, 0.95) * 1000, 3),
+                "p99": round(percentile(latencies, 0.99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0
+            },
+            "outcomes": dict(errors.most_common()),
+            "retries": sum(1 for result in self.results if result["attempt"] > 1),
+            "displays": {
+                "count": len(self.displays),
+                "requests": sum(display.requests for display in self.displays),
+                "errors": sum(display.errors for display in self.displays),
+                "lag_ms": {
+                    "p50": round(percentile(lags, 0.50) * 1000, 3),
+                    "max": round(lags[-1] * 1000, 3) if lags else 0.0
+                }
+            }
+        }
+
+def print_report(report: Dict[str, Any]):
+    print("\n📊 Classroom Rush Report")
+    print("=" * 50)
+    print(f"   👥 Students:    {report['students']}")
+    print(f"   📨 Requests:    {report['requests']} ({report['retries']} retries)")
+    print(f"   ⏱️ Duration:    {report['duration_s']:.2f} s")
+    print(f"   🚀 Throughput:  {report['throughput_rps']:.1f} req/s")
+    print(f"   ✅ Recorded:    {report['recorded']} ({report['recorded_ratio']:.1%})")
+    latency = report["latency_ms"]
+    print(f"   📈 Latency:     p50 {latency['p50']:.2f} ms | p95 {latency['p95']:.2f} ms | "
+          f"p99 {latency['p99']:.2f} ms | max {latency['max']:.2f} ms")
+    displays = report["displays"]
+    print(f"   🖥️ Displays:    {displays['count']} ({displays['requests']} requests, {displays['errors']} errors), "
+          f"rotation to screen p50 {displays['lag_ms']['p50']:.2f} ms | max {displays['lag_ms']['max']:.2f} ms")
+    print("   🧾 Outcomes:")
+    for error, count in report["outcomes"].items():
+        print(f"      {error:<28} {count}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simulate a classroom scan rush against a local server",
+        epilog="Students read tokens from simulated displays that fetch each frame over /qr/next and "
+               "/qr/current.svg, so token distribution is part of the measured load.")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--unregistered", type=float, default=0.02, help="fraction of devices not registered")
+    parser.add_argument("--rush", type=float, default=20.0, help="seconds over which students arrive")
+    parser.add_argument("--interval", type=float, default=5.0, help="token rotation interval (seconds)")
+    parser.add_argument("--min-scan-delay", type=float, default=0.3)
+    parser.add_argument("--max-scan-delay", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=64, help="client threads")
+    parser.add_argument("--displays", type=int, default=1,
+                        help="screens long-polling /qr/next (pool mode serves at most MAX_EVENT_STREAMS)")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--serving-mode", choices=("threaded", "pool"), default=server_config.SERVING_MODE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logging.getLogger().addHandler(logging.NullHandler())
+    logging.getLogger().setLevel(logging.ERROR)
+
+    students = [{"regno": f"LOAD{index:05d}", "name": f"Student {index}", "ip": student_ip(index)}
+                for index in range(args.students)]
+    registered = [student for student in students if random.random() >= args.unregistered]
+    db = StandInDatabase(registered)
+
+    server_config.ALLOWED_SUBNET = "127.0.0.0/8"
+    server = AttendanceFlaskServer(db=db)
+    server.host = "127.0.0.1"
+    server.port = args.port
+    server.serving_mode = args.serving_mode
+    if not server.start():
+        sys.exit(1)
+
+    rotator = TokenRotator(server, args.interval)
+    rotator.rotate()
+    rotator.start()
+    displays = [DisplayClient(server.port, rotator, number) for number in range(max(1, args.displays))]
+    for display in displays:
+        display.start()
+
+    print(f"🚀 {args.students} students over {args.rush:.0f}s, token every {args.interval:g}s, "
+          f"{args.concurrency} client threads, {args.serving_mode} server")
+    try:
+        load_test = LoadTest(server, students, args, displays)
+        report = load_test.report(load_test.run())
+    finally:
+        rotator.stopped.set()
+        server.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+if __name__ == "__main__":
+    main()
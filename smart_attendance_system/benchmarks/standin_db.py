@@ -0,0 +1,59 @@
+"""
+Stand-in Database - In-memory replacement for DatabaseManager in benchmarks
+smart_attendance_system/benchmarks/standin_db.py
+"""
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+class StandInDatabase:
+    """In-memory database exposing the DatabaseManager methods the server uses"""
+
+    def __init__(self, students: Optional[List[Dict[str, Any]]] = None):
+        self.connection = True  # Reported as online by /api/status
+        self.students_by_ip: Dict[str, Dict[str, Any]] = {}
+        self.attendance: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+        for student in students or []:
+            self.add_student(student["regno"], student["name"], student["ip"])
+
+    def add_student(self, regno: str, name: str, ip: str):
+        """Register a student device"""
+        self.students_by_ip[ip] = {"regno": regno, "name": name, "ip": ip}
+
+    def connect(self) -> bool:
+        return True
+
+    def close_connection(self):
+        pass
+
+    def set_thread_affinity(self, enabled: bool):
+        pass
+
+    def test_connection(self) -> bool:
+        return True
+
+    def get_student_by_ip(self, ip_address: str) -> Optional[Dict[str, Any]]:
+        return self.students_by_ip.get(ip_address)
+
+    def mark_attendance(self, regno: str, name: str, ip: str, created_at: datetime,
+                        session_id: Optional[str] = None, room: Optional[str] = None) -> bool:
+        with self._lock:
+            self.attendance.append({"regno": regno, "name": name, "ip": ip, "created_at": created_at,
+                                    "session_id": session_id, "room": room})
+        return True
+
+    def get_students_by_ips(self, ip_addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {ip: self.students_by_ip[ip] for ip in ip_addresses if ip in self.students_by_ip}
+
+    def mark_attendance_batch(self, rows: List[tuple]) -> bool:
+        with self._lock:
+            for regno, name, ip, created_at, session_id, room in rows:
+                self.attendance.append({"regno": regno, "name": name, "ip": ip, "created_at": created_at,
+                                        "session_id": session_id, "room": room})
+        return True
+
+    def get_all_attendance_records(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(reversed(self.attendance))
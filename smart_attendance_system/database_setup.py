@@ -47,11 +47,25 @@ def create_database_and_tables():
             name VARCHAR(100) NOT NULL,
             ip VARCHAR(15) NOT NULL,
             created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            session_id VARCHAR(64) NULL,
+            room VARCHAR(100) NULL,
             INDEX idx_regno (regno),
-            INDEX idx_created_at (created_at)
+            INDEX idx_created_at (created_at),
+            INDEX idx_session (session_id)
         )
         """
         cursor.execute(attendance_table)
+
+        # Upgrade tables created before multi-room sessions
+        for column, definition in (("session_id", "VARCHAR(64) NULL"), ("room", "VARCHAR(100) NULL")):
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'attendance' AND COLUMN_NAME = %s",
+                (column,)
+            )
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(f"ALTER TABLE attendance ADD COLUMN {column} {definition}")
+                print(f"✅ Attendance table upgraded with '{column}' column")
         print("✅ Attendance table created/verified")
 
         # Sample student data (using IPs)
@@ -4,10 +4,10 @@ Smart Attendance System - Main Entry Point
 Compatible with Python 3.13.7
 """
 
+import argparse
 import sys
 import os
 import logging
-from datetime import datetime
 
 # Add src directory to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -15,39 +15,42 @@ src_dir = os.path.join(current_dir, 'src')
 sys.path.insert(0, src_dir)
 
 try:
-    from attendance.ui.main_window import AttendanceMainWindow
+    # UI modules are imported only when the window is launched, so headless mode never loads Tk
     from attendance.core.flask_server import attendance_server
+    from attendance.core.qr_generator import qr_generator
     from attendance.database.db_manager import database_manager
-    from attendance.config.settings import app_settings, create_directories
+    from attendance.config.settings import app_settings, logging_config, server_config, create_directories
+    from attendance.utils.async_logging import log_pipeline
+    from attendance.utils.log_rotation import build_file_handler
 except ImportError as e:
     print(f"❌ Error importing modules: {e}")
     print("Make sure all files are in their correct directories.")
     sys.exit(1)
 
+LOG_DIR = os.path.join(current_dir, 'logs')
+
 def setup_logging():
     """Setup application logging"""
-    log_dir = os.path.join(current_dir, 'logs')
-    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(LOG_DIR, exist_ok=True)
 
-    log_file = os.path.join(log_dir, f"attendance_{datetime.now().strftime('%Y%m%d')}.log")
+    # Rotated by day and size, compressed in the background
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(logging_config.FORMAT))
+    handlers = [build_file_handler(LOG_DIR), console]
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    # Request threads only enqueue; a writer thread does the formatting and I/O
+    log_pipeline.start(handlers)
 
     logger = logging.getLogger(__name__)
     logger.info("=" * 60)
-    logger.info(f"Smart Attendance System v{app_settings.VERSION} - Starting")
+    logger.info("Smart Attendance System v%s - Starting", app_settings.VERSION)
     logger.info("=" * 60)
 
-def check_dependencies():
+def check_dependencies(headless: bool = False):
     """Check if all required dependencies are available"""
-    required_modules = ['customtkinter', 'PIL', 'qrcode', 'mysql.connector', 'flask']
+    required_modules = ['PIL', 'qrcode', 'mysql.connector', 'flask']
+    if not headless:
+        required_modules.insert(0, 'customtkinter')
 
     missing_modules = []
     for module in required_modules:
@@ -64,7 +67,7 @@ def check_dependencies():
         print("   pip install -r requirements.txt")
         sys.exit(1)
 
-def initialize_application():
+def initialize_application(interactive: bool = True):
     """Initialize application components"""
     logger = logging.getLogger(__name__)
 
@@ -79,39 +82,71 @@ def initialize_application():
         logger.error("❌ Database connection failed")
         print("\n⚠️ Database connection failed!")
         print("Please check your MySQL server and database configuration.")
-        choice = input("Continue anyway? (y/N): ")
-        if choice.lower() != 'y':
-            sys.exit(1)
-
-    # Start Flask server
-    logger.info("Starting Flask server...")
-    attendance_server.start()
-
-    logger.info(f"📱 QR Scanner URL: http://{attendance_server.get_local_ip()}:5000/scan/<token>")
+        if interactive:
+            choice = input("Continue anyway? (y/N): ")
+            if choice.lower() != 'y':
+                sys.exit(1)
+        else:
+            logger.warning("⚠️ Continuing without a database; scans will report DB_ERROR until it is reachable")
+
+    # Start the scan server, in this process or in a supervised child
+    if server_config.PROCESS_MODE == "split":
+        from attendance.core.scan_process import ScanServerProcess
+        logger.info("Starting scan server process...")
+        server = ScanServerProcess(log_dir=LOG_DIR)
+    else:
+        logger.info("Starting Flask server...")
+        server = attendance_server
+    if not server.start():
+        logger.error("❌ Flask server failed to start")
+
+    logger.info("📱 QR Scanner URL: %s", qr_generator.scan_url("<token>", server.port))
+    return server
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Smart Attendance System")
+    parser.add_argument("--headless", action="store_true",
+                        help="run token rotation and the scan server without the window (no Tk needed)")
+    parser.add_argument("--export-qr", metavar="PATH",
+                        help="headless: also write each QR frame to PATH (.png or .svg)")
+    return parser.parse_args()
+
+def run_headless(server, export_path: str = None) -> int:
+    """Serve scans and QR frames with no display attached"""
+    from attendance.core.headless import HeadlessRuntime
+    return HeadlessRuntime(server, export_path=export_path).run()
 
 def main():
     """Main application entry point"""
+    args = parse_arguments()
+    exit_code = 0
+    server = attendance_server
+    logger = logging.getLogger(__name__)
     try:
         print("🚀 Starting Smart Attendance System...")
 
         # Setup logging
         setup_logging()
-        logger = logging.getLogger(__name__)
 
         # Check dependencies
         logger.info("Checking dependencies...")
-        check_dependencies()
+        check_dependencies(args.headless)
         logger.info("✅ All dependencies available")
 
         # Initialize application
-        initialize_application()
+        server = initialize_application(interactive=not args.headless)
+
+        if args.headless:
+            exit_code = run_headless(server, args.export_qr)
+            return
 
         # Create and run main window
         logger.info("Launching main window...")
+        from attendance.ui.main_window import AttendanceMainWindow
         app = AttendanceMainWindow()
 
         # Connect server to UI for token updates
-        app.set_server(attendance_server)
+        app.set_server(server)
 
         logger.info("🎉 Application started successfully")
 
@@ -121,14 +156,17 @@ def main():
     except KeyboardInterrupt:
         logger.info("\n👋 Application interrupted by user")
     except Exception as e:
-        logger.error(f"💥 Application error: {e}", exc_info=True)
+        logger.error("💥 Application error: %s", e, exc_info=True)
         print(f"\n❌ Application error: {e}")
     finally:
         # Cleanup
         print("🧹 Cleaning up...")
-        attendance_server.stop()
+        server.stop()
         database_manager.close_connection()
+        log_pipeline.stop()
         print("👋 Application closed")
+    if exit_code:
+        sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
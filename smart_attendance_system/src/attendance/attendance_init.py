@@ -6,6 +6,7 @@ from .config.settings import app_settings
 from .database.db_manager import database_manager
 from .core.qr_generator import qr_generator
 from .core.flask_server import attendance_server
+from .core.event_bus import attendance_events
 from .utils.csv_exporter import csv_exporter
 
 __all__ = [
@@ -13,5 +14,6 @@ __all__ = [
     'database_manager', 
     'qr_generator',
     'attendance_server',
+    'attendance_events',
     'csv_exporter'
 ]
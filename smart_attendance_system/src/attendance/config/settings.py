@@ -4,6 +4,7 @@ smart_attendance_system/src/attendance/config/settings.py
 """
 import os
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class DatabaseSettings:
@@ -13,6 +14,7 @@ class DatabaseSettings:
     PASSWORD: str = "root" 
     DATABASE: str = "attendance_system"
     PORT: int = 3306
+    CONNECT_TIMEOUT: int = 5  # seconds
 
 @dataclass
 class ServerSettings:
@@ -20,20 +22,83 @@ class ServerSettings:
     HOST: str = "0.0.0.0"
     PORT: int = 5000
     DEBUG: bool = False
+    DEFAULT_ROOM: str = "Main Classroom"  # Room of the main window's session
+    ALLOWED_SUBNET: str = ""  # e.g. "192.168.1.0/24"; empty allows the server's own /24
+    SCAN_FAST_PATH: bool = True  # Serve /scan/<token> outside Flask dispatch
+    EVENT_HISTORY_SIZE: int = 256  # Events kept for Last-Event-ID resume
+    EVENT_QUEUE_SIZE: int = 64  # Pending events per subscriber before dropping
+    SSE_HEARTBEAT_INTERVAL: float = 15.0  # seconds
+    TRACE_SAMPLE_RATE: float = 0.0  # Fraction of scans traced (0 disables tracing)
+    TRACE_FILE: str = "traces.jsonl"  # Written to the logs directory
+    TRACE_MAX_BYTES: int = 20 * 1024 * 1024  # Rotate the trace file at this size as well as at midnight
+    TRACE_BACKUP_COUNT: int = 5  # Rotated (gzipped) trace files kept
+    DRAIN_TIMEOUT: float = 2.0  # seconds to let in-flight requests finish on stop
+    PROCESS_MODE: str = "single"  # "single" or "split" (scan server and database writes in a supervised child process)
+    PROCESS_RESTART_DELAY: float = 2.0  # seconds before a crashed scan server process is restarted
+    PROCESS_START_TIMEOUT: float = 30.0  # seconds the scan server process may take to start listening
+    SERVING_MODE: str = "threaded"  # "threaded" (thread per connection) or "pool" (fixed workers)
+    WORKER_COUNT: int = 32  # Worker threads in pool mode
+    ACCEPT_QUEUE: int = 128  # Connections waiting for a worker before new ones get 503
+    KEEPALIVE_TIMEOUT: float = 2.0  # seconds an idle keep-alive connection may hold a pool worker
+    MAX_EVENT_STREAMS: int = 4  # Concurrent /events streams in pool mode (each holds a worker)
+    QR_DISPLAY_IPS: tuple = ()  # Screens (projector PC, signage player) allowed to fetch /qr besides this machine
+    QR_DISPLAY_KEY: str = ""  # Shared secret; a display may instead open /qr?key=<secret> (empty disables)
+    QR_LONG_POLL_TIMEOUT: float = 25.0  # seconds /qr/next waits for the next frame before answering 204
+    ADMISSION_MAX_IN_FLIGHT: int = 16  # Concurrent attendance writes
+    ADMISSION_MAX_QUEUE: int = 64  # Scans allowed to wait for a slot
+    ADMISSION_MAX_WAIT: float = 1.0  # seconds a queued scan may wait before being shed
+    SCAN_MIN_BUDGET: float = 1.0  # seconds a scan may take even when its token is about to expire
+    SHARED_STATE_URL: str = ""  # e.g. "kv://10.0.0.2:6390" to share state between nodes; empty = in-process
+    SHARED_STATE_TIMEOUT: float = 1.0  # seconds
+    PRESENT_TTL: float = 12 * 3600  # seconds a session's present set is kept
+    SCAN_RATE_LIMIT: int = 0  # Scans per device per minute (0 disables)
+    TRUSTED_GATEWAYS: tuple = ("127.0.0.1",)  # Relays allowed to submit batch scans
+    BATCH_MAX_ENTRIES: int = 500
+    BATCH_MAX_AGE: float = 120.0  # seconds a gateway may hold a scan before forwarding
+    BATCH_CLOCK_SKEW: float = 5.0  # seconds a gateway's scanned_at may run ahead of this server (clamped to now)
+
+@dataclass
+class LoggingSettings:
+    """Logging configuration"""
+    LEVEL: str = "INFO"
+    FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    QUEUE_SIZE: int = 10000  # Records buffered for the writer thread before dropping
+    FILE_NAME: str = "attendance.log"  # In the logs directory
+    ROTATE_INTERVAL: float = 0  # seconds between rotations; 0 rotates at local midnight
+    MAX_BYTES: int = 10 * 1024 * 1024  # Also rotate when the file reaches this size (0 disables)
+    BACKUP_COUNT: int = 30  # Rotated files kept
+    COMPRESS: bool = True  # gzip rotated files in the background
+    JSON_LINES: bool = False  # Write the file as one JSON object per line
 
 @dataclass
 class AppSettings:
     """Application settings"""
     VERSION: str = "BETA"
     TITLE: str = "Smart Attendance System"
-    QR_REFRESH_INTERVAL: int = 5  # seconds
+    QR_REFRESH_INTERVAL: float = 5  # seconds
+    QR_MIN_REFRESH_INTERVAL: float = 0.5  # Shortest rotation the scheduler allows
     QR_SIZE: tuple = (350, 350)
+    QR_ENCODING: str = "legacy"  # "legacy" (http://ip:port/scan/ATTEND-...) or "compact" (HTTP://IP:PORT/S/<8 chars>)
+    QR_BORDER: int = 4  # Quiet-zone modules around the code
+    QR_ERROR_CORRECTION: str = "M"  # L, M, Q or H (7/15/25/30% of modules recoverable)
+    QR_MASK_PATTERN: Optional[int] = None  # 0-7 pins the mask (~5x faster render); None picks the most readable
+    QR_IP_CACHE_TTL: float = 60.0  # seconds the scan URL's host IP is reused before re-detecting
+    QR_PREFETCH_DEPTH: int = 3  # Upcoming frames rendered ahead of their window
+    QR_PREFETCH_WORKERS: int = 2  # Threads rendering upcoming frames
+    QR_ADAPTIVE_INTERVAL: bool = False  # Let scan load move the interval between the bounds below
+    QR_ADAPTIVE_MIN_INTERVAL: float = 3.0  # seconds; used while scans flow without trouble
+    QR_ADAPTIVE_MAX_INTERVAL: float = 15.0  # seconds; reached under a rush or when the room is idle
+    QR_ADAPTIVE_EVAL_PERIOD: float = 10.0  # seconds of scan statistics behind each adjustment
+    QR_ADAPTIVE_EXPIRED_RATIO: float = 0.1  # Share of expired-token scans that lengthens the interval
+    QR_ADAPTIVE_QUEUE_DEPTH: int = 8  # Admission queue depth that lengthens the interval
+    QR_ADAPTIVE_IDLE_RATE: float = 0.05  # scans/s below which the room counts as idle
     WINDOW_SIZE: tuple = (900, 700)
     SIDEBAR_WIDTH: int = 250
 
 # Global configuration instances
 database_config = DatabaseSettings()
 server_config = ServerSettings()
+logging_config = LoggingSettings()
 app_settings = AppSettings()
 
 def create_directories():
@@ -0,0 +1,109 @@
+"""
+Adaptive Interval - Move the QR refresh interval with scan load between configured bounds
+smart_attendance_system/src/attendance/core/adaptive_interval.py
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from ..config.settings import app_settings
+from .metrics import metrics_registry, SCAN_OUTCOMES
+
+logger = logging.getLogger(__name__)
+
+ScanLoad = Tuple[Dict[str, float], int]  # Scan totals by outcome, admission queue depth
+
+QR_INTERVAL_CHANGES = metrics_registry.counter(
+    "attendance_qr_interval_changes_total", "Adaptive QR interval adjustments", ("direction",))
+
+GROW_FACTOR = 1.5  # Under a rush or when idle
+SHRINK_FACTOR = 0.8  # While scans flow without trouble
+INTERVAL_STEP = 0.5  # seconds; intervals are rounded to this so tokens keep short suffixes
+MIN_SCANS = 10  # Scans an evaluation period needs before the expired ratio means anything
+
+def local_scan_load() -> ScanLoad:
+    """Scan totals recorded in this process (no admission queue to report)"""
+    return {key[0]: value for key, value in SCAN_OUTCOMES.values().items()}, 0
+
+@dataclass
+class LoadSample:
+    """Scan load over one evaluation period"""
+    scan_rate: float  # scans/s
+    expired_ratio: float  # Share of scans that presented an expired or unknown token
+    queue_depth: int  # Deepest admission queue seen during the period
+    scans: int
+
+class AdaptiveIntervalController:
+    """Chooses the next refresh interval from scan rate, expired-token ratio and queue depth
+
+    Scans bunched at rotation boundaries show up as expired tokens and a
+    deep admission queue; the interval then grows so fewer scans straddle a
+    rotation. An idle room also grows it, since nobody needs fresh frames.
+    Healthy traffic shrinks it back towards the minimum, which limits code
+    sharing. Call observe() after every rotation; it returns a new interval
+    at most once per evaluation period.
+    """
+
+    def __init__(self, interval: float = app_settings.QR_REFRESH_INTERVAL,
+                 min_interval: float = app_settings.QR_ADAPTIVE_MIN_INTERVAL,
+                 max_interval: float = app_settings.QR_ADAPTIVE_MAX_INTERVAL,
+                 period: float = app_settings.QR_ADAPTIVE_EVAL_PERIOD,
+                 load: Optional[Callable[[], ScanLoad]] = None):
+        self.min_interval = max(app_settings.QR_MIN_REFRESH_INTERVAL, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.interval = self._clamp(interval)
+        self.period = period
+        self.load = load or local_scan_load
+        self.last_sample: Optional[LoadSample] = None
+        self._period_start = time.monotonic()
+        self._outcomes, self._peak_queue = self.load()
+
+    def _clamp(self, interval: float) -> float:
+        rounded = round(interval / INTERVAL_STEP) * INTERVAL_STEP
+        return min(self.max_interval, max(self.min_interval, rounded))
+
+    def observe(self) -> Optional[float]:
+        """Sample load; the new interval when it should change, else None"""
+        outcomes, queue_depth = self.load()
+        self._peak_queue = max(self._peak_queue, queue_depth)
+        now = time.monotonic()
+        elapsed = now - self._period_start
+        if elapsed < self.period:
+            return None
+
+        scans = sum(outcomes.values()) - sum(self._outcomes.values())
+        expired = outcomes.get("expired", 0.0) - self._outcomes.get("expired", 0.0)
+        sample = LoadSample(scans / elapsed, expired / scans if scans else 0.0, self._peak_queue, int(scans))
+        self.last_sample = sample
+        self._period_start, self._outcomes, self._peak_queue = now, outcomes, 0
+
+        interval = self._clamp(self.interval * self._factor(sample))
+        if interval == self.interval:
+            return None
+        QR_INTERVAL_CHANGES.inc("up" if interval > self.interval else "down")
+        logger.info("⏱️ QR interval %.1f s -> %.1f s (%.2f scans/s, %.0f%% expired, queue %d)",
+                    self.interval, interval, sample.scan_rate, sample.expired_ratio * 100, sample.queue_depth)
+        self.interval = interval
+        return interval
+
+    def _factor(self, sample: LoadSample) -> float:
+        crowded = sample.queue_depth >= app_settings.QR_ADAPTIVE_QUEUE_DEPTH
+        expiring = sample.scans >= MIN_SCANS and sample.expired_ratio >= app_settings.QR_ADAPTIVE_EXPIRED_RATIO
+        if crowded or expiring or sample.scan_rate < app_settings.QR_ADAPTIVE_IDLE_RATE:
+            return GROW_FACTOR
+        # Shrink only well clear of the thresholds, so the interval does not flap
+        if sample.expired_ratio < app_settings.QR_ADAPTIVE_EXPIRED_RATIO / 2 and sample.queue_depth == 0:
+            return SHRINK_FACTOR
+        return 1.0
+
+    def stats(self) -> Dict[str, float]:
+        sample = self.last_sample
+        return {
+            "interval": self.interval,
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "scan_rate": round(sample.scan_rate, 3) if sample else 0.0,
+            "expired_ratio": round(sample.expired_ratio, 3) if sample else 0.0,
+            "queue_depth": sample.queue_depth if sample else 0
+        }
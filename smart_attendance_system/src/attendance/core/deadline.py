@@ -0,0 +1,44 @@
+"""
+Request Deadlines - Per-thread time budget carried from a scan down to its database calls
+smart_attendance_system/src/attendance/core/deadline.py
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .metrics import metrics_registry
+
+DEADLINE_EXCEEDED = metrics_registry.counter(
+    "attendance_deadline_exceeded_total", "Work abandoned because its request deadline had passed", ("phase",))
+
+_local = threading.local()
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before (or while) a phase runs"""
+
+    def __init__(self, phase: str):
+        super().__init__(f"deadline exceeded before {phase}")
+        self.phase = phase
+
+@contextmanager
+def deadline_scope(deadline: float) -> Iterator[None]:
+    """Run the block under a monotonic deadline; nested scopes can only tighten it"""
+    previous = getattr(_local, 'deadline', None)
+    _local.deadline = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None when it has no deadline"""
+    deadline = getattr(_local, 'deadline', None)
+    return None if deadline is None else deadline - time.monotonic()
+
+def check(phase: str):
+    """Abandon the request if its deadline has passed"""
+    left = remaining()
+    if left is not None and left <= 0:
+        DEADLINE_EXCEEDED.inc(phase)
+        raise DeadlineExceeded(phase)
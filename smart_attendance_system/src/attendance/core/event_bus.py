@@ -0,0 +1,135 @@
+"""
+Event Bus - In-process pub/sub for live attendance events
+smart_attendance_system/src/attendance/core/event_bus.py
+"""
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Deque, Tuple
+
+from ..config.settings import server_config
+from ..utils.json_codec import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class AttendanceEvent:
+    """Single published event, serialized once for every subscriber"""
+    id: int
+    type: str
+    data: Dict[str, Any]
+    frame: bytes = field(repr=False)  # Pre-built Server-Sent Events frame
+
+def _build_frame(event_id: int, event_type: str, data: Dict[str, Any]) -> bytes:
+    """Build a Server-Sent Events frame"""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event_type.encode('ascii'), dumps_bytes(data))
+
+class EventSubscription:
+    """Bounded per-subscriber queue; the oldest events are dropped for slow consumers"""
+
+    def __init__(self, bus: "AttendanceEventBus", max_queue: int):
+        self._bus = bus
+        self._max_queue = max_queue
+        self._queue: Deque[AttendanceEvent] = deque()
+        self._condition = threading.Condition()
+        self._dropped = 0
+        self.closed = False
+
+    def _offer(self, event: AttendanceEvent):
+        """Queue an event, dropping the oldest one when full"""
+        with self._condition:
+            if self.closed:
+                return
+            if len(self._queue) >= self._max_queue:
+                self._queue.popleft()
+                self._dropped += 1
+            self._queue.append(event)
+            self._condition.notify()
+
+    def _note_gap(self, missed: int):
+        """Record events lost before this subscription started"""
+        with self._condition:
+            self._dropped += missed
+
+    def get(self, timeout: Optional[float] = None) -> Optional[List[AttendanceEvent]]:
+        """Wait for pending events; returns [] on timeout and None once closed"""
+        with self._condition:
+            if not self._queue and not self.closed:
+                self._condition.wait(timeout)
+            if self.closed and not self._queue:
+                return None
+
+            events = list(self._queue)
+            self._queue.clear()
+
+            # Coalesce everything that was dropped into a single notice
+            if self._dropped:
+                last_id = events[0].id - 1 if events else self._bus.last_event_id
+                notice = {"dropped": self._dropped}
+                events.insert(0, AttendanceEvent(last_id, "lagged", notice, _build_frame(last_id, "lagged", notice)))
+                self._dropped = 0
+            return events
+
+    def close(self):
+        """Stop receiving events"""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+        self._bus._unsubscribe(self)
+
+class AttendanceEventBus:
+    """Publishes attendance events to any number of subscribers"""
+
+    def __init__(self, history_size: int = server_config.EVENT_HISTORY_SIZE,
+                 queue_size: int = server_config.EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._history: Deque[AttendanceEvent] = deque(maxlen=history_size)
+        self._subscribers: Tuple[EventSubscription, ...] = ()
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    @property
+    def last_event_id(self) -> int:
+        """Id of the most recently published event"""
+        return self._next_id - 1
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> AttendanceEvent:
+        """Publish an event to history and all subscribers"""
+        with self._lock:
+            event = AttendanceEvent(self._next_id, event_type, data, _build_frame(self._next_id, event_type, data))
+            self._next_id += 1
+            self._history.append(event)
+            for subscription in self._subscribers:
+                subscription._offer(event)
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None,
+                  queue_size: Optional[int] = None) -> EventSubscription:
+        """Subscribe, replaying history newer than last_event_id when resuming"""
+        subscription = EventSubscription(self, queue_size or self.queue_size)
+
+        with self._lock:
+            if last_event_id is not None:
+                if self._history and last_event_id < self._history[0].id - 1:
+                    subscription._note_gap(self._history[0].id - 1 - last_event_id)
+                for event in self._history:
+                    if event.id > last_event_id:
+                        subscription._offer(event)
+            self._subscribers = self._subscribers + (subscription,)
+
+        logger.debug("📡 Event subscriber added (%d active)", len(self._subscribers))
+        return subscription
+
+    def _unsubscribe(self, subscription: EventSubscription):
+        """Remove a subscription"""
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of active subscribers"""
+        return len(self._subscribers)
+
+# Global event bus instance
+attendance_events = AttendanceEventBus()
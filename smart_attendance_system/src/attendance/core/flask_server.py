@@ -2,32 +2,239 @@
 Flask Server - Handle QR code scanning requests
 smart_attendance_system/src/attendance/core/flask_server.py
 """
-from flask import Flask, jsonify, request
-from datetime import datetime
+from flask import Flask, Response, jsonify, request
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http import HTTPStatus
+import hmac
+import ipaddress
 import logging
+import math
 import threading
 import socket
-from typing import Optional, Dict, Any, Tuple
+import time
+from typing import Optional, Tuple, Callable, Iterable, Set, List, Dict, Any
+from werkzeug.serving import make_server, BaseWSGIServer
+from werkzeug.wsgi import ClosingIterator
 
-from ..database.db_manager import database_manager
+from .metrics import metrics_registry, SCAN_OUTCOMES, SCAN_LATENCY, SCANS_IN_FLIGHT
+from .tracing import tracer
+from .event_bus import AttendanceEventBus, EventSubscription, attendance_events
+from .admission import AdmissionController
+from . import deadline
+from .deadline import DeadlineExceeded, deadline_scope
+from .session_registry import SessionRegistry, AttendanceSession, DEFAULT_SESSION_ID
+from .shared_state import SharedState, SharedStateError, create_shared_state
+from .worker_pool import WorkerPoolWSGIServer
+from .qr_frames import CONTENT_TYPES, DISPLAY_PAGE, QRFrameCache
+from .rotation_scheduler import RotationScheduler
+from .adaptive_interval import AdaptiveIntervalController, ScanLoad, local_scan_load
+from ..database.db_manager import DatabaseManager, database_manager
 from ..config.settings import server_config
+from ..utils.json_codec import dumps_bytes
 
 logger = logging.getLogger(__name__)
 
+Headers = Tuple[Tuple[str, str], ...]
+
+SCAN_PATH_PREFIX = "/scan/"
+COMPACT_SCAN_PATH_PREFIX = "/S/"  # Short uppercase path used by compact QR codes
+JSON_CONTENT_TYPE = "application/json"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4"
+SSE_RETRY_FRAME = b"retry: 3000\n\n"
+SSE_KEEPALIVE_FRAME = b": keep-alive\n\n"
+NETWORK_CACHE_TTL = 30.0  # seconds between local IP lookups
+SHUTDOWN_POLL_INTERVAL = 0.1  # seconds; bounds how long shutdown() waits for the accept loop
+
+# Constant responses are serialized once at import time
+TOKEN_INVALID_BODY = dumps_bytes({
+    "status": "⏰ QR Code Expired",
+    "error": "TOKEN_INVALID",
+    "message": "Please scan the latest QR code"
+})
+NETWORK_BLOCKED_BODY = dumps_bytes({
+    "status": "🚫 Access Denied",
+    "error": "NETWORK_BLOCKED",
+    "message": "Access from this network is not allowed"
+})
+DB_ERROR_BODY = dumps_bytes({
+    "status": "⚠️ Database Error",
+    "error": "DB_ERROR",
+    "message": "Failed to record attendance"
+})
+SERVER_ERROR_BODY = dumps_bytes({
+    "status": "💥 Server Error",
+    "error": "SERVER_ERROR",
+    "message": "Internal server error"
+})
+
+GATEWAY_UNTRUSTED_BODY = dumps_bytes({
+    "status": "🚫 Access Denied",
+    "error": "GATEWAY_UNTRUSTED",
+    "message": "This gateway may not submit batch scans"
+})
+BATCH_INVALID_BODY = dumps_bytes({
+    "status": "⚠️ Invalid Batch",
+    "error": "BATCH_INVALID",
+    "message": f"Expected 'entries': a list of up to {server_config.BATCH_MAX_ENTRIES} [token, ip, scanned_at] items"
+})
+
+SERVER_BUSY_BODY = dumps_bytes({
+    "status": "⏳ Server Busy",
+    "error": "SERVER_BUSY",
+    "message": "Too many scans right now, please scan the next QR code"
+})
+
+RATE_LIMITED_BODY = dumps_bytes({
+    "status": "🐢 Too Many Scans",
+    "error": "RATE_LIMITED",
+    "message": "Too many scans from this device, please wait a minute"
+})
+
+DEADLINE_EXCEEDED_BODY = dumps_bytes({
+    "status": "⏳ Server Busy",
+    "error": "DEADLINE_EXCEEDED",
+    "message": "This scan took too long, please scan the latest QR code"
+})
+
+QR_NOT_READY_BODY = dumps_bytes({
+    "status": "🔄 QR Not Ready",
+    "error": "QR_NOT_READY",
+    "message": "No QR code is being shown yet"
+})
+
+_STATUS_LINES = {status.value: f"{status.value} {status.phrase}" for status in HTTPStatus}
+
+@lru_cache(maxsize=1024)
+def device_unknown_body(client_ip: str) -> bytes:
+    """Serialized DEVICE_UNKNOWN response, cached per device"""
+    return dumps_bytes({
+        "status": "❓ Device Not Registered",
+        "error": "DEVICE_UNKNOWN",
+        "message": f"Device {client_ip} is not registered",
+        "ip": client_ip
+    })
+
+@lru_cache(maxsize=1024)
+def already_recorded_body(regno: str, room: str) -> bytes:
+    """Serialized ALREADY_RECORDED response, cached per student and room"""
+    return dumps_bytes({
+        "status": "✅ Already Recorded",
+        "error": "ALREADY_RECORDED",
+        "message": f"Attendance for {regno} was already recorded",
+        "room": room
+    })
+
+class ScanFastPathMiddleware:
+    """WSGI middleware answering /scan/<token> and /S/<token> without Flask dispatch"""
+
+    def __init__(self, server: "AttendanceFlaskServer", wsgi_app: Callable):
+        self.server = server
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        path = environ.get('PATH_INFO', '')
+        prefix = SCAN_PATH_PREFIX if path.startswith(SCAN_PATH_PREFIX) else COMPACT_SCAN_PATH_PREFIX
+        if path.startswith(prefix) and environ.get('REQUEST_METHOD') in ('GET', 'POST'):
+            token = path[len(prefix):]
+            if token and '/' not in token:
+                body, status, headers = self.server.process_scan(token, environ.get('REMOTE_ADDR', ''))
+                start_response(_STATUS_LINES[status], [
+                    ('Content-Type', JSON_CONTENT_TYPE),
+                    ('Content-Length', str(len(body))),
+                    *headers
+                ])
+                return [body]
+
+        return self.wsgi_app(environ, start_response)
+
+class InFlightTracker:
+    """WSGI middleware counting requests whose responses are still open"""
+
+    def __init__(self, wsgi_app: Callable):
+        self.wsgi_app = wsgi_app
+        self.count = 0
+        self._condition = threading.Condition()
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        with self._condition:
+            self.count += 1
+        try:
+            response = self.wsgi_app(environ, start_response)
+        except BaseException:
+            self._finished()
+            raise
+        return ClosingIterator(response, self._finished)
+
+    def _finished(self):
+        with self._condition:
+            self.count -= 1
+            if self.count == 0:
+                self._condition.notify_all()
+
+    def wait_idle(self, deadline: float) -> bool:
+        """Wait until no requests are in flight or the monotonic deadline passes"""
+        with self._condition:
+            while self.count > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
 class AttendanceFlaskServer:
     """Flask server for handling QR scan requests"""
 
-    def __init__(self):
+    def __init__(self, db: Optional[DatabaseManager] = None,
+                 event_bus: Optional[AttendanceEventBus] = None,
+                 sessions: Optional[SessionRegistry] = None,
+                 shared_state: Optional[SharedState] = None):
         self.app = Flask(__name__)
-        self.app.logger.disabled = True  # Disable Flask logging
+        # app.logger is this module's logger (same name), so it stays enabled: scan outcomes are logged through it
 
-        self.current_token: Optional[str] = None
-        self.token_expiry: Optional[datetime] = None
+        self.db = db or database_manager
+        self.event_bus = event_bus or attendance_events
+        self._event_streams: Set[EventSubscription] = set()
+        # Tokens, present sets and rate counters; shared when several nodes serve one hall
+        self.shared_state = shared_state or create_shared_state()
+        self.sessions = sessions or SessionRegistry(self.shared_state)
+        self.admission = AdmissionController()
+        # QR images for extra displays (projector, corridor screen), encoded once per rotation
+        self.qr_frames = QRFrameCache()
+        self._qr_waiters = 0
+        self._qr_waiters_lock = threading.Lock()
+        self.rotation: Optional[RotationScheduler] = None  # Schedule of whoever rotates the default token
+        self.interval_controller: Optional[AdaptiveIntervalController] = None  # Set when the interval adapts to load
         self.server_thread: Optional[threading.Thread] = None
+        self.http_server: Optional[BaseWSGIServer] = None
+        self.host = server_config.HOST
+        self.port = server_config.PORT
+        self.serving_mode = server_config.SERVING_MODE
         self.is_running = False
 
+        # Explicit allowed subnet, otherwise the server's own /24 (cached)
+        self.allowed_network = ipaddress.ip_network(server_config.ALLOWED_SUBNET) if server_config.ALLOWED_SUBNET else None
+        self._server_network: Optional[str] = None
+        self._server_network_checked = 0.0
+
         self._setup_routes()
 
+        if server_config.SCAN_FAST_PATH:
+            self.app.wsgi_app = ScanFastPathMiddleware(self, self.app.wsgi_app)
+
+        # Outermost, so draining on stop() sees every request
+        self._in_flight = InFlightTracker(self.app.wsgi_app)
+        self.app.wsgi_app = self._in_flight
+
+    @property
+    def current_token(self) -> Optional[str]:
+        """Token of the default (main window) session"""
+        return self.sessions.default_session.token
+
+    @property
+    def token_expiry(self) -> Optional[datetime]:
+        return self.sessions.default_session.expiry
+
     def get_local_ip(self) -> str:
         """Get local machine IP address"""
         try:
@@ -41,8 +248,11 @@ class AttendanceFlaskServer:
         """Setup Flask routes"""
 
         @self.app.route("/scan/<token>", methods=['GET', 'POST'])
+        @self.app.route("/S/<token>", methods=['GET', 'POST'])
         def handle_scan(token: str):
-            return self._process_scan(token)
+            # Only reached when the fast path middleware is disabled
+            body, status, headers = self.process_scan(token, request.remote_addr)
+            return Response(body, status=status, headers=headers, mimetype=JSON_CONTENT_TYPE)
 
         @self.app.route("/health")
         def health_check():
@@ -56,148 +266,573 @@ class AttendanceFlaskServer:
         def api_status():
             return jsonify({
                 "server": "online",
-                "database": "online" if database_manager.connection else "offline",
+                "database": "online" if self.db.connection else "offline",
                 "current_token": self.current_token[-8:] if self.current_token else None,
-                "expires": self.token_expiry.isoformat() if self.token_expiry else None
+                "expires": self.token_expiry.isoformat() if self.token_expiry else None,
+                "admission": self.admission.stats(),
+                "serving": self._serving_stats(),
+                "rotation": self.rotation.stats() if self.rotation else None,
+                "adaptive_interval": self.interval_controller.stats() if self.interval_controller else None
             })
 
-    def _process_scan(self, token: str) -> Tuple[Dict[str, Any], int]:
-        """Process QR code scan request"""
-        client_ip = request.remote_addr
-        logger.info(f"📱 Scan request from {client_ip} with token {token}")
+        @self.app.route("/api/scan/batch", methods=['POST'])
+        def handle_scan_batch():
+            payload = request.get_json(silent=True)
+            # Anything but a JSON object (a bare list, a number) is rejected like a missing entries list
+            entries = payload.get("entries") if isinstance(payload, dict) else None
+            body, status, headers = self.process_batch(entries, request.remote_addr)
+            return Response(body, status=status, headers=headers, mimetype=JSON_CONTENT_TYPE)
 
-        # Validate token
-        if not self._is_token_valid(token):
-            logger.warning(f"⏰ Invalid/expired token from {client_ip}")
-            return jsonify({
-                "status": "⏰ QR Code Expired",
-                "error": "TOKEN_INVALID",
-                "message": "Please scan the latest QR code"
-            }), 403
+        @self.app.route("/api/sessions", methods=['GET'])
+        def list_sessions():
+            if not self._is_admin_request():
+                return jsonify({"error": "FORBIDDEN", "message": "Session management is local only"}), 403
+            return jsonify({"sessions": [session.to_dict(include_token=True) for session in self.sessions.sessions()]})
+
+        @self.app.route("/api/sessions", methods=['POST'])
+        def create_session():
+            if not self._is_admin_request():
+                return jsonify({"error": "FORBIDDEN", "message": "Session management is local only"}), 403
+            payload = request.get_json(silent=True)
+            if payload is None:
+                payload = {}
+            if not isinstance(payload, dict):
+                return jsonify({"error": "INVALID_SESSION", "message": "Expected a JSON object"}), 400
+            room = str(payload.get("room", "")).strip()
+            if not room:
+                return jsonify({"error": "ROOM_REQUIRED", "message": "A room name is required"}), 400
+            try:
+                session = self.sessions.create_session(
+                    room,
+                    float(payload["interval"]) if payload.get("interval") else None,
+                    payload.get("allowed_subnet")
+                )
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": "INVALID_SESSION", "message": str(e)}), 400
+            return jsonify(session.to_dict(include_token=True)), 201
+
+        @self.app.route("/api/sessions/<session_id>", methods=['DELETE'])
+        def delete_session(session_id: str):
+            if not self._is_admin_request():
+                return jsonify({"error": "FORBIDDEN", "message": "Session management is local only"}), 403
+            if not self.sessions.remove_session(session_id):
+                return jsonify({"error": "SESSION_NOT_FOUND", "message": f"No removable session {session_id}"}), 404
+            return jsonify({"status": "closed", "session_id": session_id})
+
+        @self.app.route("/metrics")
+        def metrics():
+            return Response(metrics_registry.render(), mimetype=METRICS_CONTENT_TYPE)
+
+        @self.app.route("/events")
+        def event_stream():
+            # Names and register numbers of arriving students: same audience as the live QR
+            if not self._is_display_allowed():
+                return Response(NETWORK_BLOCKED_BODY, status=403, mimetype=JSON_CONTENT_TYPE)
+            return self._stream_events(request.headers.get("Last-Event-ID") or request.args.get("last_event_id"))
+
+        @self.app.route("/qr")
+        def qr_display():
+            if not self._is_display_allowed():
+                return Response(NETWORK_BLOCKED_BODY, status=403, mimetype=JSON_CONTENT_TYPE)
+            return Response(DISPLAY_PAGE, mimetype="text/html")
+
+        @self.app.route("/qr/current.<image_format>")
+        def qr_current(image_format: str):
+            return self._serve_qr_frame(image_format)
+
+        @self.app.route("/qr/next")
+        def qr_next():
+            return self._wait_qr_frame(request.args.get("etag"))
+
+    def _is_admin_request(self) -> bool:
+        """Management endpoints are only served to the local machine"""
+        return request.remote_addr in ("127.0.0.1", "::1")
+
+    def _is_display_allowed(self) -> bool:
+        """Whoever can fetch the live QR can scan without seeing the screen: only this machine and configured displays"""
+        if self._is_admin_request() or request.remote_addr in server_config.QR_DISPLAY_IPS:
+            return True
+        key = server_config.QR_DISPLAY_KEY
+        return bool(key) and hmac.compare_digest(request.args.get("key", "").encode('utf-8'), key.encode('utf-8'))
+
+    def _serve_qr_frame(self, image_format: str) -> Response:
+        """Current QR as PNG or SVG, cacheable until the token rotates"""
+        if image_format not in CONTENT_TYPES:
+            return Response(status=404)
+        if not self._is_display_allowed():
+            return Response(NETWORK_BLOCKED_BODY, status=403, mimetype=JSON_CONTENT_TYPE)
+        session = self.sessions.default_session
+        token, expiry = session.token, session.expiry
+        if not token or not session.is_current():
+            return Response(QR_NOT_READY_BODY, status=503, headers=(("Retry-After", "1"),),
+                            mimetype=JSON_CONTENT_TYPE)
+
+        frame = self.qr_frames.frame(token, expiry, image_format, self.port)
+        if request.if_none_match.contains(frame.etag):
+            response = Response(status=304)
+        else:
+            response = Response(frame.bodies[image_format], mimetype=CONTENT_TYPES[image_format])
+        response.set_etag(frame.etag)
+        # Fresh until the token expires; revalidating afterwards is a cheap 304 if it has not rotated
+        response.headers["Cache-Control"] = f"private, max-age={max(0, int((expiry - datetime.now()).total_seconds()))}"
+        return response
+
+    def _wait_qr_frame(self, etag: Optional[str]) -> Response:
+        """Long-poll: answer as soon as the frame differs from etag, or 204 after QR_LONG_POLL_TIMEOUT"""
+        if not self._is_display_allowed():
+            return Response(NETWORK_BLOCKED_BODY, status=403, mimetype=JSON_CONTENT_TYPE)
+        with self._qr_waiters_lock:
+            # Like event streams, a waiting poll occupies a pool worker
+            if (isinstance(self.http_server, WorkerPoolWSGIServer)
+                    and self._qr_waiters >= server_config.MAX_EVENT_STREAMS):
+                return Response(SERVER_BUSY_BODY, status=503, headers=(("Retry-After", "5"),),
+                                mimetype=JSON_CONTENT_TYPE)
+            self._qr_waiters += 1
+        try:
+            current = self.qr_frames.wait_for_change(etag, server_config.QR_LONG_POLL_TIMEOUT)
+        finally:
+            with self._qr_waiters_lock:
+                self._qr_waiters -= 1
+        if current is None:
+            return Response(status=204, headers={"Cache-Control": "no-store"})
+        expiry = self.token_expiry
+        return Response(dumps_bytes({
+            "etag": current,
+            "expires": expiry.isoformat() if expiry else None,
+            "png": "/qr/current.png",
+            "svg": "/qr/current.svg"
+        }), headers={"Cache-Control": "no-store"}, mimetype=JSON_CONTENT_TYPE)
+
+    def _serving_stats(self) -> Dict[str, Any]:
+        if isinstance(self.http_server, WorkerPoolWSGIServer):
+            return self.http_server.stats()
+        return {"mode": self.serving_mode}
+
+    def _stream_events(self, last_event_id: Optional[str]) -> Response:
+        """Server-Sent Events stream of attendance events"""
+        # In pool mode a stream occupies a worker for its lifetime, so cap them
+        if (isinstance(self.http_server, WorkerPoolWSGIServer)
+                and len(self._event_streams) >= server_config.MAX_EVENT_STREAMS):
+            return Response(SERVER_BUSY_BODY, status=503, headers=(("Retry-After", "30"),),
+                            mimetype=JSON_CONTENT_TYPE)
+
+        try:
+            resume_from = int(last_event_id) if last_event_id else None
+        except ValueError:
+            resume_from = None
+
+        subscription = self.event_bus.subscribe(resume_from)
+        self._event_streams.add(subscription)
+
+        def generate():
+            try:
+                yield SSE_RETRY_FRAME
+                while True:
+                    events = subscription.get(timeout=server_config.SSE_HEARTBEAT_INTERVAL)
+                    if events is None:
+                        break
+                    if not events:
+                        yield SSE_KEEPALIVE_FRAME
+                        continue
+                    yield b"".join(event.frame for event in events)
+            finally:
+                subscription.close()
+                self._event_streams.discard(subscription)
+
+        return Response(generate(), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+
+    def process_scan(self, token: str, client_ip: str) -> Tuple[bytes, int, Headers]:
+        """Process QR code scan request, returning serialized body, status and extra headers"""
+        started = time.perf_counter()
+        SCANS_IN_FLIGHT.inc()
+        try:
+            with tracer.trace("scan", ip=client_ip):
+                body, status, outcome, headers = self._handle_scan(token, client_ip)
+                tracer.annotate(outcome=outcome, status=status)
+        finally:
+            SCANS_IN_FLIGHT.dec()
+
+        SCAN_OUTCOMES.inc(outcome)
+        SCAN_LATENCY.observe(time.perf_counter() - started)
+        return body, status, headers
+
+    def _handle_scan(self, token: str, client_ip: str) -> Tuple[bytes, int, str, Headers]:
+        """Validate and record a scan, returning body, status, outcome and extra headers"""
+        with tracer.span("log"):
+            logger.info("📱 Scan request from %s with token %s", client_ip, token)
+
+        # Validate token and find its session
+        with tracer.span("token_check"):
+            session = self.sessions.resolve(token)
+        if session is None:
+            logger.warning("⏰ Invalid/expired token from %s", client_ip)
+            return TOKEN_INVALID_BODY, 403, "expired", ()
 
         # Validate network (same subnet)
-        if not self._is_network_allowed(client_ip):
-            logger.warning(f"🚫 Access blocked from {client_ip}")
-            return jsonify({
-                "status": "🚫 Access Denied", 
-                "error": "NETWORK_BLOCKED",
-                "message": "Access from this network is not allowed"
-            }), 403
+        with tracer.span("network_check"):
+            network_allowed = self._is_network_allowed(client_ip, session)
+        if not network_allowed:
+            logger.warning("🚫 Access blocked from %s", client_ip)
+            return NETWORK_BLOCKED_BODY, 403, "blocked", ()
 
-        # Process attendance
-        return self._mark_student_attendance(client_ip)
+        # Per-device rate limit, counted across every node
+        if server_config.SCAN_RATE_LIMIT and self._is_rate_limited(client_ip):
+            logger.warning("🐢 Rate limit hit by %s", client_ip)
+            return RATE_LIMITED_BODY, 429, "rate_limited", (("Retry-After", "60"),)
 
-    def _is_token_valid(self, token: str) -> bool:
-        """Check if token is valid and not expired"""
-        if not self.current_token or not self.token_expiry:
-            return False
+        # The scan is only useful while its token window lasts; everything below shares that budget
+        with deadline_scope(time.monotonic() + self._scan_budget(session)):
+            # Admission control: shed instead of queueing without bound when the DB is slow
+            with tracer.span("admission"):
+                admitted = self.admission.try_acquire(deadline.remaining())
+            if admitted is None:
+                logger.warning("⏳ Scan from %s shed under load", client_ip)
+                return SERVER_BUSY_BODY, 503, "shed", (("Retry-After", str(self._retry_after(session))),)
+
+            # Process attendance
+            try:
+                body, status, outcome = self._mark_student_attendance(client_ip, session)
+            finally:
+                self.admission.release(admitted)
+        if outcome == "deadline":
+            return body, status, outcome, (("Retry-After", str(self._retry_after(session))),)
+        return body, status, outcome, ()
 
-        if token != self.current_token:
+    def _scan_budget(self, session: AttendanceSession) -> float:
+        """Seconds a scan may take: the rest of its token window, with a floor"""
+        if session.expiry is None:
+            return server_config.SCAN_MIN_BUDGET
+        left = (session.expiry - datetime.now()).total_seconds()
+        return max(left, server_config.SCAN_MIN_BUDGET)
+
+    def _is_rate_limited(self, client_ip: str) -> bool:
+        """Whether the device exceeded SCAN_RATE_LIMIT this minute; fails open if state is unreachable"""
+        try:
+            with tracer.span("rate_limit"):
+                return self.shared_state.hit_rate(client_ip, 60) > server_config.SCAN_RATE_LIMIT
+        except SharedStateError as e:
+            logger.error("❌ Rate limit check failed: %s", e)
             return False
 
-        return datetime.now() <= self.token_expiry
+    def _retry_after(self, session: AttendanceSession) -> int:
+        """Seconds until the session's next token window, so the retry scans a fresh code"""
+        if session.expiry is None:
+            return 1
+        return max(1, math.ceil((session.expiry - datetime.now()).total_seconds()))
+
+    def process_batch(self, entries: Any, gateway_ip: str) -> Tuple[bytes, int, Headers]:
+        """Record a gateway's [token, client_ip, scanned_at] entries in bulk"""
+        if gateway_ip not in server_config.TRUSTED_GATEWAYS:
+            logger.warning("🚫 Batch from untrusted gateway %s", gateway_ip)
+            return GATEWAY_UNTRUSTED_BODY, 403, ()
+        if not isinstance(entries, list) or len(entries) > server_config.BATCH_MAX_ENTRIES:
+            return BATCH_INVALID_BODY, 400, ()
+
+        # A whole batch takes one admission slot
+        admitted = self.admission.try_acquire()
+        if admitted is None:
+            logger.warning("⏳ Batch from gateway %s shed under load", gateway_ip)
+            return SERVER_BUSY_BODY, 503, (("Retry-After", "1"),)
+        try:
+            return self._record_batch(entries, gateway_ip), 200, ()
+        finally:
+            self.admission.release(admitted)
+
+    def _record_batch(self, entries: List[Any], gateway_ip: str) -> bytes:
+        """Validate entries in memory, then resolve students and insert in one round-trip each"""
+        logger.info("📦 Batch of %d scans from gateway %s", len(entries), gateway_ip)
+        results: List[Dict[str, Any]] = [None] * len(entries)
+        accepted: List[Tuple[int, str, datetime, AttendanceSession]] = []
+        now = datetime.now()
+        latest = now + timedelta(seconds=server_config.BATCH_CLOCK_SKEW)
+
+        # Validate tokens and networks without touching the database
+        for index, entry in enumerate(entries):
+            try:
+                token, client_ip, scanned_at = entry
+                scanned = datetime.fromtimestamp(float(scanned_at))
+                if not isinstance(client_ip, str):
+                    raise TypeError("client_ip must be a string")  # ip_address() also takes integers
+                ipaddress.ip_address(client_ip)
+            except (TypeError, ValueError, OverflowError, OSError):
+                results[index] = {"result": "INVALID_ENTRY"}
+                continue
+            if scanned > latest:
+                results[index] = {"result": "INVALID_ENTRY"}
+                continue
+            # A gateway clock slightly ahead is clamped; the row stores the time that was validated
+            scanned = min(scanned, now)
+
+            session = self.sessions.resolve_at(str(token), scanned)
+            if session is None:
+                results[index] = {"result": "TOKEN_INVALID"}
+                SCAN_OUTCOMES.inc("expired")
+            elif not self._is_network_allowed(client_ip, session):
+                results[index] = {"result": "NETWORK_BLOCKED"}
+                SCAN_OUTCOMES.inc("blocked")
+            else:
+                accepted.append((index, client_ip, scanned, session))
+
+        # Resolve every student in one query
+        students = self.db.get_students_by_ips(sorted({client_ip for _i, client_ip, _s, _ses in accepted}))
+        if students is None:
+            for index, *_rest in accepted:
+                results[index] = {"result": "DB_ERROR"}
+                SCAN_OUTCOMES.inc("db_error")
+            return dumps_bytes({"recorded": 0, "results": results})
+
+        candidates = []
+        for index, client_ip, scanned, session in accepted:
+            student = students.get(client_ip)
+            if student is None:
+                results[index] = {"result": "DEVICE_UNKNOWN"}
+                SCAN_OUTCOMES.inc("unknown")
+            else:
+                candidates.append((index, student, client_ip, scanned, session))
+
+        # Drop students already present on any node, one pipelined call per session
+        by_session: Dict[str, List[tuple]] = {}
+        for candidate in candidates:
+            by_session.setdefault(candidate[4].present_scope, []).append(candidate)
+        rows = []
+        recorded = []
+        for scope, group in by_session.items():
+            first_marks = self._mark_present_many(scope, [student["regno"] for _i, student, *_rest in group])
+            for candidate, first in zip(group, first_marks):
+                index, student, client_ip, scanned, session = candidate
+                if not first:
+                    results[index] = {"result": "DUPLICATE"}
+                    SCAN_OUTCOMES.inc("duplicate")
+                    continue
+                rows.append((student["regno"], student["name"], client_ip, scanned, session.session_id, session.room))
+                recorded.append(candidate)
+
+        # Insert every accepted scan in one transaction
+        success = self.db.mark_attendance_batch(rows)
+        for index, student, client_ip, scanned, session in recorded:
+            if success:
+                results[index] = {"result": "RECORDED", "regno": student["regno"]}
+                SCAN_OUTCOMES.inc("recorded")
+                self.event_bus.publish("attendance", {
+                    "regno": student["regno"],
+                    "name": student["name"],
+                    "timestamp": scanned.isoformat(' ', 'seconds'),
+                    "session_id": session.session_id,
+                    "room": session.room
+                })
+            else:
+                results[index] = {"result": "DB_ERROR"}
+                SCAN_OUTCOMES.inc("db_error")
+                self._unmark_present(session.present_scope, student["regno"])
+
+        return dumps_bytes({"recorded": len(recorded) if success else 0, "results": results})
+
+    def _mark_present_many(self, scope: str, regnos: List[str]) -> List[bool]:
+        """Mark students present in the shared set; repeats within the list count as duplicates"""
+        try:
+            return self.shared_state.mark_present_many(scope, regnos)
+        except SharedStateError as e:
+            # Prefer a possible double record over losing attendance
+            logger.error("❌ Present set unavailable, skipping dedup: %s", e)
+            seen = set()
+            first_marks = []
+            for regno in regnos:
+                first_marks.append(regno not in seen)
+                seen.add(regno)
+            return first_marks
+
+    def _unmark_present(self, scope: str, regno: str):
+        """Let a student whose insert failed scan again"""
+        try:
+            self.shared_state.unmark_present(scope, regno)
+        except SharedStateError as e:
+            logger.error("❌ Could not clear present mark for %s: %s", regno, e)
 
-    def _is_network_allowed(self, client_ip: str) -> bool:
+    def _get_server_network(self) -> str:
+        """Get server subnet (first 3 octets), refreshed periodically"""
+        now = time.monotonic()
+        if self._server_network is None or now - self._server_network_checked > NETWORK_CACHE_TTL:
+            self._server_network = self.get_local_ip().rsplit(".", 1)[0]
+            self._server_network_checked = now
+        return self._server_network
+
+    def _is_network_allowed(self, client_ip: str, session: Optional[AttendanceSession] = None) -> bool:
         """Check if client IP is from allowed network"""
         try:
-            server_ip = self.get_local_ip()
+            allowed_network = session.allowed_network if session and session.allowed_network else self.allowed_network
+            if allowed_network is not None:
+                return ipaddress.ip_address(client_ip) in allowed_network
             # Allow same subnet (first 3 octets)
-            client_network = ".".join(client_ip.split(".")[:3])
-            server_network = ".".join(server_ip.split(".")[:3])
-            return client_network == server_network
+            return client_ip.rsplit(".", 1)[0] == self._get_server_network()
         except Exception as e:
-            logger.error(f"❌ Network validation error: {e}")
+            logger.error("❌ Network validation error: %s", e)
             return False
 
-    def _mark_student_attendance(self, client_ip: str) -> Tuple[Dict[str, Any], int]:
+    def _mark_student_attendance(self, client_ip: str, session: AttendanceSession) -> Tuple[bytes, int, str]:
         """Mark attendance for student"""
+        student = None
         try:
             # Get student info
-            student = database_manager.get_student_by_ip(client_ip)
+            with tracer.span("get_student_by_ip"):
+                student = self.db.get_student_by_ip(client_ip)
 
             if not student:
-                logger.info(f"❓ Unknown device: {client_ip}")
-                return jsonify({
-                    "status": "❓ Device Not Registered",
-                    "error": "DEVICE_UNKNOWN",
-                    "message": f"Device {client_ip} is not registered",
-                    "ip": client_ip
-                }), 200
+                logger.info("❓ Unknown device: %s", client_ip)
+                return device_unknown_body(client_ip), 200, "unknown"
+
+            # Already recorded in this session, possibly through another node
+            with tracer.span("dedup"):
+                first_scan = self._mark_present_many(session.present_scope, [student["regno"]])[0]
+            if not first_scan:
+                logger.info("🔁 Duplicate scan: %s", student["regno"])
+                return already_recorded_body(student["regno"], session.room), 200, "duplicate"
 
             # Mark attendance
             attendance_time = datetime.now()
-            success = database_manager.mark_attendance(
-                student["regno"],
-                student["name"], 
-                client_ip,
-                attendance_time
-            )
+            with tracer.span("mark_attendance"):
+                success = self.db.mark_attendance(
+                    student["regno"],
+                    student["name"], 
+                    client_ip,
+                    attendance_time,
+                    session.session_id,
+                    session.room
+                )
 
             if success:
-                logger.info(f"✅ Attendance: {student['regno']} ({student['name']})")
-                return jsonify({
-                    "status": "✅ Attendance Recorded",
-                    "student": {
+                with tracer.span("log"):
+                    logger.info("✅ Attendance: %s (%s)", student["regno"], student["name"])
+                stamp = attendance_time.isoformat(' ', 'seconds')
+                with tracer.span("publish"):
+                    self.event_bus.publish("attendance", {
                         "regno": student["regno"],
-                        "name": student["name"]
-                    },
-                    "timestamp": attendance_time.strftime('%H:%M:%S'),
-                    "date": attendance_time.strftime('%Y-%m-%d')
-                }), 200
+                        "name": student["name"],
+                        "timestamp": stamp,
+                        "session_id": session.session_id,
+                        "room": session.room
+                    })
+                with tracer.span("serialize"):
+                    body = dumps_bytes({
+                        "status": "✅ Attendance Recorded",
+                        "student": {
+                            "regno": student["regno"],
+                            "name": student["name"]
+                        },
+                        "room": session.room,
+                        "timestamp": stamp[11:],
+                        "date": stamp[:10]
+                    })
+                return body, 200, "recorded"
             else:
-                return jsonify({
-                    "status": "⚠️ Database Error",
-                    "error": "DB_ERROR",
-                    "message": "Failed to record attendance"
-                }), 500
+                self._unmark_present(session.present_scope, student["regno"])
+                return DB_ERROR_BODY, 500, "db_error"
 
+        except DeadlineExceeded as e:
+            logger.warning("⌛ Deadline passed for scan from %s: %s", client_ip, e)
+            if student:
+                # The insert may not have happened; let the student scan again
+                self._unmark_present(session.present_scope, student["regno"])
+            return DEADLINE_EXCEEDED_BODY, 503, "deadline"
         except Exception as e:
-            logger.error(f"💥 Error processing attendance: {e}")
-            return jsonify({
-                "status": "💥 Server Error",
-                "error": "SERVER_ERROR", 
-                "message": "Internal server error"
-            }), 500
+            logger.error("💥 Error processing attendance: %s", e)
+            return SERVER_ERROR_BODY, 500, "server_error"
 
-    def update_token(self, token: str, expiry: datetime):
+    def scan_load(self) -> ScanLoad:
+        """Scan totals by outcome and the admission queue depth, for the adaptive interval"""
+        outcomes, _queue_depth = local_scan_load()
+        return outcomes, self.admission.queue_depth
+
+    def begin_run(self, run_id: Optional[str] = None, session_id: str = DEFAULT_SESSION_ID) -> str:
+        """Start a new lecture on session_id; students may be recorded again from now on"""
+        return self.sessions.begin_run(session_id, run_id)
+
+    def update_token(self, token: str, expiry: datetime, session_id: str = DEFAULT_SESSION_ID):
         """Update current token and expiry time"""
-        self.current_token = token
-        self.token_expiry = expiry
-        logger.debug(f"🔄 Token updated: {token} expires {expiry.strftime('%H:%M:%S')}")
+        self.sessions.update_token(session_id, token, expiry)
+        if session_id == DEFAULT_SESSION_ID:
+            self.qr_frames.token_changed(token)
+        logger.debug("🔄 Token updated: %s expires %s", token, expiry)
 
-    def start(self):
-        """Start Flask server in background thread"""
+    def start(self) -> bool:
+        """Bind the listening socket and serve in a background thread"""
         if self.is_running:
-            return
+            return True
+
+        # Suppress Werkzeug logs
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        self.app.debug = server_config.DEBUG
+
+        try:
+            # Werkzeug's server sets SO_REUSEADDR, so a restart can rebind at once
+            if self.serving_mode == "pool":
+                self.http_server = WorkerPoolWSGIServer(self.host, self.port, self.app)
+            else:
+                self.http_server = make_server(
+                    self.host,
+                    self.port,
+                    self.app,
+                    threaded=True
+                )
+        except (OSError, SystemExit) as e:
+            # Werkzeug exits instead of raising when the port is taken
+            logger.error("💥 Flask server could not bind %s:%s: %s", self.host, self.port, e)
+            return False
+
+        # Long-lived pool workers each keep their own database connection
+        self.db.set_thread_affinity(self.serving_mode == "pool")
 
         self.is_running = True
-        self.server_thread = threading.Thread(target=self._run_server, daemon=True)
+        self.sessions.start()
+        self.server_thread = threading.Thread(target=self._run_server, name="flask-server", daemon=True)
         self.server_thread.start()
-        logger.info(f"🌐 Flask server started on {self.get_local_ip()}:{server_config.PORT}")
+        logger.info("🌐 Flask server started on %s:%s (%s)", self.get_local_ip(), self.port, self.serving_mode)
+        return True
 
     def _run_server(self):
-        """Run Flask server"""
+        """Run the accept loop until shutdown() is called"""
         try:
-            # Suppress Werkzeug logs
-            import logging as werkzeug_logging
-            werkzeug_logging.getLogger('werkzeug').setLevel(werkzeug_logging.ERROR)
-
-            self.app.run(
-                host=server_config.HOST,
-                port=server_config.PORT,
-                debug=server_config.DEBUG,
-                use_reloader=False,
-                threaded=True
-            )
+            self.http_server.serve_forever(poll_interval=SHUTDOWN_POLL_INTERVAL)
         except Exception as e:
-            logger.error(f"💥 Flask server error: {e}")
+            logger.error("💥 Flask server error: %s", e)
             self.is_running = False
 
-    def stop(self):
-        """Stop Flask server"""
-        if self.is_running:
-            self.is_running = False
-            logger.info("🛑 Flask server stopped")
+    def stop(self, drain_timeout: Optional[float] = None):
+        """Stop accepting, drain in-flight requests until the deadline, then release the port"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        self.sessions.stop()
+        deadline = time.monotonic() + (server_config.DRAIN_TIMEOUT if drain_timeout is None else drain_timeout)
+
+        # End open event streams and QR long-polls so their threads can exit
+        for subscription in list(self._event_streams):
+            subscription.close()
+        self.qr_frames.release_waiters()
+
+        if self.http_server:
+            self.http_server.shutdown()
+            if not self._in_flight.wait_idle(deadline):
+                logger.warning("⏳ Stopping with %d request(s) still in flight", self._in_flight.count)
+            self.http_server.server_close()
+            self.http_server = None
+
+        if self.server_thread and self.server_thread is not threading.current_thread():
+            self.server_thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self.shared_state.close()
+        logger.info("🛑 Flask server stopped")
+
+    def restart(self, host: Optional[str] = None, port: Optional[int] = None,
+                drain_timeout: Optional[float] = None, serving_mode: Optional[str] = None) -> bool:
+        """Stop and start again, optionally on a new host/port or serving mode"""
+        self.stop(drain_timeout)
+        self.host = host or self.host
+        self.port = port or self.port
+        self.serving_mode = serving_mode or self.serving_mode
+        return self.start()
 
 # Global server instance
 attendance_server = AttendanceFlaskServer()
@@ -0,0 +1,89 @@
+"""
+Headless Runtime - Token rotation, scan server and database without any UI modules
+smart_attendance_system/src/attendance/core/headless.py
+"""
+import logging
+import os
+import signal
+import tempfile
+import threading
+from datetime import datetime
+from typing import Optional
+
+from PIL import Image
+
+from .flask_server import attendance_server
+from .qr_generator import qr_generator
+from .token_rotation import ScanServer, TokenRotation, token_rotation
+
+logger = logging.getLogger(__name__)
+
+class QRFileExporter:
+    """Writes each frame to a file (PNG, or SVG by extension) for a kiosk, signage player or web root
+
+    Files are replaced atomically, so readers never see a half-written frame.
+    """
+
+    def __init__(self, path: str, server: ScanServer):
+        self.path = os.path.abspath(path)
+        self.server = server  # Read per frame, so SVGs follow a restart on another port
+        self.as_svg = self.path.lower().endswith(".svg")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def __call__(self, token: str, expiry: datetime, image: Image.Image):
+        directory = os.path.dirname(self.path)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=".qr-", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, 'wb') as frame_file:
+                if self.as_svg:
+                    frame_file.write(qr_generator.create_qr_svg(token, self.server.port))
+                else:
+                    image.save(frame_file, "PNG")
+            os.chmod(temporary, 0o644)  # mkstemp creates 0600; web servers and players need to read it
+            os.replace(temporary, self.path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            raise
+
+class HeadlessRuntime:
+    """Runs until SIGINT/SIGTERM; QR frames are served at /qr and optionally exported to a file"""
+
+    def __init__(self, server: ScanServer = attendance_server,
+                 rotation: TokenRotation = token_rotation,
+                 export_path: Optional[str] = None):
+        self.server = server
+        self.rotation = rotation
+        self.export_path = export_path
+        self._stopped = threading.Event()
+
+    def run(self) -> int:
+        """Block serving scans; returns the process exit code"""
+        if not self.server.is_running and not self.server.start():
+            logger.error("❌ Flask server failed to start")
+            return 1
+
+        self.rotation.set_server(self.server)
+        if self.export_path:
+            self.rotation.add_frame_listener(QRFileExporter(self.export_path, self.server))
+            logger.info("🖼️ Exporting QR frames to %s", self.export_path)
+        self.rotation.start()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._handle_signal)
+        logger.info("🖥️ Headless mode: QR display at http://%s:%s/qr", self.server.get_local_ip(), self.server.port)
+
+        while not self._stopped.wait(1.0):
+            pass
+
+        self.rotation.stop()
+        return 0
+
+    def _handle_signal(self, signum: int, _frame):
+        logger.info("🛑 Received signal %d, shutting down", signum)
+        self._stopped.set()
+
+    def stop(self):
+        self._stopped.set()
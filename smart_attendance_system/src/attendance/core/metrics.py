@@ -0,0 +1,215 @@
+"""
+Metrics - Lock-cheap counters and histograms with Prometheus text export
+smart_attendance_system/src/attendance/core/metrics.py
+"""
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Tuple, Sequence, Any
+
+# Latency buckets in seconds, from sub-millisecond to the token lifetime
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelKey = Tuple[str, ...]
+
+MergeFunction = Callable[[Dict[LabelKey, Any], Dict[LabelKey, Any]], None]
+
+SHARD_SWEEP_MIN = 64  # Registered shards before dead threads' shards are first folded away
+
+class _ThreadShards:
+    """Per-thread value dicts; each thread only ever writes its own shard
+
+    Finished threads' shards are folded into a retired total whenever the
+    shard count doubles since the last sweep, so thread-per-connection
+    serving stays bounded even if /metrics is never scraped.
+    """
+
+    def __init__(self, merge: MergeFunction):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, Dict[LabelKey, Any]]] = []
+        self._retired: Dict[LabelKey, Any] = {}
+        self._sweep_at = SHARD_SWEEP_MIN
+
+    def get(self) -> Dict[LabelKey, Any]:
+        """Shard owned by the calling thread"""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[LabelKey, Any] = {}
+            with self._lock:
+                if len(self._shards) >= self._sweep_at:
+                    self._retire_finished()
+                    self._sweep_at = max(SHARD_SWEEP_MIN, 2 * len(self._shards))
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+    def _retire_finished(self):
+        """Fold shards of finished threads into the retired total (lock held)"""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._merge(self._retired, dict(shard))
+        self._shards = live
+
+    def snapshot(self) -> Dict[LabelKey, Any]:
+        """Merge all shards, folding those of finished threads into the retired total"""
+        with self._lock:
+            self._retire_finished()
+            total: Dict[LabelKey, Any] = {}
+            self._merge(total, self._retired)
+            for _thread, shard in self._shards:
+                self._merge(total, dict(shard))  # dict() copies atomically under the GIL
+            return total
+
+def _merge_values(target: Dict[LabelKey, float], source: Dict[LabelKey, float]):
+    for key, value in source.items():
+        target[key] = target.get(key, 0.0) + value
+
+def _merge_buckets(target: Dict[LabelKey, List[float]], source: Dict[LabelKey, List[float]]):
+    for key, values in source.items():
+        current = target.get(key)
+        if current is None:
+            target[key] = list(values)
+        else:
+            for index, value in enumerate(values):
+                current[index] += value
+
+def _format_labels(labelnames: Sequence[str], key: LabelKey, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic counter, optionally labelled"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(_merge_values)
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        shard = self._shards.get()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def values(self) -> Dict[LabelKey, float]:
+        return self._shards.snapshot()
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+                for key, value in sorted(self.values().items())]
+
+class Gauge(Counter):
+    """Up/down gauge built from per-thread deltas (e.g. in-flight requests)"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+class Histogram:
+    """Fixed-bucket histogram, optionally labelled"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards(_merge_buckets)
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shards.get()
+        counts = shard.get(labels)
+        if counts is None:
+            # One slot per bucket plus +Inf, then sum and count
+            counts = shard[labels] = [0.0] * (len(self.buckets) + 3)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def time(self, *labels: str) -> Callable:
+        """Decorator observing the wrapped call's duration"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, *labels)
+            return wrapper
+        return decorator
+
+    def values(self) -> Dict[LabelKey, List[float]]:
+        return self._shards.snapshot()
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, counts in sorted(self.values().items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le_label = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le_label)} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {counts[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {counts[-1]:g}")
+        return lines
+
+class MetricsRegistry:
+    """Holds metrics and renders the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Global metrics registry and application metrics
+metrics_registry = MetricsRegistry()
+
+SCAN_OUTCOMES = metrics_registry.counter(
+    "attendance_scan_outcomes_total", "Scan requests by outcome", ("outcome",))
+SCAN_LATENCY = metrics_registry.histogram(
+    "attendance_scan_latency_seconds", "End-to-end scan processing time")
+SCANS_IN_FLIGHT = metrics_registry.gauge(
+    "attendance_scans_in_flight", "Scan requests currently being processed")
+DB_QUERY_LATENCY = metrics_registry.histogram(
+    "attendance_db_query_seconds", "DatabaseManager call latency", ("method",))
+QR_RENDER_TIME = metrics_registry.histogram(
+    "attendance_qr_render_seconds", "QR code image render time")
+TOKEN_ROTATIONS = metrics_registry.counter(
+    "attendance_token_rotations_total", "Attendance tokens issued across all sessions")
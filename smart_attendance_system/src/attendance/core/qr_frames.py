@@ -0,0 +1,118 @@
+"""
+QR Frames - Encoded QR images of the current token, rendered once per rotation for HTTP displays
+smart_attendance_system/src/attendance/core/qr_frames.py
+"""
+import hashlib
+import io
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+from .metrics import metrics_registry
+from .qr_generator import QRCodeGenerator, qr_generator
+
+logger = logging.getLogger(__name__)
+
+QR_FRAME_RENDERS = metrics_registry.counter(
+    "attendance_qr_frame_renders_total", "QR frames encoded for HTTP displays", ("format",))
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+# Full-screen page for a projector or tablet: long-polls /qr/next and swaps the SVG
+DISPLAY_PAGE = b"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Scan to mark attendance</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<style>html,body{margin:0;height:100%;background:#fff}
+img{display:block;margin:auto;height:96vmin;width:96vmin;position:relative;top:2vmin;image-rendering:pixelated}</style>
+</head><body><img id="qr" alt="Attendance QR code">
+<script>
+(async function () {
+  // Displays authorised by QR_DISPLAY_KEY open /qr?key=...; pass it on to every frame request
+  var key = new URLSearchParams(location.search).get("key");
+  var auth = key ? "&key=" + encodeURIComponent(key) : "";
+  var img = document.getElementById("qr"), etag = "";
+  img.src = "/qr/current.svg?v=" + auth;
+  for (;;) {
+    try {
+      var response = await fetch("/qr/next?etag=" + encodeURIComponent(etag) + auth, {cache: "no-store"});
+      if (response.status === 200) {
+        var frame = await response.json();
+        etag = frame.etag;
+        img.src = "/qr/current.svg?v=" + encodeURIComponent(etag) + auth;
+      } else if (response.status !== 204) {
+        await new Promise(function (resolve) { setTimeout(resolve, 2000); });
+      }
+    } catch (e) {
+      await new Promise(function (resolve) { setTimeout(resolve, 2000); });
+    }
+  }
+})();
+</script></body></html>
+"""
+
+def frame_etag(token: str) -> str:
+    """Strong ETag value (unquoted) for a token's frame, without exposing the token itself"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+@dataclass
+class QRFrameBodies:
+    """Encoded images for one token, filled in per format on first request"""
+    token: str
+    port: int  # Encoded into the scan URL
+    etag: str
+    expiry: datetime
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+
+class QRFrameCache:
+    """Encodes each token's QR at most once per format, however many displays fetch it"""
+
+    def __init__(self, generator: QRCodeGenerator = qr_generator):
+        self.generator = generator
+        self._frame: Optional[QRFrameBodies] = None
+        self._render_lock = threading.Lock()  # One render per format and token; other requests wait for it
+        self._changed = threading.Condition()
+        self._etag: Optional[str] = None
+        self._releases = 0  # Bumped to send every waiting long-poll home (server stop)
+
+    def frame(self, token: str, expiry: datetime, image_format: str, port: int) -> QRFrameBodies:
+        """The frame for token (scanned on port) with image_format encoded"""
+        frame = self._frame
+        if frame is None or frame.token != token or frame.port != port or image_format not in frame.bodies:
+            with self._render_lock:
+                frame = self._frame
+                if frame is None or frame.token != token or frame.port != port:
+                    frame = QRFrameBodies(token, port, frame_etag(token), expiry)
+                if image_format not in frame.bodies:
+                    frame.bodies[image_format] = self._encode(token, image_format, port)
+                    QR_FRAME_RENDERS.inc(image_format)
+                self._frame = frame
+        return frame
+
+    def _encode(self, token: str, image_format: str, port: int) -> bytes:
+        if image_format == "svg":
+            return self.generator.create_qr_svg(token, port)
+        buffer = io.BytesIO()
+        self.generator.create_qr_image(token, port).convert("1").save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def token_changed(self, token: Optional[str]):
+        """Wake long-polling displays when the current token rotates"""
+        with self._changed:
+            self._etag = frame_etag(token) if token else None
+            self._changed.notify_all()
+
+    def release_waiters(self):
+        """Answer every pending long-poll now (as unchanged) so the server can drain"""
+        with self._changed:
+            self._releases += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, etag: Optional[str], timeout: float) -> Optional[str]:
+        """Current ETag once it differs from etag, or None if it does not within timeout"""
+        with self._changed:
+            releases = self._releases
+            changed = self._changed.wait_for(
+                lambda: self._releases != releases or (self._etag is not None and self._etag != etag), timeout)
+            return self._etag if changed and self._releases == releases else None
@@ -3,20 +3,90 @@ QR Code Generator - Generate QR codes for attendance
 smart_attendance_system/src/attendance/core/qr_generator.py
 """
 import qrcode
-from PIL import Image, ImageTk
+from qrcode.exceptions import DataOverflowError
+from PIL import Image
+import base64
+import hashlib
+import hmac
+import secrets
 import socket
 import logging
-from ..config.settings import app_settings
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+from ..config.settings import app_settings, server_config
+from .metrics import QR_RENDER_TIME
+
+if TYPE_CHECKING:
+    from PIL import ImageTk
+
+try:
+    import numpy as np  # Optional, rasterizes frames with array broadcasting
+except ImportError:
+    np = None
 
 logger = logging.getLogger(__name__)
 
+DARK = 0
+LIGHT = 255
+# Canvases each render thread cycles through: enough for every frame waiting in the
+# prefetch queue plus the one on screen and the one being swapped in
+RASTER_SLOTS = app_settings.QR_PREFETCH_DEPTH + 2
+
+LEGACY_ENCODING = "legacy"
+COMPACT_ENCODING = "compact"
+COMPACT_TOKEN_BYTES = 5  # 40 bits -> 8 base32 characters
+
+ERROR_CORRECTION_LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H
+}
+
 class QRCodeGenerator:
-    """Handles QR code generation for attendance tokens"""
+    """Handles QR code generation for attendance tokens
+
+    Every frame has the same shape (same URL length), so the QR version is
+    worked out once and pinned, and modules are scaled by a whole number of
+    pixels with nearest-neighbour sampling instead of rendering large and
+    resampling down.
 
-    def __init__(self):
+    The compact encoding keeps the whole URL inside the QR alphanumeric set
+    (digits, uppercase, ``:/.``), which packs 5.5 bits per character instead
+    of 8 and gives a smaller version with larger modules.
+    """
+
+    def __init__(self, encoding: str = app_settings.QR_ENCODING):
+        if encoding not in (LEGACY_ENCODING, COMPACT_ENCODING):
+            raise ValueError(f"Unknown QR encoding: {encoding}")
+        self.encoding = encoding
+        self._token_key = secrets.token_bytes(16)  # Compact tokens are unguessable but derivable ahead
         self.qr_size = app_settings.QR_SIZE
+        self.border = app_settings.QR_BORDER
+        self.error_correction = ERROR_CORRECTION_LEVELS[app_settings.QR_ERROR_CORRECTION]
+        self.mask_pattern = app_settings.QR_MASK_PATTERN
+        self._local_ip: Optional[str] = None
+        self._ip_checked_at = 0.0
+        self._versions: Dict[int, int] = {}  # Data length -> smallest version that fits
+        self._lock = threading.Lock()
+        self._scratch = threading.local()  # Per-thread raster buffers (prefetch renders in parallel)
+
+    def get_local_ip(self, refresh: bool = False) -> str:
+        """Local machine IP address, re-detected at most every QR_IP_CACHE_TTL seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if not refresh and self._local_ip and now - self._ip_checked_at < app_settings.QR_IP_CACHE_TTL:
+                return self._local_ip
+        local_ip = self._detect_local_ip()
+        with self._lock:
+            if local_ip != self._local_ip and self._local_ip is not None:
+                logger.info("🌐 Local IP changed: %s -> %s", self._local_ip, local_ip)
+            self._local_ip, self._ip_checked_at = local_ip, now
+        return local_ip
 
-    def get_local_ip(self) -> str:
+    def _detect_local_ip(self) -> str:
         """Get local machine IP address"""
         try:
             # Connect to a remote address to determine local IP
@@ -27,38 +97,157 @@ class QRCodeGenerator:
             try:
                 return socket.gethostbyname(socket.gethostname())
             except Exception as e:
-                logger.error(f"❌ Error getting local IP: {e}")
+                logger.error("❌ Error getting local IP: %s", e)
                 return "127.0.0.1"
 
-    def create_qr_image(self, token: str, server_port: int = 5000) -> Image.Image:
+    def generate_token(self, activation: datetime) -> str:
+        """Attendance token for the window starting at activation"""
+        if self.encoding == COMPACT_ENCODING:
+            digest = hmac.new(self._token_key, activation.isoformat().encode('ascii'), hashlib.sha256)
+            return base64.b32encode(digest.digest()[:COMPACT_TOKEN_BYTES]).decode('ascii')
+        if activation.microsecond:
+            # Sub-second rotation: keep tokens unique within the second
+            return f"ATTEND-{activation.strftime('%Y%m%d%H%M%S')}.{activation.microsecond // 1000:03d}"
+        return f"ATTEND-{activation.strftime('%Y%m%d%H%M%S')}"
+
+    def scan_url(self, token: str, server_port: int = server_config.PORT) -> str:
+        """URL a phone opens when it scans the code for token"""
+        if self.encoding == COMPACT_ENCODING:
+            # Scheme and host are case-insensitive; the /S/ route and base32 token are uppercase already
+            return f"HTTP://{self.get_local_ip()}:{server_port}/S/{token}"
+        return f"http://{self.get_local_ip()}:{server_port}/scan/{token}"
+
+    def describe(self, server_port: int = server_config.PORT) -> dict:
+        """QR version, module count and scale of a representative frame in this encoding"""
+        # Rotation windows start on whole seconds unless the interval is fractional
+        scan_url = self.scan_url(self.generate_token(datetime.now().replace(microsecond=0)), server_port)
+        modules = len(self.build_matrix(scan_url))
+        return {
+            "encoding": self.encoding,
+            "url": scan_url,
+            "url_length": len(scan_url),
+            "version": self._versions[len(scan_url)],
+            "modules": modules - 2 * self.border,
+            "pixels_per_module": self.module_scale(modules)
+        }
+
+    def _make_code(self, data: str, version: Optional[int]) -> qrcode.QRCode:
+        qr = qrcode.QRCode(
+            version=version,
+            error_correction=self.error_correction,
+            border=self.border,
+            mask_pattern=self.mask_pattern
+        )
+        qr.add_data(data)
+        qr.make(fit=version is None)
+        return qr
+
+    def build_matrix(self, data: str) -> List[List[bool]]:
+        """Module matrix for data (True = dark), quiet zone included"""
+        version = self._versions.get(len(data))
+        try:
+            qr = self._make_code(data, version)
+        except DataOverflowError:
+            # Same length but a denser encoding mode; fit again and re-pin
+            qr = self._make_code(data, None)
+        if version != qr.version:
+            self._versions[len(data)] = qr.version
+            logger.debug("📐 QR version %d pinned for %d-character data", qr.version, len(data))
+        return qr.get_matrix()
+
+    def module_scale(self, modules: int) -> int:
+        """Whole pixels per module that fit modules across QR_SIZE"""
+        return max(1, min(self.qr_size) // modules)
+
+    def rasterize(self, matrix: List[List[bool]]) -> Image.Image:
+        """Scale a module matrix to QR_SIZE with crisp module edges, centred on white"""
+        if np is not None:
+            return self._rasterize_array(matrix)
+        modules = len(matrix)
+        pixels = bytes(DARK if dark else LIGHT for row in matrix for dark in row)
+        code = Image.frombytes("L", (modules, modules), pixels)
+        scaled = modules * self.module_scale(modules)
+        code = code.resize((scaled, scaled), Image.Resampling.NEAREST)
+        if code.size == tuple(self.qr_size):
+            return code
+        canvas = Image.new("L", tuple(self.qr_size), LIGHT)
+        canvas.paste(code, ((self.qr_size[0] - scaled) // 2, (self.qr_size[1] - scaled) // 2))
+        return canvas
+
+    def _raster_buffers(self, modules: int):
+        """This thread's next canvas slot: the array, its (module row, pixel row, module col, pixel col) view and image"""
+        scratch = self._scratch
+        if getattr(scratch, 'modules', None) != modules:
+            scale = self.module_scale(modules)
+            scaled = modules * scale
+            width, height = self.qr_size
+            top, left = (height - scaled) // 2, (width - scaled) // 2
+            scratch.slots = []
+            for _ in range(RASTER_SLOTS):
+                canvas = np.full((height, width), LIGHT, dtype=np.uint8)
+                # Splitting each axis of the code area is a view, so writes land in the canvas
+                blocks = canvas[top:top + scaled, left:left + scaled].reshape(modules, scale, modules, scale)
+                # frombuffer with the raw L mode shares the array's memory instead of copying it
+                image = Image.frombuffer("L", (width, height), canvas, "raw", "L", 0, 1)
+                scratch.slots.append((canvas, blocks, image))
+            scratch.tones = np.empty((modules, modules), dtype=np.uint8)
+            scratch.next_slot = 0
+            scratch.modules = modules
+        slot = scratch.slots[scratch.next_slot]
+        scratch.next_slot = (scratch.next_slot + 1) % RASTER_SLOTS
+        return scratch.tones, slot
+
+    def _rasterize_array(self, matrix: List[List[bool]]) -> Image.Image:
+        """Expand modules to pixels by broadcasting into a preallocated canvas, with no per-frame allocation
+
+        The returned image is backed by one of this thread's RASTER_SLOTS
+        canvases and is rewritten that many frames later; callers that keep
+        frames longer must copy() them.
+        """
+        tones, (_canvas, blocks, image) = self._raster_buffers(len(matrix))
+        np.copyto(tones, LIGHT)
+        tones[np.asarray(matrix, dtype=bool)] = DARK
+        blocks[...] = tones[:, None, :, None]
+        return image
+
+    @QR_RENDER_TIME.time()
+    def create_qr_image(self, token: str, server_port: int = server_config.PORT) -> Image.Image:
         """Generate QR code image for attendance token"""
         try:
-            local_ip = self.get_local_ip()
-            scan_url = f"http://{local_ip}:{server_port}/scan/{token}"
-
-            # Create QR code with optimal settings
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_M,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(scan_url)
-            qr.make(fit=True)
-
-            # Generate image with high contrast
-            qr_image = qr.make_image(fill_color="black", back_color="white")
-            qr_image = qr_image.resize(self.qr_size, Image.Resampling.LANCZOS)
-
-            logger.info(f"📱 QR code generated: {scan_url}")
+            scan_url = self.scan_url(token, server_port)
+            qr_image = self.rasterize(self.build_matrix(scan_url))
+
+            logger.info("📱 QR code generated: %s", scan_url)
             return qr_image
 
         except Exception as e:
-            logger.error(f"❌ Error generating QR code: {e}")
+            logger.error("❌ Error generating QR code: %s", e)
             raise
 
-    def create_tkinter_image(self, token: str, server_port: int = 5000) -> ImageTk.PhotoImage:
+    def create_qr_svg(self, token: str, server_port: int = server_config.PORT) -> bytes:
+        """Generate QR code as SVG: one path of horizontal dark runs, scalable to any display"""
+        matrix = self.build_matrix(self.scan_url(token, server_port))
+        modules = len(matrix)
+        runs = []
+        for y, row in enumerate(matrix):
+            x = 0
+            while x < modules:
+                if not row[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < modules and row[x]:
+                    x += 1
+                runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {modules} {modules}" '
+            f'shape-rendering="crispEdges"><rect width="{modules}" height="{modules}" fill="#fff"/>'
+            f'<path d="{"".join(runs)}" fill="#000"/></svg>'
+        ).encode('ascii')
+
+    def create_tkinter_image(self, token: str, server_port: int = server_config.PORT) -> "ImageTk.PhotoImage":
         """Generate QR code as Tkinter PhotoImage"""
+        from PIL import ImageTk  # Imports tkinter; kept out of headless processes
         qr_image = self.create_qr_image(token, server_port)
         return ImageTk.PhotoImage(qr_image)
 
@@ -0,0 +1,131 @@
+"""
+QR Prefetcher - Render upcoming token frames ahead of their activation time
+smart_attendance_system/src/attendance/core/qr_prefetcher.py
+"""
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Deque, Optional
+
+from PIL import Image
+
+from ..config.settings import app_settings, server_config
+from .metrics import metrics_registry
+from .qr_generator import qr_generator
+from .rotation_scheduler import RotationScheduler, RotationTick
+
+logger = logging.getLogger(__name__)
+
+QR_FRAMES_LATE = metrics_registry.counter(
+    "attendance_qr_frames_late_total", "QR frames still rendering when their window began")
+
+@dataclass
+class QRFrame:
+    """A rendered QR code and the token window it belongs to"""
+    token: str
+    tick: RotationTick
+    image: Image.Image
+    generation: int  # Schedule the frame was rendered for; bumped by every reset
+    port: int  # Server port encoded in the scan URL
+
+    @property
+    def activation(self) -> datetime:
+        return self.tick.activation
+
+    @property
+    def expiry(self) -> datetime:
+        return self.tick.expiry
+
+class QRPrefetcher:
+    """Keeps the next depth frames rendering (or rendered) on a small worker pool
+
+    Tokens are derived from their activation time, so future frames can be
+    rendered before they are needed; taking the next frame is then a queue pop.
+    """
+
+    def __init__(self, scheduler: Optional[RotationScheduler] = None,
+                 depth: int = app_settings.QR_PREFETCH_DEPTH,
+                 workers: int = app_settings.QR_PREFETCH_WORKERS,
+                 render: Optional[Callable[[str, int], Image.Image]] = None):
+        self.scheduler = scheduler or RotationScheduler()
+        self.depth = max(1, depth)
+        self.workers = max(1, workers)
+        self.render = render or qr_generator.create_qr_image
+        self.port = server_config.PORT  # Scan URLs point here; see set_port()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Deque["Future[QRFrame]"] = deque()
+        self._next_index = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start rendering frames from a window beginning now"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="qr-prefetch")
+        self.reset()
+
+    def reset(self, at: Optional[RotationTick] = None):
+        """Drop frames already queued and restart the schedule now (or at window at)"""
+        with self._lock:
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self.generation += 1
+            self.scheduler.restart(at)
+            self._next_index = 0
+            self._fill()
+
+    def _fill(self):
+        """Queue renders until depth frames are ahead (lock held)"""
+        # After a stall, render from the window we are in rather than ones already gone
+        self._next_index = max(self._next_index, self.scheduler.current_index())
+        while self._executor is not None and len(self._pending) < self.depth:
+            tick = self.scheduler.tick(self._next_index)
+            self._pending.append(self._executor.submit(self._render_frame, tick, self.generation, self.port))
+            self._next_index += 1
+
+    def _render_frame(self, tick: RotationTick, generation: int, port: int) -> QRFrame:
+        token = qr_generator.generate_token(tick.activation)
+        return QRFrame(token, tick, self.render(token, port), generation, port)
+
+    def set_port(self, port: int):
+        """Point scan URLs at port, re-rendering queued frames from the current window on"""
+        with self._lock:
+            if port == self.port:
+                return
+            self.port = port
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self.generation += 1
+            self._next_index = self.scheduler.current_index()
+            self._fill()
+
+    def is_current(self, frame: QRFrame) -> bool:
+        """False once a reset has replaced the schedule frame was rendered for"""
+        return frame.generation == self.generation
+
+    def next_frame(self, timeout: Optional[float] = None) -> QRFrame:
+        """The frame for the next window; blocks only if it is still rendering"""
+        with self._lock:
+            if not self._pending:
+                raise RuntimeError("QR prefetcher is not running")
+            future = self._pending.popleft()
+            self._fill()
+        if not future.done():
+            QR_FRAMES_LATE.inc()
+        return future.result(timeout)
+
+    def stop(self):
+        """Cancel queued renders and shut the pool down"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,141 @@
+"""
+Rotation Scheduler - Drift-free token windows on absolute monotonic deadlines
+smart_attendance_system/src/attendance/core/rotation_scheduler.py
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Optional
+
+from ..config.settings import app_settings
+from .metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+ROTATION_JITTER = metrics_registry.histogram(
+    "attendance_qr_rotation_jitter_seconds", "How late each token rotation happened after its deadline")
+ROTATIONS_SKIPPED = metrics_registry.counter(
+    "attendance_qr_rotations_skipped_total", "Token windows skipped because their rotation was a full window late")
+
+CLOCK_STEP_TOLERANCE = 1.0  # seconds the wall clock may move against the monotonic clock before re-anchoring
+JITTER_SAMPLES = 512  # Recent rotations kept for stats()
+
+@dataclass(frozen=True)
+class RotationTick:
+    """One token window: monotonic deadline for the swap plus wall-clock times for the token and its expiry"""
+    index: int
+    deadline: float  # time.monotonic() at which the window begins
+    activation: datetime
+    expiry: datetime
+
+class RotationScheduler:
+    """Window k starts at anchor + k * interval on the monotonic clock
+
+    Deadlines are absolute, so render time and wake-up latency never add up
+    into drift. Wall-clock activation/expiry are derived from the same anchor,
+    and the anchor follows the wall clock when NTP steps it, so the server's
+    token expiry and the display stay in lockstep.
+    """
+
+    def __init__(self, interval: float = app_settings.QR_REFRESH_INTERVAL):
+        self.set_interval(interval)
+        self.interval = self._next_interval
+        self._anchor_monotonic = 0.0
+        self._anchor_wall = datetime.now()
+        self._jitter: Deque[float] = deque(maxlen=JITTER_SAMPLES)  # Recent lateness, seconds
+        self.rotations = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def set_interval(self, interval: float):
+        """Window length from the next restart on (existing windows keep theirs)"""
+        self._next_interval = max(app_settings.QR_MIN_REFRESH_INTERVAL, float(interval))
+
+    def restart(self, at: Optional[RotationTick] = None) -> RotationTick:
+        """Anchor window 0 at now (or where window at begins) and return it
+
+        Whole-second intervals keep whole-second activations (tokens stay
+        ATTEND-YYYYmmddHHMMSS); sub-second ones start exactly now. Passing
+        at switches to a new interval on an existing window boundary.
+        """
+        if at is not None:
+            with self._lock:
+                self.interval = self._next_interval
+                self._anchor_monotonic = at.deadline
+                self._anchor_wall = at.activation
+            return self.tick(0)
+
+        now_monotonic, now_wall = time.monotonic(), datetime.now()
+        offset = now_wall.microsecond / 1e6 if self._next_interval.is_integer() else 0.0
+        with self._lock:
+            self.interval = self._next_interval
+            self._anchor_monotonic = now_monotonic - offset
+            self._anchor_wall = now_wall - timedelta(seconds=offset)
+        return self.tick(0)
+
+    def tick(self, index: int) -> RotationTick:
+        """Window index under the current anchor"""
+        with self._lock:
+            interval = self.interval
+            deadline = self._anchor_monotonic + index * interval
+            activation = self._anchor_wall + timedelta(seconds=index * interval)
+        return RotationTick(index, deadline, activation, activation + timedelta(seconds=interval))
+
+    def current_index(self) -> int:
+        """Index of the window the monotonic clock is in now"""
+        return max(0, int((time.monotonic() - self._anchor_monotonic) // self.interval))
+
+    def follow_wall_clock(self):
+        """Shift the wall-clock anchor if the system clock was stepped (e.g. by NTP)"""
+        now_monotonic, now_wall = time.monotonic(), datetime.now()
+        with self._lock:
+            expected = self._anchor_wall + timedelta(seconds=now_monotonic - self._anchor_monotonic)
+            step = (now_wall - expected).total_seconds()
+            if abs(step) < CLOCK_STEP_TOLERANCE:
+                return
+            self._anchor_wall += timedelta(seconds=step)
+        logger.warning("🕰️ Wall clock stepped by %+.1f s; token expiry re-anchored", step)
+
+    def record_rotation(self, tick: RotationTick, skipped: int = 0):
+        """Note how late tick's swap happened (and how many windows were skipped before it)"""
+        lateness = max(0.0, time.monotonic() - tick.deadline)
+        ROTATION_JITTER.observe(lateness)
+        if skipped:
+            ROTATIONS_SKIPPED.inc(amount=skipped)
+        with self._lock:
+            self.rotations += 1
+            self.skipped += skipped
+            self._jitter.append(lateness)
+
+    def stats(self) -> Dict[str, float]:
+        """Rotation count, skipped windows and lateness percentiles (ms) over recent rotations"""
+        with self._lock:
+            jitter = sorted(self._jitter)
+            rotations, skipped = self.rotations, self.skipped
+
+        def percentile(fraction: float) -> float:
+            return round(jitter[min(len(jitter) - 1, int(fraction * len(jitter)))] * 1000, 3) if jitter else 0.0
+
+        return {
+            "interval": self.interval,
+            "rotations": rotations,
+            "skipped": skipped,
+            "jitter_p50_ms": percentile(0.50),
+            "jitter_p95_ms": percentile(0.95),
+            "jitter_max_ms": round(jitter[-1] * 1000, 3) if jitter else 0.0
+        }
+
+    def wait_until(self, deadline: float, wakeup: Optional[threading.Event] = None) -> bool:
+        """Sleep until the monotonic deadline; True early if wakeup was set (and clears it)"""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if wakeup is None:
+                time.sleep(remaining)
+            elif wakeup.wait(remaining):
+                wakeup.clear()
+                return True
@@ -0,0 +1,260 @@
+"""
+Scan Process - Scan server and database writes in a child process supervised by the UI process
+smart_attendance_system/src/attendance/core/scan_process.py
+"""
+import logging
+import multiprocessing
+import secrets
+import signal
+import sys
+import threading
+from dataclasses import replace
+from datetime import datetime
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Optional, Tuple
+
+from ..config.settings import server_config, logging_config
+from ..database.db_manager import database_manager
+from ..utils.async_logging import log_pipeline
+from ..utils.log_rotation import build_file_handler
+from .adaptive_interval import ScanLoad
+from .event_bus import AttendanceEventBus, attendance_events
+from .flask_server import attendance_server
+from .qr_generator import qr_generator
+from .session_registry import DEFAULT_SESSION_ID
+
+logger = logging.getLogger(__name__)
+
+# Own file, so two processes never rotate the same log; named to match logs/attendance*.log* for tools/log_analytics.py
+SCAN_PROCESS_LOG_FILE = "attendance_scan_server.log"
+
+# Messages are tuples whose first item names the kind:
+#   supervisor -> child: ("run", run_id), ("token", token, expiry, status), ("stop",)
+#     status carries the supervisor's rotation and adaptive interval stats for /api/status
+#   child -> supervisor: ("ready", port), ("failed", reason), ("events", [(type, data), ...]), ("load", ScanLoad)
+
+class ForwardedStats:
+    """Stands in for an object in the supervisor process: stats() as last reported over the pipe"""
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None):
+        self.values = values
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        return self.values
+
+def run_scan_server(conn: Connection, log_dir: Optional[str] = None) -> int:
+    """Child process entry point: serve scans until told to stop or the supervisor goes away"""
+    if log_dir:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter(logging_config.FORMAT))
+        log_pipeline.start([build_file_handler(log_dir, replace(logging_config, FILE_NAME=SCAN_PROCESS_LOG_FILE)),
+                            console])
+    # Ctrl+C reaches the whole process group; the supervisor decides when scans stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    server = attendance_server
+    if not server.start():
+        conn.send(("failed", "could not bind %s:%s" % (server.host, server.port)))
+        return 1
+
+    rotation, interval_controller = ForwardedStats(), ForwardedStats()
+    send_lock = threading.Lock()  # Events and load reports are sent from different threads
+    subscription = server.event_bus.subscribe()
+
+    def forward_events():
+        while True:
+            events = subscription.get(timeout=1.0)
+            if events is None:
+                return
+            batch = [(event.type, event.data) for event in events if event.type != "lagged"]
+            if batch:
+                try:
+                    with send_lock:
+                        conn.send(("events", batch))
+                except (OSError, ValueError):
+                    return
+
+    threading.Thread(target=forward_events, name="scan-events-forwarder", daemon=True).start()
+    conn.send(("ready", server.port))
+
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == "run":
+                server.begin_run(message[1])
+            elif message[0] == "token":
+                _kind, token, expiry, status = message
+                rotation.values, interval_controller.values = status.get("rotation"), status.get("adaptive_interval")
+                server.rotation = rotation if rotation.values else None
+                server.interval_controller = interval_controller if interval_controller.values else None
+                server.update_token(token, expiry)
+                with send_lock:
+                    conn.send(("load", server.scan_load()))
+            elif message[0] == "stop":
+                break
+    except (EOFError, OSError):
+        logger.warning("⚠️ Supervisor went away; stopping scan server")
+    finally:
+        subscription.close()
+        server.stop()
+        database_manager.close_connection()
+        log_pipeline.stop()
+    return 0
+
+class ScanServerProcess:
+    """Runs the scan server in a child process and stands in for it in the UI process
+
+    Has the parts of AttendanceFlaskServer the rotation, the window and the
+    headless runtime use. Tokens go to the child over a pipe; attendance
+    events come back and are republished on the local event bus. Rendering
+    and the Tk loop therefore never hold the GIL the scan handlers need, and
+    if the child dies it is restarted with the current token.
+    """
+
+    def __init__(self, event_bus: AttendanceEventBus = attendance_events, log_dir: Optional[str] = None,
+                 restart_delay: float = server_config.PROCESS_RESTART_DELAY):
+        self.event_bus = event_bus
+        self.log_dir = log_dir
+        self.restart_delay = restart_delay
+        self.port = server_config.PORT
+        self.is_running = False
+        self.restarts = 0
+        self.rotation = None  # Set by TokenRotation.set_server; rotation runs in this process
+        self.interval_controller = None
+        # Forking a process that already runs Tk and render threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._conn: Optional[Connection] = None
+        self._send_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+        self._token: Optional[Tuple[str, datetime]] = None
+        self._run_id: Optional[str] = None
+        self._load: ScanLoad = ({}, 0)
+
+    def get_local_ip(self) -> str:
+        return qr_generator.get_local_ip()
+
+    def start(self) -> bool:
+        """Start the child and wait until it is listening"""
+        if self.is_running:
+            return True
+
+        self._stopping.clear()
+        if not self._spawn():
+            return False
+        self.is_running = True
+        self._supervisor = threading.Thread(target=self._supervise, name="scan-process-supervisor", daemon=True)
+        self._supervisor.start()
+        return True
+
+    def _spawn(self) -> bool:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=run_scan_server, args=(child_conn, self.log_dir),
+                                        name="scan-server", daemon=True)
+        process.start()
+        child_conn.close()
+
+        try:
+            message = parent_conn.recv() if parent_conn.poll(server_config.PROCESS_START_TIMEOUT) else ("failed", "timeout")
+        except (EOFError, OSError):
+            message = ("failed", "exited with code %s" % process.exitcode)
+        if message[0] != "ready":
+            logger.error("❌ Scan server process failed to start: %s", message[1])
+            parent_conn.close()
+            if process.is_alive():
+                process.terminate()
+            process.join(timeout=1)
+            return False
+
+        with self._send_lock:
+            self._process, self._conn = process, parent_conn
+            self.port = message[1]
+        # A restarted child picks up the current run (so dedup carries over) and the token on screen
+        if self._run_id:
+            self._send(("run", self._run_id))
+        if self._token:
+            self._send(("token",) + self._token + (self._status(),))
+        logger.info("🧩 Scan server process %d listening on port %s", process.pid, self.port)
+        return True
+
+    def _supervise(self):
+        """Dispatch messages from the child; restart it if it dies"""
+        while not self._stopping.is_set():
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                if self._stopping.is_set():
+                    break
+                self._process.join(timeout=1)
+                logger.error("💥 Scan server process exited (code %s); restarting", self._process.exitcode)
+                self._restart()
+                continue
+            self._handle(message)
+
+    def _restart(self):
+        with self._send_lock:
+            if self._conn is not None:
+                self._conn.close()
+        while not self._stopping.wait(self.restart_delay):
+            if self._spawn():
+                self.restarts += 1
+                return
+
+    def _handle(self, message: Tuple[Any, ...]):
+        if message[0] == "events":
+            for event_type, data in message[1]:
+                self.event_bus.publish(event_type, data)
+        elif message[0] == "load":
+            self._load = message[1]
+
+    def _send(self, message: Tuple[Any, ...]):
+        with self._send_lock:
+            try:
+                if self._conn is not None:
+                    self._conn.send(message)
+            except (OSError, ValueError):
+                pass  # Child is gone; the supervisor restarts it and resends the token
+
+    def begin_run(self, run_id: Optional[str] = None, session_id: str = DEFAULT_SESSION_ID) -> str:
+        """Start a new lecture on the default session in the child"""
+        self._run_id = run_id or secrets.token_hex(4)
+        self._send(("run", self._run_id))
+        return self._run_id
+
+    def update_token(self, token: str, expiry: datetime, session_id: str = DEFAULT_SESSION_ID):
+        """Install token in the child (only the default session is rotated from this process)"""
+        self._token = (token, expiry)
+        self._send(("token", token, expiry, self._status()))
+
+    def _status(self) -> Dict[str, Any]:
+        """Rotation state kept in this process, for the child's /api/status"""
+        return {
+            "rotation": self.rotation.stats() if self.rotation else None,
+            "adaptive_interval": self.interval_controller.stats() if self.interval_controller else None
+        }
+
+    def scan_load(self) -> ScanLoad:
+        """Scan totals and queue depth the child reported with its last token"""
+        return self._load
+
+    def stop(self, drain_timeout: Optional[float] = None):
+        """Ask the child to drain and exit, terminating it if it does not"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._stopping.set()
+        self._send(("stop",))
+
+        process = self._process
+        if process is not None:
+            process.join((drain_timeout or server_config.DRAIN_TIMEOUT) + 3)
+            if process.is_alive():
+                logger.warning("⚠️ Scan server process did not exit; terminating")
+                process.terminate()
+                process.join(timeout=1)
+        with self._send_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        logger.info("🛑 Scan server process stopped")
@@ -0,0 +1,355 @@
+"""
+Session Registry - Concurrent attendance sessions (one per room) on one server
+smart_attendance_system/src/attendance/core/session_registry.py
+"""
+import heapq
+import ipaddress
+from collections import deque
+import secrets
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Any, Tuple, Union, Deque
+
+from .metrics import TOKEN_ROTATIONS
+from .shared_state import SharedState, SharedStateError, InProcessState
+from ..config.settings import app_settings, server_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "default"
+REMOTE_TOKEN_RECHECK = 1.0  # seconds a token adopted from another node is trusted before re-reading shared state
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+Publication = Tuple[str, Dict[str, Any], float]  # token, info, ttl: a shared-state write deferred until the lock is released
+
+@dataclass(eq=False)
+class AttendanceSession:
+    """One room taking attendance with its own rotating token"""
+    session_id: str
+    room: str
+    interval: float
+    allowed_network: Optional[IPNetwork] = None  # None falls back to the server's own check
+    managed: bool = True  # Registry rotates the token; unmanaged sessions are fed externally
+    token: Optional[str] = None
+    expiry: Optional[datetime] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    run_id: str = field(default_factory=lambda: secrets.token_hex(4))  # Renewed per lecture; scopes the present set
+
+    @property
+    def present_scope(self) -> str:
+        """Dedup scope: a student is recorded once per run of the session, not once per session id"""
+        return f"{self.session_id}:{self.run_id}"
+
+    def is_current(self, now: Optional[datetime] = None) -> bool:
+        """Whether the session's token is still valid"""
+        return self.expiry is not None and (now or datetime.now()) <= self.expiry
+
+    def to_dict(self, include_token: bool = False) -> Dict[str, Any]:
+        info = {
+            "session_id": self.session_id,
+            "room": self.room,
+            "interval": self.interval,
+            "allowed_subnet": str(self.allowed_network) if self.allowed_network else None,
+            "managed": self.managed,
+            "expires": self.expiry.isoformat() if self.expiry else None
+        }
+        if include_token:
+            info["token"] = self.token
+        return info
+
+class SessionRegistry:
+    """Sessions indexed by id and by current token for O(1) scan resolution"""
+
+    def __init__(self, shared_state: Optional[SharedState] = None):
+        self.shared_state = shared_state or InProcessState()
+        self.node_id = secrets.token_hex(4)  # Marks the tokens this registry publishes
+        self._sessions: Dict[str, AttendanceSession] = {}
+        self._remote_sessions: Dict[str, AttendanceSession] = {}  # Sessions rotated by other nodes
+        self._by_token: Dict[str, AttendanceSession] = {}
+        self._remote_checked: Dict[str, float] = {}  # Adopted token -> monotonic time of its last lookup
+        # Recently issued tokens for validating delayed (gateway) scans
+        self._recent: Dict[str, Tuple[AttendanceSession, datetime, datetime]] = {}
+        self._recent_order: Deque[Tuple[datetime, str]] = deque()
+        self._schedule: List[Tuple[float, int, str]] = []  # (due monotonic, sequence, session id)
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._rotation_thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.add_session(AttendanceSession(
+            DEFAULT_SESSION_ID,
+            server_config.DEFAULT_ROOM,
+            app_settings.QR_REFRESH_INTERVAL,
+            managed=False
+        ))
+
+    @property
+    def default_session(self) -> AttendanceSession:
+        return self._sessions[DEFAULT_SESSION_ID]
+
+    def create_session(self, room: str, interval: Optional[float] = None,
+                       allowed_subnet: Optional[str] = None) -> AttendanceSession:
+        """Create a registry-managed session and issue its first token"""
+        session = AttendanceSession(
+            secrets.token_hex(4),
+            room,
+            interval or app_settings.QR_REFRESH_INTERVAL,
+            ipaddress.ip_network(allowed_subnet, strict=False) if allowed_subnet else None
+        )
+        self.add_session(session)
+        logger.info("🏫 Session %s created for room %s", session.session_id, room)
+        return session
+
+    def add_session(self, session: AttendanceSession):
+        """Register a session; managed sessions get a token immediately"""
+        publications: List[Publication] = []
+        with self._condition:
+            self._sessions[session.session_id] = session
+            if session.managed:
+                publications = self._rotate(session)
+        self._publish(publications)
+
+    def begin_run(self, session_id: str, run_id: Optional[str] = None) -> str:
+        """Start a new lecture on a long-lived session, so earlier scans no longer count as duplicates"""
+        with self._condition:
+            session = self._sessions[session_id]
+            session.run_id = run_id or secrets.token_hex(4)
+        logger.info("🆕 Session %s started run %s", session_id, session.run_id)
+        return session.run_id
+
+    def remove_session(self, session_id: str) -> bool:
+        """Remove a session; its token stops resolving at once"""
+        if session_id == DEFAULT_SESSION_ID:
+            return False
+        with self._condition:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return False
+            if session.token:
+                self._by_token.pop(session.token, None)
+        if session.token:
+            # Other nodes adopted it from shared state; revoke it there too
+            try:
+                self.shared_state.revoke_token(session.token)
+            except SharedStateError as e:
+                logger.error("❌ Could not revoke token of session %s: %s", session_id, e)
+        logger.info("🏁 Session %s (%s) closed", session_id, session.room)
+        return True
+
+    def get(self, session_id: str) -> Optional[AttendanceSession]:
+        return self._sessions.get(session_id)
+
+    def sessions(self) -> List[AttendanceSession]:
+        return list(self._sessions.values())
+
+    def resolve(self, token: str) -> Optional[AttendanceSession]:
+        """Session whose current, unexpired token matches, including tokens issued by other nodes"""
+        session = self._by_token.get(token)
+        if session is None:
+            session = self._adopt_remote_token(token)
+        elif self._is_remote(session) and time.monotonic() - self._remote_checked.get(token, 0.0) > REMOTE_TOKEN_RECHECK:
+            # The issuing node may have replaced or revoked it since it was adopted
+            session = self._adopt_remote_token(token)
+        if session is None or not session.is_current():
+            return None
+        return session
+
+    def _is_remote(self, session: AttendanceSession) -> bool:
+        return session is self._remote_sessions.get(session.session_id)
+
+    def _forget_remote_token(self, token: str):
+        """Drop an adopted token from the index (lock held); tokens of local sessions are left alone"""
+        session = self._by_token.get(token)
+        if session is not None and self._is_remote(session):
+            del self._by_token[token]
+        self._remote_checked.pop(token, None)
+
+    def _adopt_remote_token(self, token: str) -> Optional[AttendanceSession]:
+        """Index a token another node published under a local view of its session
+
+        Returns the session only while token is that session's newest token.
+        Tokens this registry published itself are never adopted: once one
+        is gone from the local index it was replaced or its session removed.
+        """
+        try:
+            info = self.shared_state.lookup_token(token)
+        except SharedStateError as e:
+            logger.error("❌ Shared state lookup failed: %s", e)
+            return None
+        if info is None or info.get("node") == self.node_id:
+            with self._condition:
+                self._forget_remote_token(token)
+            return None
+
+        with self._condition:
+            # Kept apart from local sessions so another node's "default" never overwrites ours
+            session = self._remote_sessions.get(info["session_id"])
+            if session is None:
+                session = AttendanceSession(
+                    info["session_id"],
+                    info["room"],
+                    info["interval"],
+                    ipaddress.ip_network(info["allowed_subnet"]) if info.get("allowed_subnet") else None,
+                    managed=False
+                )
+                self._remote_sessions[session.session_id] = session
+            # Dedup against the issuing node's present set for this run
+            session.run_id = info.get("run_id", session.run_id)
+            expiry = datetime.fromtimestamp(info["expiry"])
+            # The same token again may carry a shortened expiry (its node replaced it)
+            if session.token == token or session.expiry is None or expiry >= session.expiry:
+                if session.token and session.token != token:
+                    self._forget_remote_token(session.token)
+                self._by_token[token] = session
+                self._remote_checked[token] = time.monotonic()
+                session.token = token
+                session.expiry = expiry
+            self._remember(token, session, datetime.fromtimestamp(info["issued"]), expiry)
+            return session if session.token == token else None
+
+    def resolve_at(self, token: str, scanned_at: datetime) -> Optional[AttendanceSession]:
+        """Session whose token was valid at scanned_at (within the batch retention window)"""
+        entry = self._recent.get(token)
+        if entry is None:
+            # Adopting records the token's window even when it is no longer the newest
+            self._adopt_remote_token(token)
+            entry = self._recent.get(token)
+        if entry is None:
+            return None
+        session, issued_at, expiry = entry
+        if not issued_at <= scanned_at <= expiry:
+            return None
+        if session.session_id not in self._sessions and session.session_id not in self._remote_sessions:
+            return None
+        return session
+
+    def update_token(self, session_id: str, token: str, expiry: datetime):
+        """Install an externally generated token (e.g. from the main window)"""
+        with self._condition:
+            session = self._sessions[session_id]
+            publications = self._install_token(session, token, expiry)
+        self._publish(publications)
+
+    def _install_token(self, session: AttendanceSession, token: str, expiry: datetime) -> List[Publication]:
+        """Swap the token index entry; readers see either the old or the new token
+
+        Called with the lock held, so the shared-state writes that let other
+        nodes resolve the token are returned for _publish() instead of made here.
+        """
+        now = datetime.now()
+        replaced = session.token if session.token != token else None
+        self._by_token[token] = session
+        if replaced:
+            self._by_token.pop(replaced, None)
+        session.token = token
+        session.expiry = expiry
+        TOKEN_ROTATIONS.inc()
+
+        # Let other nodes resolve the token, including late batch scans
+        publications = [(token, self._token_info(session, now, expiry),
+                         (expiry - now).total_seconds() + server_config.BATCH_MAX_AGE)]
+        self._remember(token, session, now, expiry)
+        if replaced:
+            publications.extend(self._retire_token(session, replaced, now))
+        return publications
+
+    def _publish(self, publications: List[Publication]):
+        """Write tokens to shared state; never called with the lock held, as it may be network I/O"""
+        for token, info, ttl in publications:
+            try:
+                self.shared_state.publish_token(token, info, ttl)
+            except SharedStateError as e:
+                logger.error("❌ Could not publish token %s to shared state: %s", token[-4:], e)
+
+    def _token_info(self, session: AttendanceSession, issued: datetime, expiry: datetime) -> Dict[str, Any]:
+        return {
+            "session_id": session.session_id,
+            "node": self.node_id,
+            "room": session.room,
+            "interval": session.interval,
+            "run_id": session.run_id,
+            "allowed_subnet": str(session.allowed_network) if session.allowed_network else None,
+            "issued": issued.timestamp(),
+            "expiry": expiry.timestamp()
+        }
+
+    def _retire_token(self, session: AttendanceSession, token: str, now: datetime) -> List[Publication]:
+        """End a replaced token's window now, here and (once published) on every node
+
+        Batch scans made before now still validate against it.
+        """
+        entry = self._recent.get(token)
+        if entry is None:
+            return []
+        _session, issued, expiry = entry
+        if expiry <= now:
+            return []
+        self._recent[token] = (session, issued, now)
+        return [(token, self._token_info(session, issued, now), server_config.BATCH_MAX_AGE)]
+
+    def _remember(self, token: str, session: AttendanceSession, issued_at: datetime, expiry: datetime):
+        """Keep the token for late batch validation, forgetting expired history"""
+        now = datetime.now()
+        self._recent[token] = (session, issued_at, expiry)
+        self._recent_order.append((expiry, token))
+        cutoff = now - timedelta(seconds=server_config.BATCH_MAX_AGE)
+        while self._recent_order and self._recent_order[0][0] < cutoff:
+            _expiry, old_token = self._recent_order.popleft()
+            if self._recent.get(old_token, (None, None, now))[2] < cutoff:
+                del self._recent[old_token]
+
+    def _rotate(self, session: AttendanceSession, due: Optional[float] = None) -> List[Publication]:
+        """Issue a new token for a managed session and schedule the next rotation (lock held)
+
+        The next rotation is due one interval after this one was due, so the
+        cost of rotating does not accumulate as drift; after a stall longer
+        than an interval the schedule restarts from now instead of bursting.
+        """
+        now = time.monotonic()
+        next_due = (now if due is None else due) + session.interval
+        if next_due <= now:
+            next_due = now + session.interval
+        publications = self._install_token(session, secrets.token_urlsafe(9),
+                                           datetime.now() + timedelta(seconds=next_due - now))
+        self._sequence += 1
+        heapq.heappush(self._schedule, (next_due, self._sequence, session.session_id))
+        self._condition.notify()
+        return publications
+
+    def start(self):
+        """Start rotating managed sessions in a background thread"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._rotation_thread = threading.Thread(target=self._rotation_loop, name="session-rotation", daemon=True)
+        self._rotation_thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._rotation_thread and self._rotation_thread is not threading.current_thread():
+            self._rotation_thread.join(timeout=1)
+
+    def _rotation_loop(self):
+        """Rotate every due session; one thread serves all rooms"""
+        while True:
+            publications: List[Publication] = []
+            with self._condition:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                while self._schedule and self._schedule[0][0] <= now:
+                    due, _sequence, session_id = heapq.heappop(self._schedule)
+                    session = self._sessions.get(session_id)
+                    if session is not None:
+                        publications.extend(self._rotate(session, due))
+                if not publications:
+                    timeout = self._schedule[0][0] - now if self._schedule else None
+                    self._condition.wait(timeout)
+            # Outside the lock: a slow shared state delays publication, not rotation or scans
+            self._publish(publications)
@@ -0,0 +1,270 @@
+"""
+Shared State - Token, attendance dedup and rate-limit state shared between server nodes
+smart_attendance_system/src/attendance/core/shared_state.py
+"""
+import json
+import select
+import socket
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, List, Any, Sequence, Tuple
+
+from .metrics import metrics_registry
+from ..config.settings import server_config
+
+logger = logging.getLogger(__name__)
+
+SHARED_STATE_LATENCY = metrics_registry.histogram(
+    "attendance_shared_state_seconds", "Shared state round-trip latency")
+
+class SharedStateError(Exception):
+    """Raised when the shared state backend cannot be reached or rejects a command"""
+
+def _present_key(scope: str) -> str:
+    """Present-set key for one run of a session (see AttendanceSession.present_scope)"""
+    return f"present:{scope}"
+
+class SharedState(ABC):
+    """Interface for state that must agree across every node serving scans"""
+
+    @abstractmethod
+    def publish_token(self, token: str, info: Dict[str, Any], ttl: float):
+        """Make a token resolvable by every node for ttl seconds"""
+
+    @abstractmethod
+    def lookup_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Token info published by any node, or None"""
+
+    @abstractmethod
+    def revoke_token(self, token: str):
+        """Stop a token resolving on every node"""
+
+    @abstractmethod
+    def mark_present_many(self, scope: str, members: Sequence[str]) -> List[bool]:
+        """Add members to the present set for scope; True for those not already present"""
+
+    @abstractmethod
+    def unmark_present(self, scope: str, member: str):
+        """Undo a present mark (e.g. when the database insert failed)"""
+
+    @abstractmethod
+    def hit_rate(self, key: str, window: float) -> int:
+        """Increment and return the counter for key in the current fixed window"""
+
+    def mark_present(self, scope: str, member: str) -> bool:
+        return self.mark_present_many(scope, [member])[0]
+
+    def close(self):
+        pass
+
+class InProcessState(SharedState):
+    """Single-node implementation backed by dictionaries"""
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, float]] = {}  # key -> (value, monotonic expiry)
+        self._lock = threading.Lock()
+
+    def _get_live(self, key: str, now: float) -> Any:
+        entry = self._values.get(key)
+        if entry is None or entry[1] <= now:
+            return None
+        return entry[0]
+
+    def publish_token(self, token: str, info: Dict[str, Any], ttl: float):
+        with self._lock:
+            now = time.monotonic()
+            self._values[f"tok:{token}"] = (info, now + ttl)
+            # Opportunistic sweep keeps expired tokens from accumulating
+            if len(self._values) > 1024:
+                self._values = {key: entry for key, entry in self._values.items() if entry[1] > now}
+
+    def lookup_token(self, token: str) -> Optional[Dict[str, Any]]:
+        return self._get_live(f"tok:{token}", time.monotonic())
+
+    def revoke_token(self, token: str):
+        with self._lock:
+            self._values.pop(f"tok:{token}", None)
+
+    def mark_present_many(self, scope: str, members: Sequence[str]) -> List[bool]:
+        key = _present_key(scope)
+        with self._lock:
+            now = time.monotonic()
+            present = self._get_live(key, now)
+            if present is None:
+                present = set()
+                self._values[key] = (present, now + server_config.PRESENT_TTL)
+            added = []
+            for member in members:
+                added.append(member not in present)
+                present.add(member)
+            return added
+
+    def unmark_present(self, scope: str, member: str):
+        with self._lock:
+            present = self._get_live(_present_key(scope), time.monotonic())
+            if present is not None:
+                present.discard(member)
+
+    def hit_rate(self, key: str, window: float) -> int:
+        bucket = f"rate:{key}:{int(time.time() // window)}"
+        with self._lock:
+            now = time.monotonic()
+            count = (self._get_live(bucket, now) or 0) + 1
+            self._values[bucket] = (count, now + window * 2)
+            return count
+
+# Commands whose effect and reply are the same when replayed; a pipeline made only of these may be re-sent
+IDEMPOTENT_COMMANDS = frozenset({"GET", "SET", "DEL", "SREM", "PEXPIRE"})
+
+def _encode_command(args: Sequence[Any]) -> bytes:
+    """Encode one command in the RESP wire format"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+class _RespConnection:
+    """One TCP connection speaking RESP (compatible with Redis and tools/kv_server.py)"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+
+    def is_stale(self) -> bool:
+        """True if the server closed this idle connection (it is readable with nothing requested)"""
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """Send all commands in one write and read every reply"""
+        self.sock.sendall(b"".join(_encode_command(command) for command in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, SharedStateError):
+                raise reply
+        return replies
+
+    def _read_reply(self) -> Any:
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by shared state server")
+        prefix, rest = line[:1], line[1:-2]
+        if prefix == b"+":
+            return rest.decode('utf-8')
+        if prefix == b"-":
+            return SharedStateError(rest.decode('utf-8'))
+        if prefix == b":":
+            return int(rest)
+        if prefix == b"$":
+            length = int(rest)
+            return None if length < 0 else self.reader.read(length + 2)[:-2]
+        if prefix == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"unexpected reply prefix {prefix!r}")
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+class KVState(SharedState):
+    """Network implementation over a RESP key-value server; one pipelined round-trip per operation"""
+
+    def __init__(self, host: str, port: int, timeout: float = server_config.SHARED_STATE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._local = threading.local()  # One connection per request thread
+        self._connections: List[_RespConnection] = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> _RespConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and connection.is_stale():
+            # Dropped while idle (server restart, idle timeout): reconnect before writing anything
+            self._discard(connection)
+            connection = None
+        if connection is None:
+            connection = _RespConnection(self.host, self.port, self.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _discard(self, connection: _RespConnection):
+        connection.close()
+        self._local.connection = None
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+
+    @SHARED_STATE_LATENCY.time()
+    def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """Run commands in one round-trip
+
+        A failure before anything was sent is retried once on a new
+        connection. After a send, the server may already have applied the
+        commands, so they are only replayed when all are idempotent: a
+        replayed SADD would report a never-confirmed student as a duplicate,
+        and a replayed INCR would count twice.
+        """
+        replayable = all(str(command[0]).upper() in IDEMPOTENT_COMMANDS for command in commands)
+        for attempt in (1, 2):
+            connection = None
+            try:
+                connection = self._connection()
+                return connection.pipeline(commands)
+            except (OSError, ConnectionError) as e:
+                if connection is not None:
+                    self._discard(connection)
+                if attempt == 2 or (connection is not None and not replayable):
+                    raise SharedStateError(f"shared state unreachable at {self.host}:{self.port}: {e}") from e
+
+    def publish_token(self, token: str, info: Dict[str, Any], ttl: float):
+        self.pipeline([("SET", f"tok:{token}", json.dumps(info), "PX", max(1, int(ttl * 1000)))])
+
+    def lookup_token(self, token: str) -> Optional[Dict[str, Any]]:
+        value = self.pipeline([("GET", f"tok:{token}")])[0]
+        return json.loads(value) if value else None
+
+    def revoke_token(self, token: str):
+        self.pipeline([("DEL", f"tok:{token}")])
+
+    def mark_present_many(self, scope: str, members: Sequence[str]) -> List[bool]:
+        key = _present_key(scope)
+        commands = [("SADD", key, member) for member in members]
+        commands.append(("PEXPIRE", key, int(server_config.PRESENT_TTL * 1000)))
+        return [added == 1 for added in self.pipeline(commands)[:-1]]
+
+    def unmark_present(self, scope: str, member: str):
+        self.pipeline([("SREM", _present_key(scope), member)])
+
+    def hit_rate(self, key: str, window: float) -> int:
+        bucket = f"rate:{key}:{int(time.time() // window)}"
+        count, _ = self.pipeline([("INCR", bucket), ("PEXPIRE", bucket, int(window * 2000))])
+        return count
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+def create_shared_state(url: str = server_config.SHARED_STATE_URL) -> SharedState:
+    """Build the configured backend: empty for in-process, or kv://host:port"""
+    if not url:
+        return InProcessState()
+    address = url.split("://", 1)[-1].split("/", 1)[0]
+    host, _, port = address.rpartition(":")
+    logger.info("🔗 Using shared state at %s", address)
+    return KVState(host or "127.0.0.1", int(port))
@@ -0,0 +1,165 @@
+"""
+Token Rotation - Rotate the default session's token and hand each QR frame to its displays
+smart_attendance_system/src/attendance/core/token_rotation.py
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Union
+
+from PIL import Image
+
+from ..config.settings import app_settings
+from .adaptive_interval import AdaptiveIntervalController
+from .flask_server import AttendanceFlaskServer
+from .qr_prefetcher import QRFrame, QRPrefetcher
+from .rotation_scheduler import RotationScheduler, RotationTick
+from .scan_process import ScanServerProcess
+
+logger = logging.getLogger(__name__)
+
+FrameListener = Callable[[str, datetime, Image.Image], None]
+ErrorListener = Callable[[Exception], None]
+ScanServer = Union[AttendanceFlaskServer, ScanServerProcess]
+
+class TokenRotation:
+    """Background loop that swaps in each prefetched frame when its window begins
+
+    Has no UI dependency: the Tk window and the headless runtime both
+    subscribe listeners, which are called on the rotation thread.
+    """
+
+    def __init__(self, scheduler: Optional[RotationScheduler] = None):
+        self.scheduler = scheduler or RotationScheduler()
+        self.prefetcher = QRPrefetcher(self.scheduler)
+        self.server: Optional[ScanServer] = None
+        self.interval_controller: Optional[AdaptiveIntervalController] = None
+        self.current_token: Optional[str] = None
+        self.token_expiry: Optional[datetime] = None
+        self.is_running = False
+        self._new_run = False  # The next token activated starts a new lecture on the server
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._frame_listeners: List[FrameListener] = []
+        self._error_listeners: List[ErrorListener] = []
+
+    def set_server(self, server: ScanServer):
+        """Install every new token on server (and report rotation stats through it)"""
+        self.server = server
+        server.rotation = self.scheduler
+        self.prefetcher.set_port(server.port)
+        if app_settings.QR_ADAPTIVE_INTERVAL:
+            self.interval_controller = AdaptiveIntervalController(
+                self.scheduler.interval, load=server.scan_load)
+            server.interval_controller = self.interval_controller
+
+    def add_frame_listener(self, listener: FrameListener):
+        self._frame_listeners.append(listener)
+
+    def add_error_listener(self, listener: ErrorListener):
+        self._error_listeners.append(listener)
+
+    def start(self):
+        """Start rotating in a background thread"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._new_run = True
+        self.prefetcher.start()
+        self._thread = threading.Thread(target=self._rotation_loop, name="token-rotation", daemon=True)
+        self._thread.start()
+        logger.info("🔄 QR generation started")
+
+    def refresh(self):
+        """Restart the schedule now; the new frame is shown once rendered"""
+        self.prefetcher.reset()
+        self._wakeup.set()
+
+    def stop(self):
+        """Stop rotating and cancel queued renders"""
+        if self.is_running:
+            self.is_running = False
+            self._wakeup.set()
+            if self._thread and self._thread.is_alive():
+                self._thread.join(timeout=2)
+            self.prefetcher.stop()
+            logger.info("🛑 QR generation stopped")
+
+    def _rotation_loop(self):
+        skipped = 0
+        while self.is_running:
+            try:
+                frame = self.prefetcher.next_frame()
+
+                if self._port_changed(frame) or not self._wait_for_activation(frame) or self._port_changed(frame):
+                    continue
+                if self.scheduler.current_index() > frame.tick.index:
+                    skipped += 1  # Fell a whole window behind; the next frame is already due
+                    continue
+
+                # Expiry under the current anchor, in case the wall clock was stepped since rendering
+                self.scheduler.follow_wall_clock()
+                tick = self.scheduler.tick(frame.tick.index)
+                self._activate(frame.token, tick.expiry, frame.image)
+                self.scheduler.record_rotation(tick, skipped)
+                skipped = 0
+                self._adapt_interval(tick)
+
+            except Exception as e:
+                logger.error("❌ Error in QR generation: %s", e)
+                for listener in self._error_listeners:
+                    listener(e)
+                time.sleep(5)  # Wait before retrying
+                self.prefetcher.reset()
+
+    def _port_changed(self, frame: QRFrame) -> bool:
+        """Re-render (from the current window) if the server moved to another port since frame was rendered"""
+        if self.server is None or frame.port == self.server.port:
+            return False
+        logger.info("🔀 Server now on port %s; re-rendering QR frames", self.server.port)
+        self.prefetcher.set_port(self.server.port)
+        return True
+
+    def _wait_for_activation(self, frame: QRFrame) -> bool:
+        """Sleep until frame's window begins; False if a refresh replaced it or rotation stopped"""
+        while self.is_running:
+            if not self.scheduler.wait_until(frame.tick.deadline, self._wakeup):
+                return True
+            if not self.prefetcher.is_current(frame):
+                return False
+        return False
+
+    def _adapt_interval(self, tick: RotationTick):
+        """Switch to the controller's interval from the next window boundary on"""
+        if self.interval_controller is None:
+            return
+        interval = self.interval_controller.observe()
+        if interval is not None:
+            # The frame just shown keeps its expiry; re-anchor where it ends
+            self.scheduler.set_interval(interval)
+            self.prefetcher.reset(at=self.scheduler.tick(tick.index + 1))
+
+    def _activate(self, token: str, expiry: datetime, image: Image.Image):
+        """Make token current on the server, then hand the frame to the displays"""
+        self.current_token = token
+        self.token_expiry = expiry
+
+        if self.server:
+            if self._new_run:
+                # Scans from an earlier start (e.g. the previous lecture) must not count as duplicates
+                self.server.begin_run()
+                self._new_run = False
+            self.server.update_token(token, expiry)
+
+        for listener in self._frame_listeners:
+            try:
+                listener(token, expiry, image)
+            except Exception as e:
+                logger.error("❌ QR frame listener failed: %s", e)
+
+        logger.info("🔄 QR updated: %s", token)
+
+# Global token rotation instance
+token_rotation = TokenRotation()
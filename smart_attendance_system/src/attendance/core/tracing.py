@@ -0,0 +1,185 @@
+"""
+Tracing - Sampled per-request spans written to a local JSON-lines file
+smart_attendance_system/src/attendance/core/tracing.py
+"""
+import os
+import queue
+import random
+import threading
+import time
+import logging
+from datetime import datetime
+from functools import wraps
+from typing import Optional, List, Dict, Any, Callable
+
+from ..config.settings import server_config
+from ..utils.json_codec import dumps_bytes
+from ..utils.log_rotation import RotatingCompressedFileHandler
+
+logger = logging.getLogger(__name__)
+
+class _NoopContext:
+    """Shared do-nothing context used when a request is not sampled"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP = _NoopContext()
+
+class Trace:
+    """One sampled request and the spans recorded inside it"""
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.trace_id = os.urandom(8).hex()
+        self.name = name
+        self.attributes = attributes
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Dict[str, Any]] = []
+        self.depth = 0
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "spans": self.spans
+        }
+
+class _SpanContext:
+    """Times one phase of the current trace"""
+
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.trace.depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        ended = time.perf_counter()
+        trace = self.trace
+        trace.depth -= 1
+        trace.spans.append({
+            "name": self.name,
+            "depth": trace.depth,
+            "offset_ms": round((self.started - trace.started) * 1000, 3),
+            "duration_ms": round((ended - self.started) * 1000, 3)
+        })
+        return False
+
+class _TraceContext:
+    """Opens a trace for the calling thread and queues it for writing on exit"""
+
+    __slots__ = ("tracer", "trace")
+
+    def __init__(self, tracer: "Tracer", trace: Trace):
+        self.tracer = tracer
+        self.trace = trace
+
+    def __enter__(self) -> Trace:
+        self.tracer._local.trace = self.trace
+        return self.trace
+
+    def __exit__(self, *exc_info):
+        self.trace.duration = time.perf_counter() - self.trace.started
+        self.tracer._local.trace = None
+        self.tracer._submit(self.trace)
+        return False
+
+class Tracer:
+    """Samples requests and writes their span breakdown off the request thread"""
+
+    def __init__(self, sample_rate: float = server_config.TRACE_SAMPLE_RATE,
+                 trace_file: Optional[str] = None, max_bytes: int = server_config.TRACE_MAX_BYTES,
+                 backup_count: int = server_config.TRACE_BACKUP_COUNT):
+        self.sample_rate = sample_rate
+        self.trace_file = trace_file or self._default_trace_file()
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._local = threading.local()
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=1000)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self.dropped = 0
+
+    def _default_trace_file(self) -> str:
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+        return os.path.join(base_dir, 'logs', server_config.TRACE_FILE)
+
+    def trace(self, name: str, **attributes):
+        """Start a trace for this request if it is sampled"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return _NOOP
+        return _TraceContext(self, Trace(name, attributes))
+
+    def span(self, name: str):
+        """Time a phase of the current trace; free when the request is not sampled"""
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return _NOOP
+        return _SpanContext(trace, name)
+
+    def traced(self, name: str) -> Callable:
+        """Decorator recording the wrapped call as a span"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                trace = getattr(self._local, 'trace', None)
+                if trace is None:
+                    return func(*args, **kwargs)
+                with _SpanContext(trace, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def annotate(self, **attributes):
+        """Attach attributes to the current trace, if any"""
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.attributes.update(attributes)
+
+    def _submit(self, trace: Trace):
+        """Hand a finished trace to the writer thread without blocking"""
+        if self._writer is None:
+            self._start_writer()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start_writer(self):
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        """Append finished traces to the JSON-lines file, rotated like the application log"""
+        os.makedirs(os.path.dirname(self.trace_file), exist_ok=True)
+        handler = RotatingCompressedFileHandler(self.trace_file, max_bytes=self.max_bytes,
+                                                backup_count=self.backup_count)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for trace in batch:
+                # The record carries one finished line; the handler only decides when to rotate
+                handler.handle(logging.makeLogRecord({"msg": dumps_bytes(trace.to_record()).decode('utf-8')}))
+
+# Global tracer instance
+tracer = Tracer()
@@ -0,0 +1,210 @@
+"""
+Worker Pool Server - Serve HTTP from a fixed set of worker threads with a bounded accept queue
+smart_attendance_system/src/attendance/core/worker_pool.py
+"""
+import queue
+import socket
+import threading
+import time
+import logging
+from typing import Any, List, Optional, Set, Tuple
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from werkzeug.wsgi import LimitedStream
+
+from .metrics import metrics_registry
+from ..config.settings import server_config
+from ..utils.json_codec import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+ACCEPT_QUEUE_WAIT = metrics_registry.histogram(
+    "attendance_accept_queue_wait_seconds", "Time accepted connections waited for a worker")
+CONNECTIONS_REJECTED = metrics_registry.counter(
+    "attendance_connections_rejected_total", "Connections refused because the accept queue was full")
+
+# Written straight to the socket when no worker can take the connection
+_QUEUE_FULL_BODY = dumps_bytes({
+    "status": "⏳ Server Busy",
+    "error": "SERVER_BUSY",
+    "message": "Too many scans right now, please scan the next QR code"
+})
+QUEUE_FULL_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"Content-Length: %d\r\n\r\n%s" % (len(_QUEUE_FULL_BODY), _QUEUE_FULL_BODY)
+)
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """HTTP/1.1 handler that keeps connections open between requests
+
+    Werkzeug's own handler closes every connection after one response. Here
+    responses that declare a Content-Length keep the connection alive; streamed
+    responses (e.g. /events) are delimited by closing it. Idle connections give
+    their worker back after KEEPALIVE_TIMEOUT.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = server_config.KEEPALIVE_TIMEOUT
+
+    def run_wsgi(self):
+        if self.headers.get("Expect", "").lower().strip() == "100-continue":
+            self.wfile.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        self.environ = environ = self.make_environ()
+        # Bound the body so an unread remainder can be skipped before the next request
+        request_body = None
+        if "wsgi.input_terminated" not in environ:
+            request_body = LimitedStream(self.rfile, int(environ.get("CONTENT_LENGTH") or 0))
+            environ["wsgi.input"] = request_body
+
+        response_start: List[Any] = []
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info: Any = None):
+            if exc_info and response_start and response_start[2]:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response_start[:] = [status, headers, False]
+            return write_body
+
+        def write_body(data: bytes):
+            if self.command == "HEAD":
+                data = b""
+            if not response_start[2]:
+                send_headers(data)
+            elif data:
+                self.wfile.write(data)
+
+        def send_headers(data: bytes = b""):
+            status, headers, _sent = response_start
+            has_length = any(name.lower() == "content-length" for name, _value in headers)
+            if not has_length or "wsgi.input_terminated" in environ:
+                self.close_connection = True
+            lines = [f"HTTP/1.1 {status}\r\n"]
+            lines.extend(f"{name}: {value}\r\n" for name, value in headers)
+            lines.append("Connection: close\r\n\r\n" if self.close_connection else "\r\n")
+            # One write: a lone header segment waits on the client's delayed ACK
+            self.wfile.write("".join(lines).encode("latin-1") + data)
+            response_start[2] = True
+
+        try:
+            application_iter = self.server.app(environ, start_response)
+            try:
+                for data in application_iter:
+                    write_body(data)
+                    self.wfile.flush()
+                if not response_start[2]:
+                    send_headers()
+            finally:
+                if hasattr(application_iter, "close"):
+                    application_iter.close()
+            if request_body is not None:
+                request_body.exhaust()
+        except (ConnectionError, socket.timeout) as e:
+            self.connection_dropped(e, environ)
+            self.close_connection = True
+        except Exception:
+            self.close_connection = True
+            if response_start and response_start[2]:
+                raise  # Headers already sent; the connection is closed
+            logger.exception("💥 Error on request %s %s", environ.get("REQUEST_METHOD"), environ.get("PATH_INFO"))
+            self.wfile.write(b"HTTP/1.1 500 Internal Server Error\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+
+    def log_error(self, format: str, *args: Any):
+        # An idle keep-alive connection timing out is routine, not an error
+        if format.startswith("Request timed out"):
+            return
+        super().log_error(format, *args)
+
+class WorkerPoolWSGIServer(BaseWSGIServer):
+    """Werkzeug server whose accept loop hands connections to worker_count long-lived threads
+
+    The accept loop never blocks on a worker: when accept_queue connections are
+    already waiting, new ones get an immediate 503 instead of piling up.
+    """
+
+    multithread = True
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, app: Any,
+                 worker_count: int = server_config.WORKER_COUNT,
+                 accept_queue: int = server_config.ACCEPT_QUEUE):
+        self.worker_count = worker_count
+        self._queue: "queue.Queue[Optional[Tuple[socket.socket, Any, float]]]" = queue.Queue(accept_queue)
+        self._active: Set[socket.socket] = set()  # Connections currently owned by a worker
+        self._busy_lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        super().__init__(host, port, app, handler=KeepAliveRequestHandler)
+        for index in range(worker_count):
+            worker = threading.Thread(target=self._worker_loop, name=f"http-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def process_request(self, request: socket.socket, client_address: Any):
+        """Queue the connection for a worker, or refuse it at once when the queue is full"""
+        try:
+            self._queue.put_nowait((request, client_address, time.perf_counter()))
+        except queue.Full:
+            CONNECTIONS_REJECTED.inc()
+            try:
+                request.sendall(QUEUE_FULL_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def _worker_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            request, client_address, queued_at = item
+            ACCEPT_QUEUE_WAIT.observe(time.perf_counter() - queued_at)
+            try:
+                # Kept-alive and streamed responses are small writes; send them as they come
+                request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+            with self._busy_lock:
+                self._active.add(request)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._busy_lock:
+                    self._active.discard(request)
+
+    def stats(self) -> dict:
+        return {
+            "mode": "pool",
+            "workers": self.worker_count,
+            "busy": len(self._active),
+            "queued": self._queue.qsize()
+        }
+
+    def server_close(self):
+        """Close the listening socket, then let workers finish their current connection and exit"""
+        super().server_close()
+        # Connections still waiting in the queue will not be served
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.shutdown_request(item[0])
+        # Requests were drained before this; end idle keep-alive reads so workers exit now
+        with self._busy_lock:
+            for request in self._active:
+                try:
+                    request.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass
+        for _worker in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            if worker is not threading.current_thread():
+                worker.join(timeout=server_config.KEEPALIVE_TIMEOUT + 1)
+        self._workers = []
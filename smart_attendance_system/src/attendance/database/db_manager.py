@@ -4,10 +4,17 @@ smart_attendance_system/src/attendance/database/db_manager.py
 """
 import mysql.connector
 from mysql.connector import Error
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
+from contextlib import contextmanager
 from datetime import datetime
 import logging
+import math
+import threading
+import time
 from ..config.settings import database_config
+from ..core import deadline
+from ..core.metrics import DB_QUERY_LATENCY
+from ..core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -15,10 +22,43 @@ class DatabaseManager:
     """Manages database connections and operations"""
 
     def __init__(self):
-        self.connection: Optional[mysql.connector.MySQLConnection] = None
+        self._shared_connection: Optional[mysql.connector.MySQLConnection] = None
+        # With thread affinity each (long-lived pool) thread keeps its own connection
+        self.thread_affinity = False
+        self._local = threading.local()
+        self._thread_connections: List[mysql.connector.MySQLConnection] = []
+        self._connections_lock = threading.Lock()
 
+    @property
+    def connection(self) -> Optional[mysql.connector.MySQLConnection]:
+        if self.thread_affinity:
+            return getattr(self._local, 'connection', None)
+        return self._shared_connection
+
+    @connection.setter
+    def connection(self, connection: Optional[mysql.connector.MySQLConnection]):
+        if not self.thread_affinity:
+            self._shared_connection = connection
+            return
+        previous = getattr(self._local, 'connection', None)
+        self._local.connection = connection
+        with self._connections_lock:
+            if previous is not None and previous in self._thread_connections:
+                self._thread_connections.remove(previous)
+            if connection is not None:
+                self._thread_connections.append(connection)
+
+    def set_thread_affinity(self, enabled: bool):
+        """Give every thread its own connection (for fixed worker pools) or share one"""
+        if enabled != self.thread_affinity:
+            self.close_connection()
+            self.thread_affinity = enabled
+
+    @DB_QUERY_LATENCY.time("connect")
+    @tracer.traced("db.connect")
     def connect(self) -> bool:
         """Establish database connection"""
+        started = time.perf_counter()
         try:
             self.connection = mysql.connector.connect(
                 host=database_config.HOST,
@@ -26,19 +66,79 @@ class DatabaseManager:
                 password=database_config.PASSWORD,
                 database=database_config.DATABASE,
                 port=database_config.PORT,
-                autocommit=True
+                autocommit=True,
+                connection_timeout=database_config.CONNECT_TIMEOUT
             )
-            logger.info("✅ Database connected successfully")
+            logger.info("✅ Database connected successfully in %.1f ms", (time.perf_counter() - started) * 1000)
             return True
         except Error as e:
-            logger.error(f"❌ Database connection error: {e}")
+            logger.error("❌ Database connection error: %s", e)
             return False
 
     def close_connection(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            logger.info("🔌 Database connection closed")
+        """Close database connection (every worker's connection when thread affinity is on)"""
+        if self.thread_affinity:
+            with self._connections_lock:
+                connections, self._thread_connections = self._thread_connections, []
+        else:
+            connections = [self._shared_connection] if self._shared_connection else []
+        for connection in connections:
+            if connection.is_connected():
+                connection.close()
+                logger.info("🔌 Database connection closed")
+
+    def _ensure_connected(self) -> bool:
+        if not self.connection or not self.connection.is_connected():
+            return self.connect()
+        return True
+
+    @staticmethod
+    def _execution_hint() -> str:
+        """Optimizer hint capping a SELECT at the request's remaining budget"""
+        left = deadline.remaining()
+        return "" if left is None else f"/*+ MAX_EXECUTION_TIME({max(1, int(left * 1000))}) */ "
+
+    @staticmethod
+    def _lock_wait_hint() -> str:
+        """Optimizer hint capping a write's row-lock wait (whole seconds, at least 1)"""
+        left = deadline.remaining()
+        return "" if left is None else f"/*+ SET_VAR(innodb_lock_wait_timeout={max(1, math.ceil(left))}) */ "
+
+    @contextmanager
+    def _socket_budget(self) -> Iterator[None]:
+        """Bound socket reads/writes by the remaining budget (pure-Python connector only)
+
+        Only on a thread's own connection: a shared connection's socket serves
+        every request thread, so one request's budget must not become the
+        others' timeout. Shared connections rely on the per-statement hints.
+        """
+        left = deadline.remaining()
+        if left is None or not self.thread_affinity:
+            yield
+            return
+        sock = getattr(getattr(self.connection, '_socket', None), 'sock', None)
+        if sock is None:
+            yield
+            return
+        previous = sock.gettimeout()
+        sock.settimeout(max(left, 0.001))
+        try:
+            yield
+        finally:
+            sock.settimeout(previous)
+
+    def _abandon_if_expired(self, phase: str):
+        """After a failed query: if the deadline passed, give up (dropping a thread's own, possibly mid-reply, connection)"""
+        left = deadline.remaining()
+        if left is not None and left <= 0:
+            # A shared connection may be mid-query for other threads; leave it to them
+            if self.thread_affinity:
+                try:
+                    self.connection.close()
+                except Exception:
+                    pass
+                self.connection = None
+            deadline.check(phase)
 
     def test_connection(self) -> bool:
         """Test database connection"""
@@ -47,42 +147,110 @@ class DatabaseManager:
             return True
         return False
 
+    @DB_QUERY_LATENCY.time("get_student_by_ip")
+    @tracer.traced("db.get_student_by_ip")
     def get_student_by_ip(self, ip_address: str) -> Optional[Dict[str, Any]]:
         """Get student information by IP address"""
+        deadline.check("get_student_by_ip")
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return None
+            if not self._ensure_connected():
+                return None
 
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM students WHERE ip = %s", (ip_address,))
-            result = cursor.fetchone()
-            cursor.close()
+            with self._socket_budget():
+                cursor = self.connection.cursor(dictionary=True)
+                cursor.execute(f"SELECT {self._execution_hint()}* FROM students WHERE ip = %s", (ip_address,))
+                result = cursor.fetchone()
+                cursor.close()
             return result
         except Error as e:
-            logger.error(f"❌ Error fetching student: {e}")
+            self._abandon_if_expired("get_student_by_ip")
+            logger.error("❌ Error fetching student: %s", e)
             return None
 
-    def mark_attendance(self, regno: str, name: str, ip: str, created_at: datetime) -> bool:
-        """Mark attendance for a student"""
+    @DB_QUERY_LATENCY.time("mark_attendance")
+    @tracer.traced("db.mark_attendance")
+    def mark_attendance(self, regno: str, name: str, ip: str, created_at: datetime,
+                        session_id: Optional[str] = None, room: Optional[str] = None) -> bool:
+        """Mark attendance for a student, tagged with the session it was taken in"""
+        deadline.check("mark_attendance")
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            if not self._ensure_connected():
+                return False
 
-            cursor = self.connection.cursor()
-            cursor.execute(
-                "INSERT INTO attendance (regno, name, ip, created_at) VALUES (%s, %s, %s, %s)",
-                (regno, name, ip, created_at)
-            )
-            self.connection.commit()
-            cursor.close()
-            logger.info(f"✅ Attendance marked: {regno} - {name}")
+            with self._socket_budget():
+                cursor = self.connection.cursor()
+                cursor.execute(
+                    f"INSERT {self._lock_wait_hint()}INTO attendance (regno, name, ip, created_at, session_id, room) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    (regno, name, ip, created_at, session_id, room)
+                )
+                self.connection.commit()
+                cursor.close()
+            logger.info("✅ Attendance marked: %s - %s", regno, name)
+            return True
+        except Error as e:
+            self._abandon_if_expired("mark_attendance")
+            logger.error("❌ Error marking attendance: %s", e)
+            return False
+
+    @DB_QUERY_LATENCY.time("get_students_by_ips")
+    @tracer.traced("db.get_students_by_ips")
+    def get_students_by_ips(self, ip_addresses: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Get students for many IP addresses in one query, keyed by IP"""
+        if not ip_addresses:
+            return {}
+        deadline.check("get_students_by_ips")
+        try:
+            if not self._ensure_connected():
+                return None
+
+            placeholders = ", ".join(["%s"] * len(ip_addresses))
+            with self._socket_budget():
+                cursor = self.connection.cursor(dictionary=True)
+                cursor.execute(f"SELECT {self._execution_hint()}* FROM students WHERE ip IN ({placeholders})",
+                               tuple(ip_addresses))
+                results = cursor.fetchall()
+                cursor.close()
+            return {student["ip"]: student for student in results}
+        except Error as e:
+            self._abandon_if_expired("get_students_by_ips")
+            logger.error("❌ Error fetching students: %s", e)
+            return None
+
+    @DB_QUERY_LATENCY.time("mark_attendance_batch")
+    @tracer.traced("db.mark_attendance_batch")
+    def mark_attendance_batch(self, rows: List[tuple]) -> bool:
+        """Insert many (regno, name, ip, created_at, session_id, room) rows in one transaction"""
+        if not rows:
+            return True
+        deadline.check("mark_attendance_batch")
+        try:
+            if not self._ensure_connected():
+                return False
+
+            with self._socket_budget():
+                self.connection.start_transaction()
+                cursor = self.connection.cursor()
+                cursor.executemany(
+                    f"INSERT {self._lock_wait_hint()}INTO attendance (regno, name, ip, created_at, session_id, room) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    rows
+                )
+                self.connection.commit()
+                cursor.close()
+            logger.info("✅ Attendance batch marked: %d records", len(rows))
             return True
         except Error as e:
-            logger.error(f"❌ Error marking attendance: {e}")
+            try:
+                self.connection.rollback()
+            except Error:
+                pass
+            self._abandon_if_expired("mark_attendance_batch")
+            logger.error("❌ Error marking attendance batch: %s", e)
             return False
 
+    @DB_QUERY_LATENCY.time("get_all_attendance_records")
+    @tracer.traced("db.get_all_attendance_records")
     def get_all_attendance_records(self) -> List[Dict[str, Any]]:
         """Get all attendance records"""
         try:
@@ -92,7 +260,7 @@ class DatabaseManager:
 
             cursor = self.connection.cursor(dictionary=True)
             cursor.execute("""
-                SELECT regno, name, ip, created_at 
+                SELECT regno, name, ip, created_at, session_id, room 
                 FROM attendance 
                 ORDER BY created_at DESC
             """)
@@ -100,7 +268,7 @@ class DatabaseManager:
             cursor.close()
             return results
         except Error as e:
-            logger.error(f"❌ Error fetching attendance records: {e}")
+            logger.error("❌ Error fetching attendance records: %s", e)
             return []
 
 # Global database manager instance
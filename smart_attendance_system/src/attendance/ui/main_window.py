@@ -3,22 +3,23 @@ Main Window - Primary application interface
 smart_attendance_system/src/attendance/ui/main_window.py
 """
 import customtkinter as ctk
-import threading
-import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
 import logging
 
-from .ui_components import QRDisplayArea, ControlPanel, SystemStatusPanel
+from .ui_components import QRDisplayArea, ControlPanel, SystemStatusPanel, RecentArrivalsPanel
 from .ui_styles import ui_styles
 from ..core.qr_generator import qr_generator
-from ..core.flask_server import AttendanceFlaskServer
+from ..core.token_rotation import ScanServer, token_rotation
+from ..core.event_bus import EventSubscription, attendance_events
 from ..database.db_manager import database_manager
 from ..utils.csv_exporter import csv_exporter
 from ..config.settings import app_settings
 
 logger = logging.getLogger(__name__)
 
+EVENT_POLL_INTERVAL_MS = 500
+
 class AttendanceMainWindow(ctk.CTk):
     """Main application window with modern UI"""
 
@@ -29,11 +30,9 @@ class AttendanceMainWindow(ctk.CTk):
         self._configure_window()
 
         # Initialize application state
-        self.current_token: Optional[str] = None
-        self.token_expiry: Optional[datetime] = None
-        self.is_qr_running = False
-        self.qr_thread: Optional[threading.Thread] = None
-        self.flask_server: Optional[AttendanceFlaskServer] = None
+        self.token_rotation = token_rotation
+        self.flask_server: Optional[ScanServer] = None
+        self.event_subscription: Optional[EventSubscription] = None
 
         # Setup UI theme
         ui_styles.configure_theme()
@@ -50,6 +49,9 @@ class AttendanceMainWindow(ctk.CTk):
         # Start QR generation
         self._start_qr_generation()
 
+        # Watch live attendance events
+        self._start_event_watch()
+
     def _configure_window(self):
         """Configure main window properties"""
         self.title(f"{app_settings.TITLE} v{app_settings.VERSION}")
@@ -106,6 +108,10 @@ class AttendanceMainWindow(ctk.CTk):
         self.status_panel = SystemStatusPanel(self.sidebar)
         self.status_panel.grid(row=1, column=0, padx=16, pady=8, sticky="ew")
 
+        # Live arrivals panel
+        self.arrivals_panel = RecentArrivalsPanel(self.sidebar)
+        self.arrivals_panel.grid(row=2, column=0, padx=16, pady=8, sticky="new")
+
         # Control panel
         self.control_panel = ControlPanel(self.sidebar)
         self.control_panel.grid(row=3, column=0, padx=16, pady=(8, 16), sticky="ew")
@@ -153,55 +159,48 @@ class AttendanceMainWindow(ctk.CTk):
 
     def _start_qr_generation(self):
         """Start QR code generation in background thread"""
-        if self.is_qr_running:
-            return
+        self.token_rotation.add_frame_listener(self._on_qr_frame)
+        self.token_rotation.add_error_listener(self._on_qr_error)
+        self.token_rotation.start()
 
-        self.is_qr_running = True
-        self.qr_thread = threading.Thread(target=self._qr_generation_loop, daemon=True)
-        self.qr_thread.start()
-        logger.info("🔄 QR generation started")
+    def _on_qr_frame(self, token: str, expiry: datetime, image):
+        """Rotation thread: hand the new frame to the Tk thread"""
+        self.after(0, self.qr_display.update_qr_display, image, token, expiry.strftime('%H:%M:%S'))
 
-    def _qr_generation_loop(self):
-        """Background thread for QR code generation"""
-        while self.is_qr_running:
-            try:
-                # Generate new token
-                self.current_token = self._generate_token()
-                self.token_expiry = datetime.now() + timedelta(seconds=app_settings.QR_REFRESH_INTERVAL)
+    def _on_qr_error(self, error: Exception):
+        self.after(0, self.qr_display.show_loading_message, "❌ QR Generation Error")
 
-                # Create QR code image
-                qr_image = qr_generator.create_tkinter_image(self.current_token)
+    @property
+    def current_token(self) -> Optional[str]:
+        return self.token_rotation.current_token
 
-                # Update server token
-                if self.flask_server:
-                    self.flask_server.update_token(self.current_token, self.token_expiry)
+    @property
+    def token_expiry(self) -> Optional[datetime]:
+        return self.token_rotation.token_expiry
 
-                # Update UI in main thread
-                expiry_display = self.token_expiry.strftime('%H:%M:%S')
-                self.after(0, self.qr_display.update_qr_display, qr_image, self.current_token, expiry_display)
+    def _stop_qr_generation(self):
+        """Stop QR code generation"""
+        self.token_rotation.stop()
 
-                logger.info(f"🔄 QR updated: {self.current_token}")
+    def _start_event_watch(self):
+        """Subscribe to attendance events and poll them from the Tk loop"""
+        self.event_subscription = attendance_events.subscribe(queue_size=256)
+        self.after(EVENT_POLL_INTERVAL_MS, self._drain_attendance_events)
 
-                # Wait for next update
-                time.sleep(app_settings.QR_REFRESH_INTERVAL)
+    def _drain_attendance_events(self):
+        """Show newly recorded attendance without blocking the UI"""
+        if not self.event_subscription:
+            return
 
-            except Exception as e:
-                logger.error(f"❌ Error in QR generation: {e}")
-                self.after(0, self.qr_display.show_loading_message, "❌ QR Generation Error")
-                time.sleep(5)  # Wait before retrying
+        events = self.event_subscription.get(timeout=0)
+        if events is None:
+            return
 
-    def _generate_token(self) -> str:
-        """Generate unique attendance token"""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"ATTEND-{timestamp}"
+        arrivals = [event.data for event in events if event.type == "attendance"]
+        if arrivals:
+            self.arrivals_panel.add_arrivals(arrivals)
 
-    def _stop_qr_generation(self):
-        """Stop QR code generation"""
-        if self.is_qr_running:
-            self.is_qr_running = False
-            if self.qr_thread and self.qr_thread.is_alive():
-                self.qr_thread.join(timeout=2)
-            logger.info("🛑 QR generation stopped")
+        self.after(EVENT_POLL_INTERVAL_MS, self._drain_attendance_events)
 
     def _handle_export_csv(self):
         """Handle CSV export button click"""
@@ -213,47 +212,23 @@ class AttendanceMainWindow(ctk.CTk):
             else:
                 logger.info("ℹ️ CSV export cancelled by user")
         except Exception as e:
-            logger.error(f"❌ CSV export error: {e}")
+            logger.error("❌ CSV export error: %s", e)
 
     def _handle_refresh_qr(self):
         """Handle refresh QR button click"""
         logger.info("🔄 Manual QR refresh requested")
         self.qr_display.show_loading_message("🔄 Refreshing QR Code...")
 
-        # Generate new QR immediately
-        threading.Thread(target=self._immediate_qr_refresh, daemon=True).start()
-
-    def _immediate_qr_refresh(self):
-        """Immediately refresh QR code"""
-        try:
-            # Generate new token
-            self.current_token = self._generate_token()
-            self.token_expiry = datetime.now() + timedelta(seconds=app_settings.QR_REFRESH_INTERVAL)
-
-            # Create QR image
-            qr_image = qr_generator.create_tkinter_image(self.current_token)
-
-            # Update server
-            if self.flask_server:
-                self.flask_server.update_token(self.current_token, self.token_expiry)
-
-            # Update UI
-            expiry_display = self.token_expiry.strftime('%H:%M:%S')
-            self.after(0, self.qr_display.update_qr_display, qr_image, self.current_token, expiry_display)
-
-            logger.info(f"✅ QR refreshed manually: {self.current_token}")
-
-        except Exception as e:
-            logger.error(f"❌ Manual QR refresh error: {e}")
-            self.after(0, self.qr_display.show_loading_message, "❌ Refresh Failed")
+        # Restart the schedule now; the rotation loop shows the new frame once rendered
+        self.token_rotation.refresh()
 
     def _handle_theme_change(self, theme: str):
         """Handle theme change"""
         try:
             ctk.set_appearance_mode(theme.lower())
-            logger.info(f"🎨 Theme changed to: {theme}")
+            logger.info("🎨 Theme changed to: %s", theme)
         except Exception as e:
-            logger.error(f"❌ Theme change error: {e}")
+            logger.error("❌ Theme change error: %s", e)
 
     def _handle_window_close(self):
         """Handle application window close"""
@@ -261,6 +236,8 @@ class AttendanceMainWindow(ctk.CTk):
 
         # Stop background processes
         self._stop_qr_generation()
+        if self.event_subscription:
+            self.event_subscription.close()
 
         # Close database connection
         database_manager.close_connection()
@@ -273,9 +250,10 @@ class AttendanceMainWindow(ctk.CTk):
         self.destroy()
         logger.info("👋 Application closed successfully")
 
-    def set_server(self, server: AttendanceFlaskServer):
-        """Set the Flask server instance"""
+    def set_server(self, server: ScanServer):
+        """Set the Flask server instance (or the process running it)"""
         self.flask_server = server
+        self.token_rotation.set_server(server)
         self.status_panel.update_server_status("online")
         logger.info("🌐 Flask server connected to UI")
 
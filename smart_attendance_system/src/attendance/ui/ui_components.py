@@ -5,7 +5,7 @@ smart_attendance_system/src/attendance/ui/ui_components.py
 import customtkinter as ctk
 from typing import Callable, Optional
 from datetime import datetime
-from PIL import ImageTk
+from PIL import Image, ImageTk
 
 from .ui_styles import ui_styles
 
@@ -118,6 +118,8 @@ class QRDisplayArea(ctk.CTkFrame):
             height=ui_styles.DIMENSIONS['qr_display_size'][1]
         )
         self.qr_label.grid(row=1, column=0, padx=24, pady=16)
+        self.qr_photo: Optional[ImageTk.PhotoImage] = None  # Reused for every frame
+        self.qr_photo_format: Optional[tuple] = None
 
         # Info cards frame
         self.info_frame = ctk.CTkFrame(self, **ui_styles.get_frame_style())
@@ -132,11 +134,16 @@ class QRDisplayArea(ctk.CTkFrame):
         self.expiry_card = InfoCard(self.info_frame, "Expires At", "--:--:--")
         self.expiry_card.grid(row=0, column=1, padx=(8, 0), pady=8, sticky="ew")
 
-    def update_qr_display(self, qr_image: ImageTk.PhotoImage, token: str, expiry_time: str):
+    def update_qr_display(self, qr_image: Image.Image, token: str, expiry_time: str):
         """Update QR code display with new image and info"""
-        # Update QR image
-        self.qr_label.configure(image=qr_image, text="")
-        self.qr_label.image = qr_image  # Keep reference to prevent garbage collection
+        # Frames share size and mode, so paste into one PhotoImage instead of creating one per frame
+        if self.qr_photo is None or self.qr_photo_format != (qr_image.mode, qr_image.size):
+            self.qr_photo = ImageTk.PhotoImage(qr_image.mode, qr_image.size)
+            self.qr_photo_format = (qr_image.mode, qr_image.size)
+            self.qr_label.configure(image=self.qr_photo, text="")
+        elif self.qr_label.cget("text"):
+            self.qr_label.configure(image=self.qr_photo, text="")  # Back from a loading message
+        self.qr_photo.paste(qr_image)
 
         # Update info cards
         self.token_card.update_value(f"...{token[-8:]}")
@@ -145,8 +152,52 @@ class QRDisplayArea(ctk.CTkFrame):
     def show_loading_message(self, message: str = "🔄 Generating QR Code..."):
         """Show loading message"""
         self.qr_label.configure(image=None, text=message)
-        if hasattr(self.qr_label, 'image'):
-            delattr(self.qr_label, 'image')
+
+class RecentArrivalsPanel(ctk.CTkFrame):
+    """Live list of students who have just marked attendance"""
+
+    def __init__(self, parent, max_rows: int = 8, **kwargs):
+        super().__init__(parent, **ui_styles.get_frame_style(), **kwargs)
+
+        self.max_rows = max_rows
+        self.arrival_count = 0
+
+        # Section header
+        self.header_label = ctk.CTkLabel(
+            self,
+            text="🙋 Recent Arrivals",
+            **ui_styles.get_label_style("subheading")
+        )
+        self.header_label.pack(pady=(20, 8))
+
+        # Running total
+        self.count_label = ctk.CTkLabel(
+            self,
+            text="Present: 0",
+            **ui_styles.get_label_style("body_small")
+        )
+        self.count_label.pack(pady=(0, 8))
+
+        # Arrivals list, newest first
+        self.arrivals_label = ctk.CTkLabel(
+            self,
+            text="Waiting for scans...",
+            justify="left",
+            **ui_styles.get_label_style("caption")
+        )
+        self.arrivals_label.pack(padx=16, pady=(0, 16), anchor="w")
+
+        self._rows = []
+
+    def add_arrivals(self, arrivals: list):
+        """Add attendance events (dicts with regno, name, timestamp)"""
+        for arrival in arrivals:
+            self.arrival_count += 1
+            self._rows.insert(0, f"{arrival['timestamp'][11:]}  {arrival['regno']}  {arrival['name']}")
+        del self._rows[self.max_rows:]
+
+        self.count_label.configure(text=f"Present: {self.arrival_count}")
+        self.arrivals_label.configure(text="\n".join(self._rows))
 
 class ControlPanel(ctk.CTkFrame):
     """Control panel with action buttons and settings"""
@@ -0,0 +1,113 @@
+"""
+Async Logging - Hand log records to a writer thread so request threads never wait on disk or terminal
+smart_attendance_system/src/attendance/utils/async_logging.py
+"""
+import copy
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Optional, Sequence
+
+from ..core.metrics import metrics_registry
+from ..config.settings import logging_config
+
+LOG_RECORDS_DROPPED = metrics_registry.counter(
+    "attendance_log_records_dropped_total", "Log records dropped because the log queue was full", ("level",))
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler on a bounded queue that drops records instead of blocking when it is full
+
+    Records below WARNING are dropped at once; WARNING and above wait up to
+    block_timeout for room first, so errors survive short bursts.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_timeout: float = 0.05):
+        super().__init__(log_queue)
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the %-args into the message but leave full formatting to the writer thread"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            LOG_RECORDS_DROPPED.inc(record.levelname)
+
+    def take_dropped(self) -> int:
+        """Return and reset the number of records dropped since the last call"""
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+class _ReportingListener(logging.handlers.QueueListener):
+    """QueueListener that reports dropped records once the queue has drained"""
+
+    def __init__(self, log_queue: queue.Queue, queue_handler: DroppingQueueHandler,
+                 *handlers: logging.Handler):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+
+    def enqueue_sentinel(self):
+        # The queue is bounded; wait for room rather than failing to stop
+        self.queue.put(self._sentinel)
+
+    def handle(self, record: logging.LogRecord):
+        super().handle(record)
+        if self.queue.empty():
+            dropped = self.queue_handler.take_dropped()
+            if dropped:
+                super().handle(logging.makeLogRecord({
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"⚠️ Log queue full: {dropped} record(s) dropped"
+                }))
+
+class AsyncLogPipeline:
+    """Root logger -> bounded queue -> one writer thread -> real handlers"""
+
+    def __init__(self):
+        self.queue_handler: Optional[DroppingQueueHandler] = None
+        self.listener: Optional[_ReportingListener] = None
+
+    def start(self, handlers: Sequence[logging.Handler], level: str = logging_config.LEVEL,
+              queue_size: int = logging_config.QUEUE_SIZE):
+        """Replace the root logger's handlers with the queue and start the writer thread"""
+        self.stop()
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = DroppingQueueHandler(log_queue)
+        self.listener = _ReportingListener(log_queue, self.queue_handler, *handlers)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        root.setLevel(level)
+        self.listener.start()
+
+    def stop(self):
+        """Flush queued records and close the real handlers"""
+        if self.listener is None:
+            return
+        logging.getLogger().removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.listener = None
+        self.queue_handler = None
+
+# Global logging pipeline instance
+log_pipeline = AsyncLogPipeline()
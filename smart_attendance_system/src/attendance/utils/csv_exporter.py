@@ -69,13 +69,13 @@ class AttendanceCSVExporter:
                 f"📍 Location: {os.path.dirname(file_path)}"
             )
 
-            logger.info(f"✅ CSV exported: {file_path} ({len(records)} records)")
+            logger.info("✅ CSV exported: %s (%d records)", file_path, len(records))
             return True
 
         except Exception as e:
             error_message = f"❌ Failed to export CSV: {str(e)}"
             messagebox.showerror("Export Error", error_message)
-            logger.error(f"❌ CSV export error: {e}")
+            logger.error("❌ CSV export error: %s", e)
             return False
 
     def _write_csv_file(self, file_path: str, records: List[Dict[str, Any]]):
@@ -84,6 +84,7 @@ class AttendanceCSVExporter:
             'Registration Number',
             'Student Name', 
             'IP Address',
+            'Room',
             'Date',
             'Time',
             'Full Timestamp'
@@ -99,6 +100,7 @@ class AttendanceCSVExporter:
                     'Registration Number': record['regno'],
                     'Student Name': record['name'],
                     'IP Address': record['ip'],
+                    'Room': record.get('room') or '',
                     'Date': created_at.strftime('%Y-%m-%d'),
                     'Time': created_at.strftime('%H:%M:%S'),
                     'Full Timestamp': created_at.strftime('%Y-%m-%d %H:%M:%S')
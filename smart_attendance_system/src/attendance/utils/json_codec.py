@@ -0,0 +1,22 @@
+"""
+JSON Codec - Fast JSON serialization for server responses
+smart_attendance_system/src/attendance/utils/json_codec.py
+"""
+import json
+from typing import Any
+
+try:
+    import orjson  # Optional, noticeably faster for dynamic payloads
+except ImportError:
+    orjson = None
+
+# Compact separators keep response bodies small. The two encoders agree on values, not bytes:
+# this one escapes non-ASCII (as Flask's jsonify does, e.g. "\u00e9"), orjson writes it as raw
+# UTF-8. Both are valid JSON for clients, but do not compare bodies byte for byte across them.
+_json_encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=True)
+
+def dumps_bytes(payload: Any) -> bytes:
+    """Serialize payload to compact JSON bytes (UTF-8; ASCII-only without orjson)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return _json_encoder.encode(payload).encode('ascii')
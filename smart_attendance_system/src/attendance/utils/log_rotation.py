@@ -0,0 +1,185 @@
+"""
+Log Rotation - Time/size rotated log files with background compression and retention
+smart_attendance_system/src/attendance/utils/log_rotation.py
+"""
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from ..config.settings import LoggingSettings, logging_config
+
+logger = logging.getLogger(__name__)
+
+GZIP_SUFFIX = ".gz"
+ROTATION_STAMP = '%Y%m%d-%H%M%S'  # Rotated files are <name>.<stamp>, with -1, -2, ... when a stamp repeats
+STAMP_LENGTH = 15
+
+class RotatingCompressedFileHandler(logging.handlers.BaseRotatingHandler):
+    """Rotate at local midnight (or every interval seconds) and whenever max_bytes is reached
+
+    Rotated files are renamed to <name>.<YYYYmmdd-HHMMSS> and gzipped on a
+    background thread, so the writer never waits on compression. Only the
+    newest backup_count rotated files are kept. The size check counts the
+    bytes written so far, so a file may pass max_bytes by one record.
+    """
+
+    def __init__(self, filename: str, interval: float = 0, max_bytes: int = 0,
+                 backup_count: int = 0, compress: bool = True, encoding: str = 'utf-8'):
+        super().__init__(filename, 'a', encoding=encoding, delay=True)
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self._compressors: List[threading.Thread] = []
+        self._retention_lock = threading.Lock()  # Compressions and retention never overlap
+        self._size = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        # A file left over from an earlier period rotates on the first record
+        last_write = os.path.getmtime(self.baseFilename) if os.path.exists(self.baseFilename) else time.time()
+        self.rollover_at = self._next_rollover(last_write)
+        if compress:
+            self.namer = lambda name: name + GZIP_SUFFIX
+            self.rotator = self._rotate_and_compress
+
+    def _next_rollover(self, now: float) -> float:
+        if self.interval > 0:
+            return now + self.interval
+        tomorrow = datetime.fromtimestamp(now).date() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+    def _open(self):
+        stream = super()._open()
+        self._size = os.path.getsize(self.baseFilename)
+        return stream
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return record.created >= self.rollover_at or 0 < self.max_bytes <= self._size
+
+    def emit(self, record: logging.LogRecord):
+        """Write one record, counting its bytes so shouldRollover never formats it twice"""
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            line = self.format(record) + self.terminator
+            self.stream.write(line)
+            self.flush()
+            self._size += len(line) if line.isascii() else len(line.encode(self.encoding or 'utf-8'))
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            # Named after the last write, so a file rotated after midnight keeps its own date
+            stamp = datetime.fromtimestamp(os.path.getmtime(self.baseFilename)).strftime(ROTATION_STAMP)
+            # Count past every file with this stamp, even ones retention removed below it,
+            # so the newest file always sorts last
+            counters = [counter for other, counter in map(self._rotation_key, self.rotated_files()) if other == stamp]
+            stem = f"{self.baseFilename}.{stamp}" + (f"-{max(counters) + 1}" if counters else "")
+            destination = self.rotation_filename(stem)
+            self.rotate(self.baseFilename, destination)
+            if not self.compress:
+                self._apply_retention()
+
+        self.rollover_at = self._next_rollover(time.time())
+        self.stream = self._open()
+
+    def _rotate_and_compress(self, source: str, destination: str):
+        """Rename at once (cheap), then gzip the renamed file on a background thread"""
+        pending = destination[:-len(GZIP_SUFFIX)]  # Only installed with compress, so the namer added it
+        os.rename(source, pending)
+        compressor = threading.Thread(target=self._compress, args=(pending, destination),
+                                      name="log-compress", daemon=True)
+        self._compressors = [thread for thread in self._compressors if thread.is_alive()]
+        self._compressors.append(compressor)
+        compressor.start()
+
+    def _compress(self, source: str, destination: str):
+        """gzip one rotated file, then trim old files"""
+        with self._retention_lock:
+            if not os.path.exists(source):
+                return  # Already past backup_count; retention removed it while it waited
+            try:
+                with open(source, 'rb') as plain, gzip.open(destination + ".tmp", 'wb') as packed:
+                    shutil.copyfileobj(plain, packed)
+                os.replace(destination + ".tmp", destination)
+                os.remove(source)
+            except OSError as e:
+                # Leave the uncompressed file in place; it is still covered by retention
+                logger.warning("⚠️ Could not compress %s: %s", source, e)
+            self._apply_retention()
+
+    def rotated_files(self) -> List[str]:
+        """Rotated files of this log, oldest first"""
+        directory, base = os.path.split(self.baseFilename)
+        prefix = base + "."
+        names = [name for name in os.listdir(directory or ".")
+                 if name.startswith(prefix) and name[len(prefix):len(prefix) + 1].isdigit()
+                 and not name.endswith(".tmp")]
+        # A file being compressed exists under both names; count it once
+        stems = {os.path.join(directory, name[:-len(GZIP_SUFFIX)] if name.endswith(GZIP_SUFFIX) else name)
+                 for name in names}
+        return sorted(stems, key=self._rotation_key)
+
+    def _rotation_key(self, stem: str) -> Tuple[str, int]:
+        """(stamp, counter) of a rotated file; counters compare as numbers, so -10 follows -9"""
+        rest = stem[len(self.baseFilename) + 1:]
+        counter = rest[STAMP_LENGTH + 1:]
+        return rest[:STAMP_LENGTH], int(counter) if counter.isdigit() else 0
+
+    def _apply_retention(self):
+        """Delete all but the newest backup_count rotated files"""
+        if self.backup_count <= 0:
+            return
+        for stem in self.rotated_files()[:-self.backup_count]:
+            for path in (stem, stem + GZIP_SUFFIX):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        super().close()
+        for compressor in self._compressors:
+            compressor.join(timeout=5)
+        self._compressors = []
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line, cheap for log tooling to parse"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def build_file_handler(log_dir: str, settings: LoggingSettings = logging_config) -> RotatingCompressedFileHandler:
+    """File handler configured from LoggingSettings"""
+    handler = RotatingCompressedFileHandler(
+        os.path.join(log_dir, settings.FILE_NAME),
+        interval=settings.ROTATE_INTERVAL,
+        max_bytes=settings.MAX_BYTES,
+        backup_count=settings.BACKUP_COUNT,
+        compress=settings.COMPRESS
+    )
+    handler.setFormatter(JsonLinesFormatter() if settings.JSON_LINES else logging.Formatter(settings.FORMAT))
+    return handler
@@ -0,0 +1,11 @@
+"""
+Test configuration - Make the attendance package (and the benchmark/tool stand-ins) importable
+smart_attendance_system/tests/conftest.py
+"""
+import os
+import sys
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_dir, 'src'))
+sys.path.insert(0, os.path.join(project_dir, 'benchmarks'))  # standin_db
+sys.path.insert(0, os.path.join(project_dir, 'tools'))  # kv_server
@@ -0,0 +1,88 @@
+"""
+Adaptive Interval tests - Bounds, rounding and how scan load moves the QR refresh interval
+smart_attendance_system/tests/test_adaptive_interval.py
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from attendance.core import adaptive_interval
+from attendance.core.adaptive_interval import AdaptiveIntervalController
+
+class FakeLoad:
+    """Scan totals and queue depth the test feeds to the controller, on a hand-moved clock"""
+
+    def __init__(self):
+        self.now = 500.0
+        self.outcomes = {"recorded": 0.0, "expired": 0.0}
+        self.queue_depth = 0
+
+    def __call__(self):
+        return dict(self.outcomes), self.queue_depth
+
+    def period(self, recorded: int = 0, expired: int = 0, seconds: float = 10.0):
+        self.outcomes["recorded"] += recorded
+        self.outcomes["expired"] += expired
+        self.now += seconds
+
+@pytest.fixture
+def load(monkeypatch):
+    load = FakeLoad()
+    monkeypatch.setattr(adaptive_interval, "time", SimpleNamespace(monotonic=lambda: load.now))
+    return load
+
+def controller(load, interval: float = 5.0) -> AdaptiveIntervalController:
+    return AdaptiveIntervalController(interval, min_interval=3.0, max_interval=15.0, period=10.0, load=load)
+
+def test_interval_is_clamped_to_bounds_and_rounded_to_half_seconds(load):
+    assert controller(load, 100).interval == 15.0
+    assert controller(load, 1).interval == 3.0
+    assert controller(load, 4.3).interval == 4.5
+    floor = AdaptiveIntervalController(0.1, min_interval=0.1, max_interval=0.2, load=load)
+    assert floor.min_interval == floor.max_interval == floor.interval == 0.5
+
+def test_nothing_changes_before_the_evaluation_period(load):
+    adaptive = controller(load)
+    load.period(recorded=0, seconds=9.9)
+    assert adaptive.observe() is None
+    assert adaptive.last_sample is None
+
+def test_rush_at_rotation_boundaries_lengthens_the_interval(load):
+    adaptive = controller(load)
+    load.queue_depth = 8  # Peak seen mid-period counts even once the queue has drained
+    load.period(recorded=30, seconds=5)
+    assert adaptive.observe() is None
+    load.queue_depth = 0
+    load.period(seconds=5)
+    assert adaptive.observe() == 7.5
+    assert adaptive.last_sample.queue_depth == 8
+
+    load.period(recorded=18, expired=2)  # 10% expired
+    assert adaptive.observe() == 11.0
+
+def test_idle_room_grows_to_the_maximum_and_stays(load):
+    adaptive = controller(load)
+    seen = []
+    for _ in range(6):
+        load.period()
+        seen.append(adaptive.observe())
+    assert seen == [7.5, 11.0, 15.0, None, None, None]
+
+def test_healthy_traffic_shrinks_to_the_minimum(load):
+    adaptive = controller(load, 6)
+    seen = []
+    for _ in range(4):
+        load.period(recorded=20)
+        seen.append(adaptive.observe())
+    assert seen == [5.0, 4.0, 3.0, None]
+    assert adaptive.stats()["scan_rate"] == 2.0
+
+@pytest.mark.parametrize("recorded, expired", [
+    (93, 7),  # Between half the expired threshold and the threshold
+    (0, 5),  # Too few scans for the expired ratio to mean anything
+])
+def test_interval_holds_in_the_dead_band(load, recorded, expired):
+    adaptive = controller(load)
+    load.period(recorded=recorded, expired=expired)
+    assert adaptive.observe() is None
+    assert adaptive.interval == 5.0
@@ -0,0 +1,86 @@
+"""
+Admission Control tests - In-flight limit, bounded queue and early shedding
+smart_attendance_system/tests/test_admission.py
+"""
+import threading
+import time
+
+from attendance.core.admission import AdmissionController
+
+def test_admits_up_to_the_in_flight_limit():
+    controller = AdmissionController(max_in_flight=2, max_queue=0, max_wait=1.0)
+    first, second = controller.try_acquire(), controller.try_acquire()
+    assert first is not None and second is not None
+    assert controller.in_flight == 2
+
+    assert controller.try_acquire() is None  # No queue: shed at once
+    controller.release(first)
+    assert controller.in_flight == 1
+    assert controller.try_acquire() is not None
+
+def test_sheds_when_the_queue_is_full():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, max_wait=5.0)
+    started = controller.try_acquire()
+    waiter = threading.Thread(target=controller.try_acquire, kwargs={"max_wait": 2.0})
+    waiter.start()
+    while controller.queue_depth == 0:
+        time.sleep(0.001)
+
+    began = time.perf_counter()
+    assert controller.try_acquire() is None
+    assert time.perf_counter() - began < 0.1  # Rejected without waiting
+
+    controller.release(started)
+    waiter.join(timeout=1)
+    assert controller.queue_depth == 0
+
+def test_sheds_when_expected_wait_exceeds_the_budget():
+    controller = AdmissionController(max_in_flight=1, max_queue=10, max_wait=1.0)
+    controller.service_time = 2.0  # One queued scan would wait ~2 s
+    controller.try_acquire()
+    assert controller.try_acquire() is None
+    assert controller.queue_depth == 0
+
+def test_request_deadline_tightens_the_wait():
+    controller = AdmissionController(max_in_flight=1, max_queue=10, max_wait=5.0)
+    controller.service_time = 0.5
+    controller.try_acquire()
+    assert controller.try_acquire(max_wait=0.1) is None
+
+def test_queued_scan_is_admitted_when_a_slot_frees():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, max_wait=2.0)
+    started = controller.try_acquire()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(controller.try_acquire()))
+    waiter.start()
+    while controller.queue_depth == 0:
+        time.sleep(0.001)
+
+    controller.release(started)
+    waiter.join(timeout=1)
+    assert results and results[0] is not None
+    assert controller.in_flight == 1 and controller.queue_depth == 0
+
+def test_queued_scan_gives_up_at_its_wait_limit():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, max_wait=0.05)
+    controller.service_time = 0.001
+    controller.try_acquire()
+
+    began = time.perf_counter()
+    assert controller.try_acquire() is None
+    assert 0.04 <= time.perf_counter() - began < 1.0
+    assert controller.queue_depth == 0
+
+def test_new_arrivals_do_not_overtake_the_queue():
+    controller = AdmissionController(max_in_flight=2, max_queue=4, max_wait=0.05)
+    controller.service_time = 0.001
+    controller.queued = 1  # Someone is already waiting for the next slot
+    assert controller.in_flight < controller.max_in_flight
+    assert controller.try_acquire(max_wait=0) is None  # A free slot alone does not admit past waiters
+
+def test_release_folds_duration_into_service_time():
+    controller = AdmissionController(max_in_flight=1)
+    controller.service_time = 0.0
+    started = controller.try_acquire()
+    controller.release(started - 1.0)  # Pretend the work took a second
+    assert 0.19 < controller.service_time < 0.25
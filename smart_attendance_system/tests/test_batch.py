@@ -0,0 +1,130 @@
+"""
+Batch Scan tests - Per-entry results, entry validation and who may submit /api/scan/batch
+smart_attendance_system/tests/test_batch.py
+"""
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from attendance.config.settings import server_config
+from attendance.core.flask_server import AttendanceFlaskServer
+from attendance.core.shared_state import InProcessState
+from standin_db import StandInDatabase
+
+STUDENTS = [
+    {"regno": "21CS001", "name": "Asha", "ip": "10.0.0.5"},
+    {"regno": "21CS002", "name": "Ravi", "ip": "10.0.0.6"},
+]
+
+class FailingInsertDatabase(StandInDatabase):
+    """Loses the connection for the first insert only"""
+
+    failed = False
+
+    def mark_attendance_batch(self, rows):
+        if not self.failed:
+            self.failed = True
+            return False
+        return super().mark_attendance_batch(rows)
+
+class OfflineDatabase(StandInDatabase):
+    def get_students_by_ips(self, ip_addresses):
+        return None
+
+@pytest.fixture
+def make_server():
+    def make(db=None):
+        server = AttendanceFlaskServer(db=db or StandInDatabase(STUDENTS), shared_state=InProcessState())
+        session = server.sessions.create_session("Lab 1", interval=60, allowed_subnet="10.0.0.0/24")
+        return server, session
+    return make
+
+def results(body: bytes):
+    payload = json.loads(body)
+    return payload["recorded"], [entry["result"] for entry in payload["results"]]
+
+def test_each_entry_gets_its_own_result(make_server):
+    server, session = make_server()
+    now = time.time()
+    body, status, _headers = server.process_batch([
+        [session.token, "10.0.0.5", now],
+        ["not-a-token", "10.0.0.6", now],
+        [session.token, "192.168.1.7", now],
+        [session.token, "10.0.0.99", now],
+        [session.token, "10.0.0.5", now],
+        [session.token, "10.0.0.6", now],
+    ], "127.0.0.1")
+
+    assert status == 200
+    assert results(body) == (2, ["RECORDED", "TOKEN_INVALID", "NETWORK_BLOCKED", "DEVICE_UNKNOWN",
+                                 "DUPLICATE", "RECORDED"])
+    assert json.loads(body)["results"][0]["regno"] == "21CS001"
+    assert [row["regno"] for row in server.db.attendance] == ["21CS001", "21CS002"]
+
+@pytest.mark.parametrize("entry", [
+    "token,10.0.0.5,0",
+    ["only", "two"],
+    ["token", 167772165, 0],  # An integer is a valid ip_address() argument but not a client IP
+    ["token", "not-an-ip", 0],
+    ["token", "10.0.0.5", "yesterday"],
+    ["token", "10.0.0.5", 1e300],
+])
+def test_malformed_entries_are_rejected_individually(make_server, entry):
+    server, session = make_server()
+    body, status, _headers = server.process_batch([entry, [session.token, "10.0.0.5", time.time()]],
+                                                  "127.0.0.1")
+    assert status == 200
+    assert results(body) == (1, ["INVALID_ENTRY", "RECORDED"])
+
+def test_scans_from_the_future_are_rejected_beyond_the_skew_and_clamped_within_it(make_server, monkeypatch):
+    monkeypatch.setattr(server_config, "BATCH_CLOCK_SKEW", 5.0)
+    server, session = make_server()
+    body, _status, _headers = server.process_batch([
+        [session.token, "10.0.0.5", time.time() + 60],
+        [session.token, "10.0.0.6", time.time() + 2],
+    ], "127.0.0.1")
+    after = datetime.now()
+
+    assert results(body) == (1, ["INVALID_ENTRY", "RECORDED"])
+    (row,) = server.db.attendance
+    assert row["created_at"] <= after
+
+def test_database_failures_report_db_error_and_allow_a_retry(make_server):
+    server, session = make_server(OfflineDatabase(STUDENTS))
+    body, _status, _headers = server.process_batch([[session.token, "10.0.0.5", time.time()]], "127.0.0.1")
+    assert results(body) == (0, ["DB_ERROR"])
+
+    server, session = make_server(FailingInsertDatabase(STUDENTS))
+    entries = [[session.token, "10.0.0.5", time.time()]]
+    assert results(server.process_batch(entries, "127.0.0.1")[0]) == (0, ["DB_ERROR"])
+    # The failed insert released the present mark, so the gateway's retry is not a duplicate
+    assert results(server.process_batch(entries, "127.0.0.1")[0]) == (1, ["RECORDED"])
+
+def test_only_trusted_gateways_may_submit(make_server):
+    server, session = make_server()
+    client = server.app.test_client()
+    entries = {"entries": [[session.token, "10.0.0.5", time.time()]]}
+
+    refused = client.post("/api/scan/batch", json=entries, environ_base={"REMOTE_ADDR": "10.0.0.5"})
+    assert refused.status_code == 403
+    assert server.db.attendance == []
+    accepted = client.post("/api/scan/batch", json=entries, environ_base={"REMOTE_ADDR": "127.0.0.1"})
+    assert accepted.status_code == 200
+    assert accepted.get_json()["recorded"] == 1
+
+@pytest.mark.parametrize("payload", [[1, 2, 3], "entries", {"entries": "all"}, {}])
+def test_batch_body_must_be_an_object_with_an_entry_list(make_server, payload):
+    server, _session = make_server()
+    response = server.app.test_client().post("/api/scan/batch", json=payload,
+                                             environ_base={"REMOTE_ADDR": "127.0.0.1"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "BATCH_INVALID"
+
+def test_batch_larger_than_the_limit_is_refused(make_server, monkeypatch):
+    monkeypatch.setattr(server_config, "BATCH_MAX_ENTRIES", 2)
+    server, session = make_server()
+    body, status, _headers = server.process_batch([[session.token, "10.0.0.5", time.time()]] * 3, "127.0.0.1")
+    assert status == 400
+    assert server.db.attendance == []
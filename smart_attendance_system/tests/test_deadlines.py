@@ -0,0 +1,135 @@
+"""
+Request Deadline tests - Budget scoping, database hints and abandoning late scans
+smart_attendance_system/tests/test_deadlines.py
+"""
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from attendance.core import deadline
+from attendance.core.deadline import DeadlineExceeded, deadline_scope
+from attendance.core.flask_server import AttendanceFlaskServer
+from attendance.core.shared_state import InProcessState
+from attendance.database.db_manager import DatabaseManager
+from standin_db import StandInDatabase
+
+class FakeConnection:
+    """Just enough of a mysql-connector connection for the socket budget"""
+
+    def __init__(self):
+        self._socket = SimpleNamespace(sock=socket.socket())
+        self.closed = False
+
+    def is_connected(self) -> bool:
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+        self._socket.sock.close()
+
+@pytest.fixture
+def connection():
+    fake = FakeConnection()
+    fake._socket.sock.settimeout(30.0)
+    yield fake
+    fake._socket.sock.close()
+
+def test_no_deadline_outside_a_scope():
+    assert deadline.remaining() is None
+    deadline.check("anything")  # No budget, nothing to exceed
+
+def test_nested_scopes_only_tighten():
+    now = time.monotonic()
+    with deadline_scope(now + 10):
+        with deadline_scope(now + 60):
+            assert deadline.remaining() <= 10
+        with deadline_scope(now + 1):
+            assert deadline.remaining() <= 1
+        assert 1 < deadline.remaining() <= 10
+    assert deadline.remaining() is None
+
+def test_check_raises_once_the_deadline_passes():
+    with deadline_scope(time.monotonic() - 0.001):
+        with pytest.raises(DeadlineExceeded) as raised:
+            deadline.check("mark_attendance")
+    assert raised.value.phase == "mark_attendance"
+
+def test_deadline_belongs_to_the_request_thread():
+    seen = []
+    with deadline_scope(time.monotonic() + 5):
+        worker = threading.Thread(target=lambda: seen.append(deadline.remaining()))
+        worker.start()
+        worker.join()
+    assert seen == [None]
+
+def test_query_hints_follow_the_remaining_budget():
+    assert DatabaseManager._execution_hint() == ""
+    assert DatabaseManager._lock_wait_hint() == ""
+    with deadline_scope(time.monotonic() + 2.5):
+        assert DatabaseManager._execution_hint().startswith("/*+ MAX_EXECUTION_TIME(")
+        assert DatabaseManager._lock_wait_hint() == "/*+ SET_VAR(innodb_lock_wait_timeout=3) */ "
+    with deadline_scope(time.monotonic() + 0.01):
+        assert DatabaseManager._lock_wait_hint() == "/*+ SET_VAR(innodb_lock_wait_timeout=1) */ "
+
+def test_shared_connection_socket_is_left_alone(connection):
+    manager = DatabaseManager()
+    manager.connection = connection
+    with deadline_scope(time.monotonic() + 0.5):
+        with manager._socket_budget():
+            assert connection._socket.sock.gettimeout() == 30.0
+
+def test_own_connection_socket_is_bounded_then_restored(connection):
+    manager = DatabaseManager()
+    manager.thread_affinity = True
+    manager.connection = connection
+    with deadline_scope(time.monotonic() + 0.5):
+        with manager._socket_budget():
+            assert connection._socket.sock.gettimeout() <= 0.5
+    assert connection._socket.sock.gettimeout() == 30.0
+
+def test_expired_query_keeps_the_shared_connection(connection):
+    manager = DatabaseManager()
+    manager.connection = connection
+    with deadline_scope(time.monotonic() - 0.001):
+        with pytest.raises(DeadlineExceeded):
+            manager._abandon_if_expired("get_student_by_ip")
+    assert not connection.closed
+    assert manager.connection is connection
+
+def test_expired_query_drops_the_threads_own_connection(connection):
+    manager = DatabaseManager()
+    manager.thread_affinity = True
+    manager.connection = connection
+    with deadline_scope(time.monotonic() - 0.001):
+        with pytest.raises(DeadlineExceeded):
+            manager._abandon_if_expired("get_student_by_ip")
+    assert connection.closed
+    assert manager.connection is None
+
+class LateDatabase(StandInDatabase):
+    """Stand-in whose inserts run past the request deadline until told otherwise"""
+
+    late = True
+
+    def mark_attendance(self, *args, **kwargs) -> bool:
+        if self.late:
+            raise DeadlineExceeded("mark_attendance")
+        return super().mark_attendance(*args, **kwargs)
+
+def test_late_scan_is_retryable_and_not_counted_as_present():
+    db = LateDatabase([{"regno": "21CS001", "name": "Asha", "ip": "10.0.0.5"}])
+    server = AttendanceFlaskServer(db=db, shared_state=InProcessState())
+    session = server.sessions.create_session("Lab 1", interval=60, allowed_subnet="10.0.0.0/24")
+
+    body, status, headers = server.process_scan(session.token, "10.0.0.5")
+    assert status == 503
+    assert dict(headers)["Retry-After"].isdigit()
+    assert db.attendance == []
+
+    db.late = False
+    body, status, _headers = server.process_scan(session.token, "10.0.0.5")
+    assert status == 200 and b"ALREADY_RECORDED" not in body
+    assert len(db.attendance) == 1
@@ -0,0 +1,98 @@
+"""
+Event Bus tests - Fan-out, slow-consumer dropping, Last-Event-ID resume and who may follow /events
+smart_attendance_system/tests/test_event_bus.py
+"""
+import threading
+
+from attendance.core.event_bus import AttendanceEventBus
+from attendance.core.flask_server import AttendanceFlaskServer
+from attendance.core.shared_state import InProcessState
+from standin_db import StandInDatabase
+
+def test_every_subscriber_gets_each_event_in_order():
+    bus = AttendanceEventBus()
+    first, second = bus.subscribe(), bus.subscribe()
+    for n in range(3):
+        bus.publish("attendance", {"n": n})
+
+    for subscription in (first, second):
+        events = subscription.get(timeout=0)
+        assert [event.data["n"] for event in events] == [0, 1, 2]
+        assert [event.id for event in events] == [1, 2, 3]
+
+def test_frame_is_a_complete_sse_message():
+    bus = AttendanceEventBus()
+    event = bus.publish("attendance", {"regno": "21CS001"})
+    assert event.frame == b'id: 1\nevent: attendance\ndata: {"regno":"21CS001"}\n\n'
+
+def test_slow_subscriber_drops_oldest_and_gets_one_lagged_notice():
+    bus = AttendanceEventBus(queue_size=2)
+    subscription = bus.subscribe()
+    for n in range(5):
+        bus.publish("attendance", {"n": n})
+
+    events = subscription.get(timeout=0)
+    assert [event.type for event in events] == ["lagged", "attendance", "attendance"]
+    assert events[0].data == {"dropped": 3}
+    assert [event.data["n"] for event in events[1:]] == [3, 4]
+    # The notice is reported once, then the queue is clean
+    bus.publish("attendance", {"n": 5})
+    assert [event.type for event in subscription.get(timeout=0)] == ["attendance"]
+
+def test_resume_replays_only_newer_history():
+    bus = AttendanceEventBus()
+    for n in range(4):
+        bus.publish("attendance", {"n": n})
+
+    events = bus.subscribe(last_event_id=2).get(timeout=0)
+    assert [event.id for event in events] == [3, 4]
+
+def test_resume_past_history_reports_the_gap():
+    bus = AttendanceEventBus(history_size=2)
+    for n in range(5):
+        bus.publish("attendance", {"n": n})
+
+    events = bus.subscribe(last_event_id=1).get(timeout=0)
+    assert events[0].type == "lagged"
+    assert events[0].data == {"dropped": 2}  # Events 2 and 3 fell out of history
+    assert [event.id for event in events[1:]] == [4, 5]
+
+def test_get_times_out_empty_and_returns_none_once_closed():
+    bus = AttendanceEventBus()
+    subscription = bus.subscribe()
+    assert subscription.get(timeout=0.01) == []
+
+    subscription.close()
+    assert subscription.get(timeout=0) is None
+    assert bus.subscriber_count == 0
+    bus.publish("attendance", {})  # Closed subscriptions are no longer offered events
+
+def test_close_wakes_a_waiting_consumer():
+    bus = AttendanceEventBus()
+    subscription = bus.subscribe()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(subscription.get(timeout=5)))
+    waiter.start()
+    subscription.close()
+    waiter.join(timeout=1)
+    assert results == [None]
+
+def test_event_stream_is_limited_to_displays_and_omits_device_ips():
+    bus = AttendanceEventBus()
+    db = StandInDatabase([{"regno": "21CS001", "name": "Asha", "ip": "10.0.0.5"}])
+    server = AttendanceFlaskServer(db=db, event_bus=bus, shared_state=InProcessState())
+    session = server.sessions.create_session("Lab 1", interval=60, allowed_subnet="10.0.0.0/24")
+    client = server.app.test_client()
+
+    # Scans are authenticated by source IP, so the IP -> student map must not leak to the room
+    assert client.get("/events", environ_base={"REMOTE_ADDR": "10.0.0.9"}).status_code == 403
+    stream = client.get("/events", environ_base={"REMOTE_ADDR": "127.0.0.1"})
+    assert stream.status_code == 200
+    stream.close()
+
+    subscription = bus.subscribe()
+    server.process_scan(session.token, "10.0.0.5")
+    (event,) = subscription.get(timeout=0)
+    assert event.data["regno"] == "21CS001"
+    assert "ip" not in event.data
+    assert b"10.0.0.5" not in event.frame
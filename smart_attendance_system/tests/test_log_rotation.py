@@ -0,0 +1,118 @@
+"""
+Log Rotation tests - Size and time rotation, compression and retention
+smart_attendance_system/tests/test_log_rotation.py
+"""
+import gzip
+import logging
+import os
+import time
+
+import pytest
+
+from attendance.utils.log_rotation import RotatingCompressedFileHandler
+
+class CountingFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(message)s")
+        self.calls = 0
+
+    def format(self, record: logging.LogRecord) -> str:
+        self.calls += 1
+        return super().format(record)
+
+def make_handler(path, **options) -> RotatingCompressedFileHandler:
+    handler = RotatingCompressedFileHandler(str(path), **options)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+def write(handler: RotatingCompressedFileHandler, message: str, created: float = None):
+    record = logging.makeLogRecord({"msg": message})
+    if created is not None:
+        record.created = created
+    handler.handle(record)
+
+def read_all(handler: RotatingCompressedFileHandler) -> str:
+    """Every line written, oldest rotated file first"""
+    text = ""
+    for stem in handler.rotated_files():
+        if os.path.exists(stem + ".gz"):
+            with gzip.open(stem + ".gz", 'rt', encoding='utf-8') as packed:
+                text += packed.read()
+        else:
+            with open(stem, encoding='utf-8') as plain:
+                text += plain.read()
+    with open(handler.baseFilename, encoding='utf-8') as current:
+        return text + current.read()
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_size_rotation_keeps_every_line(tmp_path, compress):
+    handler = make_handler(tmp_path / "app.log", max_bytes=200, compress=compress)
+    lines = [f"line {n:03d} é" for n in range(60)]
+    for line in lines:
+        write(handler, line)
+    handler.close()
+
+    assert len(handler.rotated_files()) > 1
+    assert read_all(handler).splitlines() == lines
+    suffixes = {name.endswith(".gz") for name in os.listdir(tmp_path) if name != "app.log"}
+    assert suffixes == {compress}
+
+def test_files_pass_max_bytes_by_at_most_one_record(tmp_path):
+    handler = make_handler(tmp_path / "app.log", max_bytes=100, compress=False)
+    for n in range(40):
+        write(handler, f"record {n:02d} äö")  # 15 bytes with the newline
+    handler.close()
+
+    for path in handler.rotated_files() + [handler.baseFilename]:
+        assert os.path.getsize(path) < 100 + 15
+
+def test_each_record_is_formatted_once(tmp_path):
+    handler = RotatingCompressedFileHandler(str(tmp_path / "app.log"), max_bytes=100, compress=False)
+    formatter = CountingFormatter()
+    handler.setFormatter(formatter)
+    for n in range(20):
+        write(handler, f"record {n:02d}")
+    handler.close()
+    assert formatter.calls == 20
+
+def test_size_count_includes_an_existing_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("x" * 150 + "\n", encoding='utf-8')
+    handler = make_handler(path, max_bytes=100, compress=False)
+    write(handler, "after restart")
+    handler.close()
+
+    assert len(handler.rotated_files()) == 1
+    assert path.read_text(encoding='utf-8') == "after restart\n"
+
+def test_interval_rotation(tmp_path):
+    handler = make_handler(tmp_path / "app.log", interval=60, compress=False)
+    write(handler, "first")
+    write(handler, "second", created=time.time() + 61)
+    handler.close()
+
+    assert len(handler.rotated_files()) == 1
+    assert read_all(handler).splitlines() == ["first", "second"]
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_retention_keeps_the_newest_files(tmp_path, compress):
+    handler = make_handler(tmp_path / "app.log", max_bytes=20, backup_count=2, compress=compress)
+    lines = [f"line {n:03d} is past max_bytes" for n in range(14)]  # One rotation per record
+    for line in lines:
+        write(handler, line)
+    handler.close()
+
+    assert len(handler.rotated_files()) == 2
+    assert read_all(handler).splitlines() == lines[-3:]
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_rotations_in_the_same_second_get_distinct_names(tmp_path, compress):
+    handler = make_handler(tmp_path / "app.log", compress=compress)
+    for n in range(12):
+        write(handler, f"line {n}")
+        handler.doRollover()
+    handler.close()
+
+    assert len(handler.rotated_files()) == 12
+    assert read_all(handler).splitlines() == [f"line {n}" for n in range(12)]  # -10 and -11 sort last
@@ -0,0 +1,48 @@
+"""
+Metrics tests - Per-thread shards stay bounded and totals survive their threads
+smart_attendance_system/tests/test_metrics.py
+"""
+import threading
+
+from attendance.core.metrics import SHARD_SWEEP_MIN, Counter, Histogram
+
+def run_in_threads(count: int, work):
+    for _ in range(count):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+def test_finished_threads_do_not_accumulate_shards_without_a_scrape():
+    outcomes = Counter("test_outcomes_total", "Outcomes", ("outcome",))
+    latency = Histogram("test_latency_seconds", "Latency")
+
+    def scan():
+        outcomes.inc("recorded")
+        latency.observe(0.01)
+    run_in_threads(2000, scan)
+
+    assert len(outcomes._shards) <= SHARD_SWEEP_MIN
+    assert len(latency._shards) <= SHARD_SWEEP_MIN
+    assert outcomes.values() == {("recorded",): 2000.0}
+    assert latency.values()[()][-1] == 2000  # Observation count
+
+def test_live_threads_keep_their_shards():
+    counter = Counter("test_live_total", "Live")
+    release = threading.Event()
+    started = threading.Barrier(SHARD_SWEEP_MIN * 2 + 1)
+
+    def hold():
+        counter.inc()
+        started.wait()
+        release.wait()
+    threads = [threading.Thread(target=hold) for _ in range(SHARD_SWEEP_MIN * 2)]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    counter.inc()  # Registers while every other thread is alive
+
+    assert len(counter._shards) == SHARD_SWEEP_MIN * 2 + 1
+    assert counter.values() == {(): SHARD_SWEEP_MIN * 2 + 1.0}
+    release.set()
+    for thread in threads:
+        thread.join()
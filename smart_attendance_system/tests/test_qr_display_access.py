@@ -0,0 +1,43 @@
+"""
+QR Display access tests - Live frames only for this machine and configured displays
+smart_attendance_system/tests/test_qr_display_access.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from attendance.config.settings import server_config
+from attendance.core.flask_server import AttendanceFlaskServer
+from attendance.core.shared_state import InProcessState
+from standin_db import StandInDatabase
+
+ROOM_DEVICE = "10.0.0.5"
+DISPLAY = "10.0.0.200"
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server_config, "QR_DISPLAY_IPS", (DISPLAY,))
+    monkeypatch.setattr(server_config, "QR_DISPLAY_KEY", "projector-secret")
+    server = AttendanceFlaskServer(db=StandInDatabase(), shared_state=InProcessState())
+    server.update_token("ATTEND-test", datetime.now() + timedelta(minutes=1))
+    return server.app.test_client()
+
+def get(client, path: str, remote_addr: str):
+    return client.get(path, environ_base={"REMOTE_ADDR": remote_addr})
+
+@pytest.mark.parametrize("path", ["/qr", "/qr/current.svg", "/qr/next?etag=none"])
+def test_room_devices_cannot_fetch_the_live_code(client, path):
+    assert get(client, path, ROOM_DEVICE).status_code == 403
+
+@pytest.mark.parametrize("remote_addr", ["127.0.0.1", DISPLAY])
+def test_this_machine_and_listed_displays_can(client, remote_addr):
+    assert get(client, "/qr", remote_addr).status_code == 200
+    assert get(client, "/qr/current.svg", remote_addr).status_code == 200
+
+def test_shared_key_admits_a_display(client):
+    assert get(client, "/qr/current.svg?key=projector-secret", ROOM_DEVICE).status_code == 200
+    assert get(client, "/qr/current.svg?key=wrong", ROOM_DEVICE).status_code == 403
+
+def test_empty_key_admits_nobody(client, monkeypatch):
+    monkeypatch.setattr(server_config, "QR_DISPLAY_KEY", "")
+    assert get(client, "/qr/current.svg?key=", ROOM_DEVICE).status_code == 403
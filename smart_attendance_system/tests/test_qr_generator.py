@@ -0,0 +1,25 @@
+"""
+QR Generator tests - Token formats and the frame described for the encoding report
+smart_attendance_system/tests/test_qr_generator.py
+"""
+from datetime import datetime
+
+from attendance.core.qr_generator import COMPACT_ENCODING, LEGACY_ENCODING, QRCodeGenerator
+
+def test_whole_second_windows_get_whole_second_tokens():
+    generator = QRCodeGenerator(LEGACY_ENCODING)
+    assert generator.generate_token(datetime(2026, 3, 2, 9, 15, 30)) == "ATTEND-20260302091530"
+    assert generator.generate_token(datetime(2026, 3, 2, 9, 15, 30, 500000)) == "ATTEND-20260302091530.500"
+
+def test_describe_measures_a_real_rotation_token():
+    generator = QRCodeGenerator(LEGACY_ENCODING)
+    info = generator.describe(5000)
+    token = info["url"].rsplit("/", 1)[1]
+    assert "." not in token  # No sub-second suffix a whole-second rotation would never show
+    assert info["url_length"] == len(generator.scan_url("ATTEND-20260302091530", 5000))
+
+def test_compact_url_is_shorter_than_legacy():
+    legacy = QRCodeGenerator(LEGACY_ENCODING).describe(5000)
+    compact = QRCodeGenerator(COMPACT_ENCODING).describe(5000)
+    assert compact["url_length"] < legacy["url_length"]
+    assert compact["version"] <= legacy["version"]
@@ -0,0 +1,119 @@
+"""
+Rotation Scheduler tests - Absolute deadlines, whole-second anchoring, interval changes and clock steps
+smart_attendance_system/tests/test_rotation_scheduler.py
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from attendance.core import rotation_scheduler
+from attendance.core.rotation_scheduler import RotationScheduler
+
+class FakeClock:
+    """Monotonic and wall clocks the test moves by hand"""
+
+    def __init__(self):
+        self.monotonic_now = 1000.0
+        self.wall_now = datetime(2025, 3, 10, 9, 0, 0, 250000)
+
+    def advance(self, seconds: float):
+        self.monotonic_now += seconds
+        self.wall_now += timedelta(seconds=seconds)
+
+    def monotonic(self) -> float:
+        return self.monotonic_now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock.wall_now
+
+    monkeypatch.setattr(rotation_scheduler, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(rotation_scheduler, "datetime", FakeDatetime)
+    return clock
+
+def test_windows_sit_on_absolute_deadlines(clock):
+    scheduler = RotationScheduler(interval=5)
+    first = scheduler.restart()
+    clock.advance(7.9)  # A slow render or late wake-up does not move later windows
+    scheduler.record_rotation(scheduler.tick(1))
+
+    for index in range(1, 50):
+        tick = scheduler.tick(index)
+        assert tick.deadline == pytest.approx(first.deadline + index * 5)
+        assert tick.activation == first.activation + timedelta(seconds=index * 5)
+        assert tick.expiry == tick.activation + timedelta(seconds=5)
+    assert scheduler.current_index() == 1
+
+def test_whole_second_intervals_anchor_on_the_second(clock):
+    scheduler = RotationScheduler(interval=5)
+    tick = scheduler.restart()
+    assert tick.activation == datetime(2025, 3, 10, 9, 0, 0)
+    assert tick.deadline == pytest.approx(clock.monotonic_now - 0.25)
+
+def test_sub_second_intervals_start_now_and_are_clamped(clock):
+    scheduler = RotationScheduler(interval=0.75)
+    tick = scheduler.restart()
+    assert tick.activation == clock.wall_now
+    assert tick.deadline == clock.monotonic_now
+
+    scheduler.set_interval(0.01)
+    assert scheduler.restart().expiry - clock.wall_now == timedelta(seconds=0.5)
+
+def test_new_interval_applies_from_the_next_restart_on_a_window_boundary(clock):
+    scheduler = RotationScheduler(interval=5)
+    scheduler.restart()
+    boundary = scheduler.tick(3)
+    scheduler.set_interval(10)
+    assert scheduler.interval == 5  # Windows already handed out keep their length
+
+    tick = scheduler.restart(at=boundary)
+    assert scheduler.interval == 10
+    assert (tick.deadline, tick.activation) == (boundary.deadline, boundary.activation)
+    assert scheduler.tick(1).deadline == pytest.approx(boundary.deadline + 10)
+
+def test_expiry_follows_a_stepped_wall_clock(clock):
+    scheduler = RotationScheduler(interval=5)
+    scheduler.restart()
+    activation = scheduler.tick(2).activation
+
+    clock.wall_now += timedelta(seconds=0.4)  # Ordinary slew stays within tolerance
+    scheduler.follow_wall_clock()
+    assert scheduler.tick(2).activation == activation
+
+    clock.wall_now += timedelta(seconds=30)
+    scheduler.follow_wall_clock()
+    assert scheduler.tick(2).activation == activation + timedelta(seconds=30.4)
+    assert scheduler.tick(2).deadline == pytest.approx(scheduler.tick(0).deadline + 10)
+
+def test_stats_report_lateness_and_skipped_windows(clock):
+    scheduler = RotationScheduler(interval=5)
+    scheduler.restart()
+    clock.advance(5.002)
+    scheduler.record_rotation(scheduler.tick(1))
+    clock.advance(10)
+    scheduler.record_rotation(scheduler.tick(3), skipped=1)
+
+    stats = scheduler.stats()
+    assert (stats["rotations"], stats["skipped"]) == (2, 1)
+    assert stats["jitter_max_ms"] == pytest.approx(252, abs=0.01)
+    assert stats["jitter_p50_ms"] == pytest.approx(252, abs=0.01)
+
+def test_wait_until_returns_at_the_deadline_or_early_on_wakeup():
+    scheduler = RotationScheduler(interval=5)
+    started = time.monotonic()
+    assert scheduler.wait_until(started + 0.05) is False
+    assert time.monotonic() - started >= 0.05
+
+    wakeup = threading.Event()
+    wakeup.set()
+    assert scheduler.wait_until(time.monotonic() + 5, wakeup) is True
+    assert not wakeup.is_set()
+    assert scheduler.wait_until(time.monotonic() - 1, wakeup) is False
@@ -0,0 +1,126 @@
+"""
+Scan Process tests - Pipe protocol between supervisor and child, and restarting a killed child
+smart_attendance_system/tests/test_scan_process.py
+"""
+import multiprocessing
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from attendance.core import scan_process
+from attendance.core.event_bus import AttendanceEventBus
+from attendance.core.scan_process import ScanServerProcess
+
+class StubScanServer:
+    """Stands in for attendance_server in the child; reports what it was sent as events"""
+
+    host = "127.0.0.1"
+    port = 5999
+
+    def __init__(self, starts: bool = True):
+        self.starts = starts
+        self.event_bus = AttendanceEventBus()
+        self.rotation = None
+        self.interval_controller = None
+        self.run_id = None
+
+    def start(self) -> bool:
+        return self.starts
+
+    def stop(self, drain_timeout=None):
+        pass
+
+    def begin_run(self, run_id):
+        self.run_id = run_id
+
+    def update_token(self, token, expiry):
+        self.event_bus.publish("token", {
+            "token": token,
+            "run_id": self.run_id,
+            "pid": os.getpid(),
+            "rotation": self.rotation.stats() if self.rotation else None
+        })
+
+    def scan_load(self):
+        return {"recorded": 3.0}, 1
+
+class StubRotation:
+    def stats(self):
+        return {"interval": 5.0, "rotations": 2}
+
+@pytest.fixture
+def make_process(monkeypatch):
+    processes = []
+
+    def make(server: StubScanServer) -> ScanServerProcess:
+        # Forked children inherit the stub; a spawned one would import the real server
+        monkeypatch.setattr(scan_process, "attendance_server", server)
+        process = ScanServerProcess(event_bus=AttendanceEventBus(), restart_delay=0.05)
+        process._context = multiprocessing.get_context("fork")
+        processes.append(process)
+        return process
+    yield make
+    for process in processes:
+        process.stop(drain_timeout=0.5)
+
+def next_token_event(subscription, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for event in subscription.get(timeout=0.1) or []:
+            if event.type == "token":
+                return event.data
+    raise AssertionError("no token event from the child")
+
+def test_tokens_and_runs_reach_the_child_and_events_come_back(make_process):
+    process = make_process(StubScanServer())
+    assert process.start() is True
+    assert process.port == 5999
+    subscription = process.event_bus.subscribe()
+
+    process.rotation = StubRotation()
+    process.begin_run("run-1")
+    process.update_token("ATTEND-20250310090000", datetime.now() + timedelta(seconds=5))
+    event = next_token_event(subscription)
+    assert event["token"] == "ATTEND-20250310090000"
+    assert event["run_id"] == "run-1"
+    assert event["rotation"] == {"interval": 5.0, "rotations": 2}
+    assert event["pid"] == process._process.pid
+
+    deadline = time.monotonic() + 5
+    while process.scan_load() != ({"recorded": 3.0}, 1) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert process.scan_load() == ({"recorded": 3.0}, 1)
+
+def test_killed_child_is_restarted_with_the_current_run_and_token(make_process):
+    process = make_process(StubScanServer())
+    assert process.start() is True
+    subscription = process.event_bus.subscribe()
+    process.begin_run("run-2")
+    process.update_token("ATTEND-20250310090005", datetime.now() + timedelta(seconds=5))
+    first_pid = next_token_event(subscription)["pid"]
+
+    process._process.kill()
+    event = next_token_event(subscription)  # Sent by the replacement before any new rotation
+    assert event["pid"] != first_pid
+    assert (event["token"], event["run_id"]) == ("ATTEND-20250310090005", "run-2")
+    assert process.restarts == 1
+    assert process.is_running
+
+def test_stop_lets_the_child_exit_cleanly(make_process):
+    process = make_process(StubScanServer())
+    assert process.start() is True
+    child = process._process
+
+    process.stop(drain_timeout=0.5)
+    assert child.exitcode == 0
+    assert not process.is_running
+    process._supervisor.join(timeout=2)
+    assert not process._supervisor.is_alive()
+    assert process.restarts == 0
+
+def test_child_that_cannot_bind_fails_start(make_process):
+    process = make_process(StubScanServer(starts=False))
+    assert process.start() is False
+    assert not process.is_running
@@ -0,0 +1,159 @@
+"""
+Session Registry tests - Token resolution across nodes sharing state
+smart_attendance_system/tests/test_session_registry.py
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from attendance.core import session_registry
+from attendance.core.session_registry import DEFAULT_SESSION_ID, SessionRegistry
+from attendance.core.shared_state import InProcessState
+
+@pytest.fixture
+def nodes(monkeypatch):
+    """Two registries sharing one state, re-checking adopted tokens on every scan"""
+    monkeypatch.setattr(session_registry, "REMOTE_TOKEN_RECHECK", 0.0)
+    state = InProcessState()
+    return SessionRegistry(state), SessionRegistry(state)
+
+def in_a_minute() -> datetime:
+    return datetime.now() + timedelta(minutes=1)
+
+def test_other_node_resolves_a_published_token(nodes):
+    node_a, node_b = nodes
+    session = node_a.create_session("Lab 1", interval=60)
+
+    adopted = node_b.resolve(session.token)
+    assert adopted is not None
+    assert (adopted.session_id, adopted.room) == (session.session_id, "Lab 1")
+    # Scans on either node dedup against the same present set
+    assert adopted.present_scope == session.present_scope
+
+def test_new_run_reaches_the_other_node(nodes):
+    node_a, node_b = nodes
+    session = node_a.create_session("Lab 1", interval=60)
+    first_scope = node_b.resolve(session.token).present_scope
+
+    node_a.begin_run(session.session_id)
+    node_a.update_token(session.session_id, "tok-next", in_a_minute())
+    assert node_b.resolve("tok-next").present_scope == session.present_scope != first_scope
+
+def test_replaced_token_stops_resolving_everywhere(nodes):
+    node_a, node_b = nodes
+    session = node_a.create_session("Lab 1", interval=60)
+    old_token = session.token
+    assert node_b.resolve(old_token) is not None
+
+    node_a.update_token(session.session_id, "tok-next", in_a_minute())
+    assert node_a.resolve(old_token) is None
+    assert node_b.resolve(old_token) is None
+    assert node_b.resolve("tok-next") is not None
+
+def test_removed_session_stops_resolving_everywhere(nodes):
+    node_a, node_b = nodes
+    session = node_a.create_session("Lab 1", interval=60)
+    assert node_b.resolve(session.token) is not None
+
+    assert node_a.remove_session(session.session_id) is True
+    assert node_a.resolve(session.token) is None
+    assert node_b.resolve(session.token) is None
+
+def test_own_tokens_are_never_adopted_back(nodes):
+    node_a, _node_b = nodes
+    session = node_a.create_session("Lab 1", interval=60)
+    old_token = session.token
+    node_a.update_token(session.session_id, "tok-next", in_a_minute())
+
+    assert node_a.resolve(old_token) is None
+    assert node_a._remote_sessions == {}
+
+def test_other_nodes_default_session_stays_separate(nodes):
+    node_a, node_b = nodes
+    node_a.update_token(DEFAULT_SESSION_ID, "tok-a", in_a_minute())
+    node_b.update_token(DEFAULT_SESSION_ID, "tok-b", in_a_minute())
+
+    adopted = node_b.resolve("tok-a")
+    assert adopted is not None and adopted is not node_b.default_session
+    assert node_b.default_session.token == "tok-b"
+    assert node_b.resolve("tok-b") is node_b.default_session
+
+def test_late_scan_validates_against_the_window_it_was_made_in(nodes):
+    node_a, node_b = nodes
+    session = node_a.create_session("Lab 1", interval=60)
+    old_token = session.token
+    scanned_before = datetime.now()
+    node_a.update_token(session.session_id, "tok-next", in_a_minute())
+    scanned_after = datetime.now() + timedelta(seconds=1)
+
+    for node in (node_a, node_b):
+        assert node.resolve_at(old_token, scanned_before) is not None
+        assert node.resolve_at(old_token, scanned_after) is None  # The replacement ended its window
+
+class BlockingState(InProcessState):
+    """Shared state whose token writes hang until released, like an unreachable KV server"""
+
+    def __init__(self):
+        super().__init__()
+        self.blocking = threading.Event()
+        self.release = threading.Event()
+
+    def publish_token(self, token, info, ttl):
+        if self.blocking.is_set():
+            self.release.wait(5)
+        super().publish_token(token, info, ttl)
+
+def test_slow_shared_state_does_not_hold_the_registry_lock():
+    state = BlockingState()
+    registry = SessionRegistry(state)
+    session = registry.create_session("Lab 1", interval=60)
+
+    state.blocking.set()
+    writer = threading.Thread(target=registry.update_token, args=(session.session_id, "tok-next", in_a_minute()))
+    writer.start()
+    try:
+        while registry.resolve("tok-next") is None:
+            time.sleep(0.001)  # Installed locally while its publication is still stuck
+        began = time.monotonic()
+        registry.begin_run(session.session_id)  # Takes the registry lock
+        assert time.monotonic() - began < 1.0
+    finally:
+        state.release.set()
+        writer.join(timeout=5)
+    assert state.lookup_token("tok-next") is not None
+
+def test_next_rotation_is_due_one_interval_after_the_last_was_due():
+    registry = SessionRegistry()
+    session = registry.create_session("Lab 1", interval=10)
+    due = time.monotonic() - 0.3  # This rotation ran 0.3 s late
+    with registry._condition:
+        registry._schedule.clear()
+        registry._rotate(session, due)
+    assert registry._schedule[0][0] == pytest.approx(due + 10)
+    # The token expires when the next rotation is due, not a full interval from now
+    assert (session.expiry - datetime.now()).total_seconds() == pytest.approx(9.7, abs=0.1)
+
+def test_schedule_restarts_after_a_stall_instead_of_bursting():
+    registry = SessionRegistry()
+    session = registry.create_session("Lab 1", interval=10)
+    with registry._condition:
+        registry._schedule.clear()
+        registry._rotate(session, time.monotonic() - 60)
+    assert registry._schedule[0][0] == pytest.approx(time.monotonic() + 10, abs=0.1)
+
+def test_rotation_thread_rotates_managed_sessions():
+    registry = SessionRegistry()
+    session = registry.create_session("Lab 1", interval=0.05)
+    first = session.token
+    registry.start()
+    try:
+        deadline = time.monotonic() + 2
+        while session.token == first and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        registry.stop()
+    assert session.token != first
+    assert registry.resolve(session.token) is session
+    assert registry.shared_state.lookup_token(session.token) is not None
@@ -0,0 +1,118 @@
+"""
+Shared State tests - Run-scoped dedup, rate windows and safe pipeline retries
+smart_attendance_system/tests/test_shared_state.py
+"""
+import socket
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from attendance.core import shared_state as shared_state_module
+from attendance.core.flask_server import AttendanceFlaskServer
+from attendance.core.shared_state import InProcessState, KVState, SharedStateError, _RespConnection
+from kv_server import KVServer
+from standin_db import StandInDatabase
+
+class QuietKVServer(KVServer):
+    def handle_error(self, request, client_address):
+        pass  # Connections the tests drop on purpose
+
+@pytest.fixture
+def kv_state():
+    server = QuietKVServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+    state = KVState(*server.server_address)
+    yield state
+    state.close()
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture(params=["in_process", "kv"])
+def state(request):
+    if request.param == "in_process":
+        yield InProcessState()
+    else:
+        yield request.getfixturevalue("kv_state")
+
+def test_present_set_reports_only_first_mark(state):
+    assert state.mark_present_many("room:run1", ["21CS001", "21CS002", "21CS001"]) == [True, True, False]
+    assert state.mark_present("room:run1", "21CS002") is False
+
+def test_present_sets_are_separate_per_scope(state):
+    assert state.mark_present("room:run1", "21CS001") is True
+    assert state.mark_present("room:run2", "21CS001") is True  # Next lecture on the same session
+
+def test_unmark_lets_the_student_be_recorded_again(state):
+    state.mark_present("room:run1", "21CS001")
+    state.unmark_present("room:run1", "21CS001")
+    assert state.mark_present("room:run1", "21CS001") is True
+
+def test_tokens_publish_lookup_and_revoke(state):
+    state.publish_token("tok-a", {"session_id": "s1"}, ttl=30)
+    assert state.lookup_token("tok-a") == {"session_id": "s1"}
+    state.revoke_token("tok-a")
+    assert state.lookup_token("tok-a") is None
+
+def test_tokens_expire_after_their_ttl(state):
+    state.publish_token("tok-a", {"session_id": "s1"}, ttl=0.05)
+    time.sleep(0.1)
+    assert state.lookup_token("tok-a") is None
+
+def test_hit_rate_counts_within_a_window(state):
+    assert [state.hit_rate("10.0.0.5", 3600) for _ in range(3)] == [1, 2, 3]
+    assert state.hit_rate("10.0.0.6", 3600) == 1
+
+def _lose_first_reply(monkeypatch):
+    """Make the next pipeline reach the server but lose its reply, like a connection dropped mid-read"""
+    sent = []
+    original = _RespConnection.pipeline
+
+    def pipeline(connection, commands):
+        if sent:
+            return original(connection, commands)
+        sent.append(commands)
+        connection.sock.sendall(b"".join(shared_state_module._encode_command(command) for command in commands))
+        raise ConnectionError("connection reset")
+    monkeypatch.setattr(_RespConnection, "pipeline", pipeline)
+    return sent
+
+def test_lost_reply_is_not_replayed_for_non_idempotent_commands(kv_state, monkeypatch):
+    sent = _lose_first_reply(monkeypatch)
+    with pytest.raises(SharedStateError):
+        kv_state.mark_present("room:run1", "21CS001")
+    assert len(sent) == 1
+    # The server did apply the SADD; a replay would have reported the student as already present
+    assert kv_state.mark_present("room:run1", "21CS001") is False
+
+def test_lost_reply_is_retried_for_idempotent_commands(kv_state, monkeypatch):
+    kv_state.publish_token("tok-a", {"session_id": "s1"}, ttl=30)
+    _lose_first_reply(monkeypatch)
+    assert kv_state.lookup_token("tok-a") == {"session_id": "s1"}
+
+def test_connection_closed_by_the_server_is_stale():
+    with socket.create_server(("127.0.0.1", 0)) as listener:
+        connection = _RespConnection(*listener.getsockname(), timeout=1.0)
+        server_side, _ = listener.accept()
+        assert connection.is_stale() is False
+        server_side.close()
+        time.sleep(0.05)
+        assert connection.is_stale() is True
+        connection.close()
+
+def test_scan_dedup_is_per_run_of_a_session():
+    db = StandInDatabase([{"regno": "21CS001", "name": "Asha", "ip": "10.0.0.5"}])
+    server = AttendanceFlaskServer(db=db, shared_state=InProcessState())
+    session = server.sessions.create_session("Lab 1", interval=60, allowed_subnet="10.0.0.0/24")
+
+    assert server.process_scan(session.token, "10.0.0.5")[1] == 200
+    body, _status, _headers = server.process_scan(session.token, "10.0.0.5")
+    assert b"ALREADY_RECORDED" in body
+    assert len(db.attendance) == 1
+
+    server.sessions.begin_run(session.session_id)  # Next lecture in the same room
+    server.process_scan(session.token, "10.0.0.5")
+    assert len(db.attendance) == 2
+    assert all(row["session_id"] == session.session_id for row in db.attendance)
+    assert isinstance(db.attendance[0]["created_at"], datetime)
@@ -0,0 +1,127 @@
+"""
+Worker Pool Server tests - Keep-alive reuse, unread bodies, a full accept queue and shutdown
+smart_attendance_system/tests/test_worker_pool.py
+"""
+import http.client
+import socket
+import threading
+import time
+
+import pytest
+
+from attendance.core.worker_pool import WorkerPoolWSGIServer
+
+class RecordingApp:
+    """WSGI app answering with the client's port, so tests can tell connections apart"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+        self.paths = []
+
+    def __call__(self, environ, start_response):
+        self.paths.append(environ["PATH_INFO"])
+        if environ["PATH_INFO"] == "/slow":
+            self.entered.set()
+            self.gate.wait(5)
+        body = str(environ["REMOTE_PORT"]).encode("ascii")
+        start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))])
+        return [body]
+
+@pytest.fixture
+def make_server():
+    servers = []
+
+    def make(app, worker_count: int = 2, accept_queue: int = 4) -> WorkerPoolWSGIServer:
+        server = WorkerPoolWSGIServer("127.0.0.1", 0, app, worker_count=worker_count, accept_queue=accept_queue)
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+        servers.append(server)
+        return server
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def connect(server: WorkerPoolWSGIServer) -> http.client.HTTPConnection:
+    return http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+
+def get(connection: http.client.HTTPConnection, path: str, **kwargs) -> http.client.HTTPResponse:
+    connection.request(kwargs.pop("method", "GET"), path, **kwargs)
+    response = connection.getresponse()
+    response.body = response.read()
+    return response
+
+def test_connection_is_reused_between_requests(make_server):
+    server = make_server(RecordingApp())
+    connection = connect(server)
+    first, second = get(connection, "/a"), get(connection, "/b")
+    assert first.status == second.status == 200
+    assert first.body == second.body  # Same client port: one TCP connection served both
+    assert first.getheader("Connection") is None
+    connection.close()
+
+def test_keep_alive_responses_are_not_delayed(make_server):
+    server = make_server(RecordingApp())
+    connection = connect(server)
+    get(connection, "/warm")
+    started = time.perf_counter()
+    for _ in range(5):
+        get(connection, "/again")
+    # Headers and body in separate segments stall ~40 ms each behind delayed ACKs
+    assert (time.perf_counter() - started) / 5 < 0.02
+    connection.close()
+
+def test_unread_request_body_is_skipped_before_the_next_request(make_server):
+    app = RecordingApp()
+    server = make_server(app)
+    connection = connect(server)
+    posted = get(connection, "/ignores-body", method="POST", body=b"GET /smuggled HTTP/1.1\r\n\r\n" * 20,
+                 headers={"Content-Type": "text/plain"})
+    following = get(connection, "/next")
+    assert posted.status == following.status == 200
+    assert posted.body == following.body
+    assert app.paths == ["/ignores-body", "/next"]
+    connection.close()
+
+def test_full_accept_queue_gets_an_immediate_503(make_server):
+    app = RecordingApp()
+    app.gate.clear()
+    server = make_server(app, worker_count=1, accept_queue=1)
+    busy = connect(server)
+    busy.request("GET", "/slow")  # Holds the only worker
+    assert app.entered.wait(2)
+    waiting = socket.create_connection(server.server_address)  # Sits in the accept queue
+    while server.stats()["queued"] == 0:
+        time.sleep(0.005)
+
+    began = time.perf_counter()
+    refused = get(connect(server), "/refused")
+    assert refused.status == 503
+    assert refused.getheader("Retry-After") == "1"
+    assert b"SERVER_BUSY" in refused.body
+    assert time.perf_counter() - began < 1.0
+
+    app.gate.set()
+    assert busy.getresponse().status == 200
+    busy.close()
+    waiting.close()
+
+def test_shutdown_does_not_wait_for_idle_keep_alive_connections(make_server):
+    server = WorkerPoolWSGIServer("127.0.0.1", 0, RecordingApp(), worker_count=2, accept_queue=4)
+    serving = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    serving.start()
+    idle = [connect(server) for _ in range(2)]
+    for connection in idle:
+        get(connection, "/")  # Each worker now waits for the next request on an idle connection
+    assert server.stats()["busy"] == 2
+
+    began = time.perf_counter()
+    server.shutdown()
+    server.server_close()
+    assert time.perf_counter() - began < 1.0  # Well under KEEPALIVE_TIMEOUT
+    serving.join(timeout=1)
+    assert not serving.is_alive()
+    assert server.stats()["busy"] == 0
+    for connection in idle:
+        connection.close()
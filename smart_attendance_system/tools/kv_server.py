@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+KV Stand-in Server - Minimal RESP key-value server for testing shared state
+smart_attendance_system/tools/kv_server.py
+
+Implements the handful of commands KVState uses (PING, GET, SET [PX], DEL,
+SADD, SREM, SISMEMBER, INCR, PEXPIRE) so two attendance servers can share
+tokens and present sets without installing Redis. Not meant for production.
+
+Usage:
+    python tools/kv_server.py [--host 127.0.0.1] [--port 6390]
+    # then set SHARED_STATE_URL = "kv://127.0.0.1:6390" on every node
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+class Store:
+    """Keys with optional expiry; one lock makes every command atomic"""
+
+    def __init__(self):
+        self.values: Dict[bytes, Tuple[Any, Optional[float]]] = {}  # key -> (value, monotonic expiry)
+        self.lock = threading.Lock()
+
+    def _get(self, key: bytes) -> Any:
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        value, expiry = entry
+        if expiry is not None and expiry <= time.monotonic():
+            del self.values[key]
+            return None
+        return value
+
+    def _expiry(self, key: bytes) -> Optional[float]:
+        entry = self.values.get(key)
+        return entry[1] if entry else None
+
+    def execute(self, args: List[bytes]) -> Any:
+        command = args[0].upper()
+        with self.lock:
+            if command == b"PING":
+                return "PONG"
+            if command == b"GET":
+                value = self._get(args[1])
+                if value is not None and not isinstance(value, bytes):
+                    return Exception("WRONGTYPE Operation against a key holding the wrong kind of value")
+                return value
+            if command == b"SET":
+                expiry = None
+                if len(args) >= 5 and args[3].upper() == b"PX":
+                    expiry = time.monotonic() + int(args[4]) / 1000
+                self.values[args[1]] = (args[2], expiry)
+                return "OK"
+            if command == b"DEL":
+                deleted = 0
+                for key in args[1:]:
+                    if self._get(key) is not None:
+                        del self.values[key]
+                        deleted += 1
+                return deleted
+            if command in (b"SADD", b"SREM", b"SISMEMBER"):
+                members = self._get(args[1])
+                if members is None:
+                    members = set()
+                    self.values[args[1]] = (members, None)
+                if command == b"SISMEMBER":
+                    return int(args[2] in members)
+                changed = 0
+                for member in args[2:]:
+                    if command == b"SADD" and member not in members:
+                        members.add(member)
+                        changed += 1
+                    elif command == b"SREM" and member in members:
+                        members.discard(member)
+                        changed += 1
+                return changed
+            if command == b"INCR":
+                count = int(self._get(args[1]) or 0) + 1
+                self.values[args[1]] = (str(count).encode(), self._expiry(args[1]))
+                return count
+            if command == b"PEXPIRE":
+                value = self._get(args[1])
+                if value is None:
+                    return 0
+                self.values[args[1]] = (value, time.monotonic() + int(args[2]) / 1000)
+                return 1
+            return Exception(f"ERR unknown command '{command.decode(errors='replace')}'")
+
+def encode_reply(reply: Any) -> bytes:
+    """Encode a command result in RESP"""
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Exception):
+        return f"-{reply}\r\n".encode()
+    if isinstance(reply, str):
+        return f"+{reply}\r\n".encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+class RespHandler(socketserver.StreamRequestHandler):
+    """Reads pipelined commands and answers each in order"""
+
+    def handle(self):
+        while True:
+            header = self.rfile.readline()
+            if not header:
+                return
+            if not header.startswith(b"*"):
+                self.wfile.write(b"-ERR protocol error\r\n")
+                return
+            args = []
+            for _ in range(int(header[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(encode_reply(self.server.store.execute(args)))
+
+class KVServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int]):
+        super().__init__(address, RespHandler)
+        self.store = Store()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stand-in RESP key-value server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    with KVServer((args.host, args.port)) as server:
+        print(f"🗄️ KV stand-in listening on {args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Stopped")
+
+if __name__ == "__main__":
+    main()
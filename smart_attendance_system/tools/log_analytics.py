@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Log Analytics - Scan volume, outcomes, restarts and DB connect latency from application logs
+smart_attendance_system/tools/log_analytics.py
+
+Streams plain, gzipped and JSON-lines logs line by line (constant memory per
+file) and parses several files in parallel, one worker process per file.
+
+Usage:
+    python tools/log_analytics.py                      # logs/attendance*.log*
+    python tools/log_analytics.py logs/*.gz --workers 4 --minutes
+    python tools/log_analytics.py --json report.json
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import re
+import sys
+from collections import Counter
+from multiprocessing import Pool
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATTERN = os.path.join(os.path.dirname(current_dir), 'logs', 'attendance*.log*')
+
+# "2025-01-01 09:00:00,123 - attendance.core.flask_server - INFO - message"
+TEXT_LINE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}):\d{2},\d{3} - \S+ - \w+ - (.*)$')
+
+# Message prefix for each scan outcome, as logged by flask_server and db_manager
+OUTCOME_PREFIXES = (
+    ("recorded", "✅ Attendance: "),
+    ("expired", "⏰ Invalid/expired token"),
+    ("blocked", "🚫 Access blocked"),
+    ("unknown", "❓ Unknown device"),
+    ("duplicate", "🔁 Duplicate scan"),
+    ("shed", "⏳ Scan from "),
+    ("rate_limited", "🐢 Rate limit hit"),
+    ("deadline", "⌛ Deadline passed"),
+    ("db_error", "❌ Error marking attendance: "),
+    ("server_error", "💥 Error processing attendance"),
+)
+EVENT_PREFIXES = OUTCOME_PREFIXES + (
+    ("scan", "📱 Scan request"),
+    ("app_start", "Smart Attendance System v"),
+    ("server_start", "🌐 Flask server started"),
+    ("db_connect", "✅ Database connected successfully"),
+)
+# One alternation anchored at the message start; lastgroup names the event
+EVENT_PATTERN = re.compile("|".join(f"(?P<{name}>{re.escape(prefix)})" for name, prefix in EVENT_PREFIXES))
+CONNECT_LATENCY = re.compile(r' in ([\d.]+) ms')
+
+def read_lines(path: str) -> Iterator[str]:
+    """Lines of a plain or gzipped log, decoded leniently"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as log_file:
+        yield from log_file
+
+def parse_line(line: str) -> Optional[Tuple[str, str]]:
+    """(minute, message) for a text or JSON-lines record; None for continuation lines"""
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+            return record["ts"][:16].replace("T", " "), record["msg"]
+        except (ValueError, KeyError, TypeError):
+            return None
+    match = TEXT_LINE.match(line)
+    return (match.group(1), match.group(2)) if match else None
+
+def analyze_file(path: str) -> Dict[str, Any]:
+    """Counts for one file; only per-minute totals and connect timings grow with the file"""
+    events: Counter = Counter()
+    scans_per_minute: Counter = Counter()
+    connect_ms: List[float] = []
+    lines = 0
+
+    for line in read_lines(path):
+        lines += 1
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        minute, message = parsed
+        match = EVENT_PATTERN.match(message)
+        if match is None:
+            continue
+        event = match.lastgroup
+        if event == "app_start" and not message.rstrip().endswith("Starting"):
+            continue
+        events[event] += 1
+        if event == "scan":
+            scans_per_minute[minute] += 1
+        elif event == "db_connect":
+            latency = CONNECT_LATENCY.search(message)
+            if latency:
+                connect_ms.append(float(latency.group(1)))
+
+    return {"path": path, "lines": lines, "events": events,
+            "scans_per_minute": scans_per_minute, "connect_ms": connect_ms}
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def merge(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-file results into one report"""
+    events: Counter = Counter()
+    scans_per_minute: Counter = Counter()
+    connect_ms: List[float] = []
+    for result in results:
+        events.update(result["events"])
+        scans_per_minute.update(result["scans_per_minute"])
+        connect_ms.extend(result["connect_ms"])
+
+    scans = events["scan"]
+    outcomes = {name: events[name] for name, _prefix in OUTCOME_PREFIXES if events[name]}
+    connect_ms.sort()
+    return {
+        "files": len(results),
+        "lines": sum(result["lines"] for result in results),
+        "scans": scans,
+        "outcomes": outcomes,
+        "outcome_ratios": {name: round(count / scans, 4) for name, count in outcomes.items()} if scans else {},
+        "app_starts": events["app_start"],
+        "server_starts": events["server_start"],
+        "db_connects": {
+            "count": events["db_connect"],
+            "timed": len(connect_ms),
+            "p50_ms": percentile(connect_ms, 0.50),
+            "p95_ms": percentile(connect_ms, 0.95),
+            "max_ms": connect_ms[-1] if connect_ms else 0.0
+        },
+        "scans_per_minute": dict(sorted(scans_per_minute.items()))
+    }
+
+def print_report(report: Dict[str, Any], show_minutes: bool, top: int):
+    print("\n📊 Attendance Log Report")
+    print("=" * 50)
+    print(f"   📄 Files:        {report['files']} ({report['lines']:,} lines)")
+    print(f"   📱 Scans:        {report['scans']:,}")
+    print(f"   🔁 App starts:   {report['app_starts']} (server starts {report['server_starts']})")
+    connects = report["db_connects"]
+    print(f"   🗄️ DB connects:  {connects['count']} | p50 {connects['p50_ms']:.1f} ms | "
+          f"p95 {connects['p95_ms']:.1f} ms | max {connects['max_ms']:.1f} ms ({connects['timed']} timed)")
+    print("   🧾 Outcomes:")
+    for name, count in sorted(report["outcomes"].items(), key=lambda item: -item[1]):
+        print(f"      {name:<14} {count:>8,}  {report['outcome_ratios'].get(name, 0):>7.1%}")
+
+    per_minute = report["scans_per_minute"]
+    if show_minutes:
+        print("   🕐 Scans per minute:")
+        for minute, count in per_minute.items():
+            print(f"      {minute}  {count}")
+    elif per_minute:
+        print(f"   🔥 Busiest minutes (of {len(per_minute)}):")
+        for minute, count in sorted(per_minute.items(), key=lambda item: -item[1])[:top]:
+            print(f"      {minute}  {count}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize scan activity from attendance logs")
+    parser.add_argument("paths", nargs="*", help="log files or glob patterns (default logs/attendance*.log*)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel parser processes")
+    parser.add_argument("--minutes", action="store_true", help="print every minute instead of the busiest")
+    parser.add_argument("--top", type=int, default=10, help="busiest minutes to show")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in (args.paths or [DEFAULT_PATTERN])
+                    for path in (glob.glob(pattern) or [pattern]) if os.path.isfile(path)})
+    if not paths:
+        print("❌ No log files found")
+        sys.exit(1)
+
+    workers = max(1, min(args.workers, len(paths)))
+    if workers == 1:
+        results = [analyze_file(path) for path in paths]
+    else:
+        with Pool(workers) as pool:
+            results = pool.map(analyze_file, paths, chunksize=1)
+
+    report = merge(results)
+    print_report(report, args.minutes, args.top)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2, ensure_ascii=False)
+        print(f"\n💾 Report written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+QR Encoding Report - QR version, module count and render time for each scan URL encoding
+smart_attendance_system/tools/qr_encoding_report.py
+
+Usage:
+    python tools/qr_encoding_report.py [--port 5000] [--frames 50]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), 'src'))
+
+from attendance.config.settings import app_settings
+from attendance.core.qr_generator import COMPACT_ENCODING, LEGACY_ENCODING, QRCodeGenerator
+
+def render_ms(generator: QRCodeGenerator, port: int, frames: int) -> float:
+    """Mean render time over frames consecutive windows"""
+    start = datetime.now().replace(microsecond=0)  # Windows start on whole seconds, as in rotation
+    tokens = [generator.generate_token(start + timedelta(seconds=app_settings.QR_REFRESH_INTERVAL * i))
+              for i in range(frames)]
+    started = time.perf_counter()
+    for token in tokens:
+        generator.create_qr_image(token, port)
+    return (time.perf_counter() - started) * 1000 / frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare QR size and render time per scan URL encoding")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--frames", type=int, default=50, help="frames rendered to time each encoding")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"\n📐 QR encodings at {app_settings.QR_SIZE[0]}x{app_settings.QR_SIZE[1]} px")
+    print("=" * 64)
+    for encoding in (LEGACY_ENCODING, COMPACT_ENCODING):
+        generator = QRCodeGenerator(encoding)
+        info = generator.describe(args.port)
+        print(f"   {encoding:<8} version {info['version']:>2} | {info['modules']} x {info['modules']} modules | "
+              f"{info['pixels_per_module']} px/module | {render_ms(generator, args.port, args.frames):.2f} ms/frame")
+        print(f"            {info['url']} ({info['url_length']} chars)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Trace Report - Slowest sampled scans broken down by phase
+smart_attendance_system/tools/trace_report.py
+
+Usage:
+    python tools/trace_report.py [logs/traces.jsonl] [--top 10]
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TRACE_FILE = os.path.join(os.path.dirname(current_dir), 'logs', 'traces.jsonl')
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize sampled scan traces")
+    parser.add_argument("trace_file", nargs="?", default=DEFAULT_TRACE_FILE)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest traces to show")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.trace_file):
+        print(f"❌ Trace file not found: {args.trace_file}")
+        print("Set TRACE_SAMPLE_RATE in ServerSettings to record traces.")
+        sys.exit(1)
+
+    traces = []
+    phase_durations = defaultdict(list)
+    with open(args.trace_file, encoding='utf-8') as trace_file:
+        for line in trace_file:
+            try:
+                trace = json.loads(line)
+            except ValueError:
+                continue
+            traces.append(trace)
+            for span in trace["spans"]:
+                phase_durations[span["name"]].append(span["duration_ms"])
+
+    if not traces:
+        print("ℹ️ No traces recorded yet")
+        return
+
+    print(f"📊 {len(traces)} traces\n")
+    print(f"{'phase':<32} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, durations in sorted(phase_durations.items(), key=lambda item: -sum(item[1])):
+        durations.sort()
+        print(f"{name:<32} {len(durations):>7} {percentile(durations, 0.5):>9.3f} "
+              f"{percentile(durations, 0.95):>9.3f} {durations[-1]:>9.3f}")
+
+    print(f"\n🐢 Slowest {args.top} requests")
+    for trace in sorted(traces, key=lambda t: -t["duration_ms"])[:args.top]:
+        attributes = trace.get("attributes", {})
+        print(f"\n{trace['start']}  {trace['duration_ms']:.3f} ms  "
+              f"{attributes.get('ip', '?')}  {attributes.get('outcome', '?')}")
+        for span in sorted(trace["spans"], key=lambda s: s["offset_ms"]):
+            indent = "  " * (span["depth"] + 1)
+            print(f"{indent}{span['name']:<{30 - len(indent)}} +{span['offset_ms']:>8.3f}  {span['duration_ms']:>8.3f} ms")
+
+if __name__ == "__main__":
+    main()